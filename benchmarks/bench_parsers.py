@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Parser Accuracy and Micro-benchmark Harness
+
+Runs every reputation extractor over the golden-page corpus
+(benchmarks/pages/manifest.json) and reports field accuracy and ns/page,
+then feeds each one a pathological-input set to catch regex backtracking.
+
+Extractors:
+  fast_robokiller        fast_robokiller_scraper.extract_reputation_data
+  enhanced_openrouter    enhanced_openrouter_scraper.extract_with_enhanced_logic
+  ollama_crawl4ai        ollama_crawl4ai_scraper.extract_with_enhanced_logic
+  openrouter_crawl4ai    openrouter_crawl4ai_scraper.extract_with_enhanced_logic
+  crawl4ai_regex         crawl4ai_scraper.extract_with_regex
+  youmail_parse_html     youmail_scraper.YouMailScraper._parse_html
+
+Extractors whose module cannot be imported (missing crawl4ai, playwright,
+...) are reported as skipped rather than failing the run.
+
+Usage:
+  python3 benchmarks/bench_parsers.py                     # accuracy + speed + pathological
+  python3 benchmarks/bench_parsers.py -i 2000 --verbose   # more iterations, show mismatches
+  python3 benchmarks/bench_parsers.py --no-pathological --json parsers.json
+"""
+
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PAGES_DIR = os.path.join(BENCH_DIR, 'pages')
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'scripts'))
+
+# name -> (corpus source, module, adapter building fn(html, phone) -> dict)
+EXTRACTORS: Dict[str, Tuple[str, str, Callable]] = {
+    'fast_robokiller': ('robokiller', 'fast_robokiller_scraper',
+                        lambda m: lambda html, phone: m.extract_reputation_data(html)),
+    # The browser-based scrapers lowercase the page before calling these
+    'enhanced_openrouter': ('robokiller', 'enhanced_openrouter_scraper',
+                            lambda m: lambda html, phone: m.extract_with_enhanced_logic(html.lower())),
+    'ollama_crawl4ai': ('robokiller', 'ollama_crawl4ai_scraper',
+                        lambda m: lambda html, phone: m.extract_with_enhanced_logic(html.lower())),
+    'openrouter_crawl4ai': ('robokiller', 'openrouter_crawl4ai_scraper',
+                            lambda m: lambda html, phone: m.extract_with_enhanced_logic(html.lower())),
+    'crawl4ai_regex': ('robokiller', 'crawl4ai_scraper',
+                       lambda m: lambda html, phone: m.extract_with_regex(html)),
+    'youmail_parse_html': ('youmail', 'youmail_scraper',
+                           lambda m: (lambda scraper: lambda html, phone: scraper._parse_html(html, phone).to_dict())(m.YouMailScraper())),
+}
+
+# Inputs that make backtracking regexes go quadratic (or worse); n is a size in characters
+PATHOLOGICAL_INPUTS: Dict[str, Callable[[int], str]] = {
+    # (\d+)\s*calls? style patterns retry the whole run from every start position
+    'digit_run': lambda n: '1' * n,
+    # <[^>]*> with no closing bracket scans to the end from every '<'
+    'unclosed_tags': lambda n: '<div ' * (n // 5),
+    # id="lastCall"[^>]*>.*?<h3> with the anchor repeated and no <h3> after it
+    'repeated_anchor_ids': lambda n: ('id="lastCall"> ym-phone-summary-info-name> ' * (n // 44)),
+    # <meta[^>]*property=...[^>]*content=" with nested unbounded classes
+    'unterminated_meta': lambda n: '<meta property="og:description" ' * (n // 33),
+    # Linear control: a real page padded with a large inline script
+    'padded_page': lambda n: _load_page('robokiller/positive_allowed.html').replace(
+        '</body>', f'<script>{"x" * n}</script></body>'),
+}
+
+# Growth in time when the input grows 4x; linear is ~4, quadratic ~16
+SUPERLINEAR_RATIO = 8.0
+
+
+def _load_page(relative_path: str) -> str:
+    with open(os.path.join(PAGES_DIR, relative_path), encoding='utf-8') as f:
+        return f.read()
+
+
+def load_corpus() -> Dict:
+    with open(os.path.join(PAGES_DIR, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    for case in manifest['cases']:
+        case['html'] = _load_page(case['file'])
+    return manifest
+
+
+def load_extractor(name: str) -> Tuple[Optional[Callable], Optional[str]]:
+    """Import an extractor's module; return (fn, None) or (None, skip reason)"""
+    _, module_name, adapter = EXTRACTORS[name]
+    try:
+        module = importlib.import_module(module_name)
+        return adapter(module), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def score_case(output: Dict, expected: Dict) -> Tuple[int, List[str]]:
+    """Count expected fields the extractor got right"""
+    correct = 0
+    mismatches = []
+    for field, want in expected.items():
+        got = output.get(field, '<missing>')
+        if got == want:
+            correct += 1
+        else:
+            mismatches.append(f"{field}: expected {want!r}, got {got!r}")
+    return correct, mismatches
+
+
+def bench_corpus(name: str, fn: Callable, cases: List[Dict], iterations: int) -> Dict:
+    fields_total = fields_correct = pages_exact = 0
+    mismatches = {}
+
+    for case in cases:
+        output = fn(case['html'], case['phone'])
+        correct, misses = score_case(output, case['expected'])
+        fields_total += len(case['expected'])
+        fields_correct += correct
+        if misses:
+            mismatches[case['id']] = misses
+        else:
+            pages_exact += 1
+
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        for case in cases:
+            fn(case['html'], case['phone'])
+    elapsed = time.perf_counter_ns() - start
+
+    return {
+        'pages': len(cases),
+        'pages_exact': pages_exact,
+        'field_accuracy': round(fields_correct / fields_total, 3) if fields_total else 0.0,
+        'ns_per_page': elapsed // (iterations * len(cases)),
+        'mismatches': mismatches,
+    }
+
+
+def _time_once(name: str, input_name: str, size: int, queue):
+    fn, _ = load_extractor(name)
+    html = PATHOLOGICAL_INPUTS[input_name](size)
+    start = time.perf_counter()
+    fn(html, '2125550142')
+    queue.put(time.perf_counter() - start)
+
+
+def time_with_timeout(name: str, input_name: str, size: int, timeout: float) -> Optional[float]:
+    """Run one extraction in a child process so a runaway regex can be killed"""
+    queue = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=_time_once, args=(name, input_name, size, queue))
+    proc.start()
+    proc.join(timeout)
+    if proc.is_alive():
+        proc.kill()
+        proc.join()
+        return None
+    return queue.get() if not queue.empty() else None
+
+
+def bench_pathological(name: str, size: int, timeout: float) -> Dict:
+    results = {}
+    for input_name in PATHOLOGICAL_INPUTS:
+        small = time_with_timeout(name, input_name, size, timeout)
+        large = time_with_timeout(name, input_name, size * 4, timeout) if small is not None else None
+
+        if small is None or large is None:
+            verdict = 'TIMEOUT'
+        elif small > 0 and large / small > SUPERLINEAR_RATIO and large > 0.01:
+            verdict = 'SUPERLINEAR'
+        else:
+            verdict = 'ok'
+        results[input_name] = {
+            'ms_small': round(small * 1000, 2) if small is not None else None,
+            'ms_large': round(large * 1000, 2) if large is not None else None,
+            'verdict': verdict,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parser accuracy and micro-benchmarks')
+    parser.add_argument('-i', '--iterations', type=int, default=200, help='Timing iterations over the corpus')
+    parser.add_argument('--extractors', default=','.join(EXTRACTORS), help='Comma list of extractors')
+    parser.add_argument('--no-pathological', action='store_true')
+    parser.add_argument('--pathological-size', type=int, default=5000, help='Small input size (large is 4x)')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Seconds per pathological run')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Show field mismatches')
+    parser.add_argument('--json', dest='json_out', help='Write results to this file')
+    args = parser.parse_args()
+
+    manifest = load_corpus()
+    names = [n.strip() for n in args.extractors.split(',') if n.strip()]
+    report = {'corpus_version': manifest['version'], 'extractors': {}}
+
+    print(f"\n{'='*84}")
+    print(f"PARSER BENCHMARK  corpus v{manifest['version']}  iterations={args.iterations}")
+    print(f"{'='*84}")
+    print(f"{'extractor':<22} {'pages':>6} {'exact':>6} {'field acc':>10} {'ns/page':>12}  notes")
+
+    for name in names:
+        fn, skip_reason = load_extractor(name)
+        if not fn:
+            report['extractors'][name] = {'skipped': skip_reason}
+            print(f"{name:<22} {'-':>6} {'-':>6} {'-':>10} {'-':>12}  skipped ({skip_reason})")
+            continue
+
+        source = EXTRACTORS[name][0]
+        cases = [c for c in manifest['cases'] if c['source'] == source]
+        result = bench_corpus(name, fn, cases, args.iterations)
+        report['extractors'][name] = result
+        print(f"{name:<22} {result['pages']:>6} {result['pages_exact']:>6} "
+              f"{result['field_accuracy']:>10.1%} {result['ns_per_page']:>12,}")
+        if args.verbose:
+            for case_id, misses in result['mismatches'].items():
+                for miss in misses:
+                    print(f"    {case_id}: {miss}")
+
+    if not args.no_pathological:
+        size = args.pathological_size
+        print(f"\nPATHOLOGICAL INPUTS  (ms at {size} / {size * 4} chars, timeout {args.timeout:.0f}s)")
+        print(f"{'extractor':<22} " + ' '.join(f"{n:>22}" for n in PATHOLOGICAL_INPUTS))
+        for name in names:
+            if 'skipped' in report['extractors'][name]:
+                continue
+            results = bench_pathological(name, size, args.timeout)
+            report['extractors'][name]['pathological'] = results
+            cells = []
+            for r in results.values():
+                timing = f"{r['ms_small']}/{r['ms_large']}" if r['verdict'] != 'TIMEOUT' else 'TIMEOUT'
+                flag = '' if r['verdict'] == 'ok' else ' !'
+                cells.append(f"{timing + flag:>22}")
+            print(f"{name:<22} " + ' '.join(cells))
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
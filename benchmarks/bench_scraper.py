@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Offline RoboKiller Scraping Benchmark
+
+Drives scrape_single / scrape_batch / bulk_update() against the local
+stand-in server (benchmarks/robokiller_standin.py) and reports req/s,
+p50/p95/p99 latency, CPU per request and allocations. Nothing leaves the
+machine: no production proxies, no lookup.robokiller.com.
+
+Usage:
+  python3 benchmarks/bench_scraper.py                                  # single + batch, "clean" profile
+  python3 benchmarks/bench_scraper.py --profile zero -n 2000 -c 50     # client CPU only
+  python3 benchmarks/bench_scraper.py --scenarios batch,bulk           # bulk needs a local mongod
+  python3 benchmarks/bench_scraper.py --json bench.json                # save results
+  python3 benchmarks/bench_scraper.py --baseline bench.json            # exit 1 on regression
+  python3 benchmarks/bench_scraper.py --trace-alloc                    # add allocation pass
+
+The bulk scenario seeds a throwaway database (default did_optimizer_bench)
+and drops it afterwards; it refuses database names without "bench".
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+import aiohttp
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'scripts'))
+import fast_robokiller_scraper  # noqa: E402
+
+SCENARIOS = ('single', 'batch', 'bulk')
+
+# Metrics compared against a baseline, and which direction is worse
+REGRESSION_CHECKS = {'req_per_s': 'lower', 'p95_ms': 'higher', 'cpu_ms_per_req': 'higher'}
+
+
+def generate_numbers(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return [f"{rng.choice(['212', '305', '415', '702', '818'])}{rng.randint(200, 999)}{rng.randint(1000, 9999)}"
+            for _ in range(count)]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def standin_server(args):
+    """Run the stand-in in its own process so its CPU is not billed to the client"""
+    port = free_port()
+    cmd = [sys.executable, os.path.join(BENCH_DIR, 'robokiller_standin.py'),
+           '--port', str(port), '--profile', args.profile, '--seed', str(args.seed)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        else:
+            raise RuntimeError('Stand-in server did not start')
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        proc.terminate()
+        proc.wait(timeout=5)
+
+
+class Recorder:
+    """Wraps scrape_single to capture per-request latency and outcome"""
+
+    def __init__(self, scrape_fn):
+        self.scrape_fn = scrape_fn
+        self.latencies: List[float] = []
+        self.outcomes = {'ok': 0, 'blocked': 0, 'error': 0}
+
+    async def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        result = await self.scrape_fn(*args, **kwargs)
+        self.latencies.append((time.perf_counter() - start) * 1000)
+        if result.get('success'):
+            self.outcomes['ok'] += 1
+        elif result.get('is_blocked'):
+            self.outcomes['blocked'] += 1
+        else:
+            self.outcomes['error'] += 1
+        return result
+
+
+async def run_single(numbers: List[str], concurrency: int):
+    recorder = Recorder(fast_robokiller_scraper.scrape_single)
+    connector = aiohttp.TCPConnector(limit=1)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=15)) as session:
+        for number in numbers:
+            await recorder(session, number)
+    return recorder
+
+
+async def run_batch(numbers: List[str], concurrency: int):
+    # scrape_batch looks scrape_single up as a module global, so patch it there
+    recorder = Recorder(fast_robokiller_scraper.scrape_single)
+    original = fast_robokiller_scraper.scrape_single
+    fast_robokiller_scraper.scrape_single = recorder
+    try:
+        await fast_robokiller_scraper.scrape_batch(numbers, concurrency=concurrency)
+    finally:
+        fast_robokiller_scraper.scrape_single = original
+    return recorder
+
+
+async def run_bulk(numbers: List[str], concurrency: int, mongo_uri: str):
+    import bulk_update_reputation
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(mongo_uri, serverSelectionTimeoutMS=2000)
+    db = client.get_default_database()
+    if 'bench' not in db.name:
+        raise RuntimeError(f"Refusing to seed non-benchmark database '{db.name}'")
+
+    await db.dids.drop()
+    await db.dids.insert_many([{'phoneNumber': f'+1{n}', 'isActive': True} for n in numbers])
+
+    recorder = Recorder(bulk_update_reputation.scrape_single)
+    original_scrape, original_uri = bulk_update_reputation.scrape_single, bulk_update_reputation.MONGODB_URI
+    bulk_update_reputation.scrape_single = recorder
+    bulk_update_reputation.MONGODB_URI = mongo_uri
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await bulk_update_reputation.bulk_update(force=True, limit=len(numbers),
+                                                     concurrency=concurrency, use_proxies=False)
+    finally:
+        bulk_update_reputation.scrape_single = original_scrape
+        bulk_update_reputation.MONGODB_URI = original_uri
+        await client.drop_database(db.name)
+        client.close()
+    return recorder
+
+
+async def run_scenario(name: str, numbers: List[str], args):
+    if name == 'single':
+        return await run_single(numbers, args.concurrency)
+    if name == 'batch':
+        return await run_batch(numbers, args.concurrency)
+    return await run_bulk(numbers, args.concurrency, args.mongo_uri)
+
+
+def measure(name: str, args) -> Dict:
+    # Sequential single lookups are latency-bound; keep the run short
+    count = min(args.requests, args.single_limit) if name == 'single' else args.requests
+    numbers = generate_numbers(count, args.seed)
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    recorder = asyncio.run(run_scenario(name, numbers, args))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    latencies = sorted(recorder.latencies)
+    result = {
+        'requests': len(latencies),
+        **recorder.outcomes,
+        'wall_s': round(wall, 3),
+        'req_per_s': round(len(latencies) / wall, 1) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'cpu_ms_per_req': round(cpu * 1000 / max(len(latencies), 1), 3),
+    }
+
+    if args.trace_alloc:
+        # Separate pass: tracemalloc overhead would distort the timings above
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        asyncio.run(run_scenario(name, numbers, args))
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename') if stat.size_diff > 0)
+        result['alloc_kb_per_req'] = round(allocated / 1024 / max(len(numbers), 1), 2)
+        result['peak_alloc_kb'] = round(peak / 1024, 1)
+
+    return result
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    regressions = []
+    for scenario, current in results.items():
+        base = baseline.get('scenarios', {}).get(scenario)
+        if not base:
+            continue
+        for metric, worse in REGRESSION_CHECKS.items():
+            if not base.get(metric):
+                continue
+            change = (current[metric] - base[metric]) / base[metric]
+            if (worse == 'lower' and change < -tolerance) or (worse == 'higher' and change > tolerance):
+                regressions.append(f"{scenario}.{metric}: {base[metric]} -> {current[metric]} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline RoboKiller scraping benchmark')
+    parser.add_argument('--profile', default='clean', help='Stand-in traffic profile (zero, clean, degraded)')
+    parser.add_argument('-n', '--requests', type=int, default=500)
+    parser.add_argument('-c', '--concurrency', type=int, default=20)
+    parser.add_argument('--single-limit', type=int, default=100, help='Cap for the sequential scenario')
+    parser.add_argument('--scenarios', default='single,batch', help=f"Comma list of {','.join(SCENARIOS)}")
+    parser.add_argument('--mongo-uri', default=os.getenv('BENCH_MONGODB_URI', 'mongodb://127.0.0.1:27017/did_optimizer_bench'))
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--trace-alloc', action='store_true', help='Extra pass measuring allocations')
+    parser.add_argument('--json', dest='json_out', help='Write results to this file')
+    parser.add_argument('--baseline', help='Compare against a previous --json result')
+    parser.add_argument('--max-regression', type=float, default=0.15, help='Allowed fractional slowdown')
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = {}
+    with standin_server(args) as base_url:
+        fast_robokiller_scraper.ROBOKILLER_SEARCH_URL = f'{base_url}/search'
+        for name in scenarios:
+            try:
+                results[name] = measure(name, args)
+            except Exception as e:
+                print(f"{name}: skipped ({e})", file=sys.stderr)
+
+    print(f"\n{'='*100}")
+    print(f"SCRAPER BENCHMARK  profile={args.profile}  n={args.requests}  concurrency={args.concurrency}")
+    print(f"{'='*100}")
+    print(f"{'scenario':<8} {'reqs':>6} {'ok':>6} {'blk':>5} {'err':>5} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'cpu ms/req':>11} {'alloc KB/req':>13}")
+    for name, r in results.items():
+        print(f"{name:<8} {r['requests']:>6} {r['ok']:>6} {r['blocked']:>5} {r['error']:>5} {r['req_per_s']:>8} "
+              f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['cpu_ms_per_req']:>11} "
+              f"{r.get('alloc_kb_per_req', '-'):>13}")
+
+    report = {
+        'profile': args.profile,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'python': sys.version.split()[0],
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'scenarios': results,
+    }
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline.get('profile'), baseline.get('concurrency')) != (args.profile, args.concurrency):
+            print(f"⚠️  Baseline was recorded with profile={baseline.get('profile')} "
+                  f"concurrency={baseline.get('concurrency')}; numbers are not comparable")
+        regressions = compare_to_baseline(results, baseline, args.max_regression)
+        if regressions:
+            print(f"\n❌ Regressions beyond {args.max_regression:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.max_regression:.0%}")
+
+
+if __name__ == '__main__':
+    main()
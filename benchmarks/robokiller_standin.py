@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Local RoboKiller Stand-in Server
+
+Serves recorded RoboKiller lookup pages and block pages from benchmarks/pages
+with configurable latency, status code and page size distributions, so the
+scraping pipeline can be benchmarked without touching production proxies.
+
+Usage:
+  python3 benchmarks/robokiller_standin.py --port 8899                    # "clean" profile
+  python3 benchmarks/robokiller_standin.py --profile degraded             # 429/403/5xx + captcha mix
+  python3 benchmarks/robokiller_standin.py --latency-ms 200 --latency-dist lognormal \\
+      --status-mix 200:0.9,429:0.1 --block-rate 0.02 --pad-kb 40:160
+
+Endpoints:
+  GET /search?q=<number>   Lookup page (same number -> same recorded page)
+  GET /stats               Counters of what has been served
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import zlib
+from typing import Dict, List
+
+from aiohttp import web
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+
+# Named traffic profiles; CLI flags override individual fields
+PROFILES = {
+    # No latency, no failures: measures pure client-side CPU cost
+    'zero': {
+        'latency_ms': 0, 'latency_dist': 'fixed', 'jitter': 0.0,
+        'status_mix': {200: 1.0}, 'block_rate': 0.0, 'pad_kb': (0, 0),
+    },
+    # Healthy residential proxy: ~150ms median, real-world page sizes
+    'clean': {
+        'latency_ms': 150, 'latency_dist': 'lognormal', 'jitter': 0.4,
+        'status_mix': {200: 1.0}, 'block_rate': 0.0, 'pad_kb': (40, 160),
+    },
+    # Throttled proxy pool: slow tail, rate limits, WAF blocks and captchas
+    'degraded': {
+        'latency_ms': 400, 'latency_dist': 'lognormal', 'jitter': 0.8,
+        'status_mix': {200: 0.88, 429: 0.06, 403: 0.04, 503: 0.02}, 'block_rate': 0.05, 'pad_kb': (40, 160),
+    },
+}
+
+# Which recorded block page goes with which non-200 status
+STATUS_PAGES = {429: 'rate_limited.html', 403: 'access_denied.html'}
+
+
+def parse_status_mix(value: str) -> Dict[int, float]:
+    """Parse "200:0.9,429:0.1" into {200: 0.9, 429: 0.1}"""
+    mix = {}
+    for part in value.split(','):
+        status, weight = part.split(':')
+        mix[int(status)] = float(weight)
+    return mix
+
+
+def load_pages(subdir: str) -> Dict[str, str]:
+    directory = os.path.join(PAGES_DIR, subdir)
+    pages = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.html'):
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                pages[name] = f.read()
+    return pages
+
+
+class StandinServer:
+    """aiohttp app emulating lookup.robokiller.com"""
+
+    def __init__(self, profile: Dict, seed: int = 1):
+        self.profile = profile
+        self.rng = random.Random(seed)
+        self.lookup_pages: List[str] = list(load_pages('robokiller').values())
+        self.block_pages = load_pages('blocked')
+        self.stats = {'requests': 0, 'bytes': 0, 'statuses': {}, 'captcha': 0}
+
+        statuses = profile['status_mix']
+        self._statuses = list(statuses.keys())
+        self._status_weights = list(statuses.values())
+
+    def _latency(self) -> float:
+        base = self.profile['latency_ms'] / 1000.0
+        dist = self.profile['latency_dist']
+        jitter = self.profile['jitter']
+        if base <= 0:
+            return 0.0
+        if dist == 'uniform':
+            return self.rng.uniform(base * (1 - jitter), base * (1 + jitter))
+        if dist == 'lognormal':
+            # latency_ms is the median; jitter is sigma of the underlying normal
+            return base * self.rng.lognormvariate(0, jitter)
+        return base
+
+    def _padding(self) -> str:
+        low, high = self.profile['pad_kb']
+        size = self.rng.randint(low, high) * 1024 if high else 0
+        # Real pages carry large inline scripts; pad with an inert script block
+        return f'<script type="application/json" id="bench-padding">"{"x" * size}"</script>' if size else ''
+
+    async def search(self, request: web.Request) -> web.Response:
+        number = request.query.get('q', '')
+        await asyncio.sleep(self._latency())
+
+        status = self.rng.choices(self._statuses, self._status_weights)[0]
+        if status != 200:
+            body = self.block_pages.get(STATUS_PAGES.get(status, ''), self.block_pages['server_error.html'])
+        elif self.rng.random() < self.profile['block_rate']:
+            body = self.block_pages['captcha.html']
+            self.stats['captcha'] += 1
+        else:
+            # Same number always maps to the same recorded page
+            page = self.lookup_pages[zlib.crc32(number.encode()) % len(self.lookup_pages)]
+            body = page.replace('</body>', self._padding() + '</body>')
+
+        self.stats['requests'] += 1
+        self.stats['bytes'] += len(body)
+        self.stats['statuses'][status] = self.stats['statuses'].get(status, 0) + 1
+        return web.Response(text=body, status=status, content_type='text/html')
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/search', self.search)
+        app.router.add_get('/stats', self.get_stats)
+        return app
+
+
+def build_profile(args) -> Dict:
+    profile = dict(PROFILES[args.profile])
+    if args.latency_ms is not None:
+        profile['latency_ms'] = args.latency_ms
+    if args.latency_dist:
+        profile['latency_dist'] = args.latency_dist
+    if args.jitter is not None:
+        profile['jitter'] = args.jitter
+    if args.status_mix:
+        profile['status_mix'] = parse_status_mix(args.status_mix)
+    if args.block_rate is not None:
+        profile['block_rate'] = args.block_rate
+    if args.pad_kb:
+        low, high = args.pad_kb.split(':')
+        profile['pad_kb'] = (int(low), int(high))
+    return profile
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local RoboKiller stand-in server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8899)
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='clean')
+    parser.add_argument('--latency-ms', type=float, default=None, help='Median/fixed latency in ms')
+    parser.add_argument('--latency-dist', choices=['fixed', 'uniform', 'lognormal'], default=None)
+    parser.add_argument('--jitter', type=float, default=None, help='Uniform +/- fraction or lognormal sigma')
+    parser.add_argument('--status-mix', default=None, help='e.g. 200:0.9,429:0.05,403:0.05')
+    parser.add_argument('--block-rate', type=float, default=None, help='Fraction of 200s that are captcha pages')
+    parser.add_argument('--pad-kb', default=None, help='Page padding range in KB, e.g. 40:160')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    profile = build_profile(args)
+    print(json.dumps({'standin': f'http://{args.host}:{args.port}/search', 'profile': args.profile}), flush=True)
+    web.run_app(StandinServer(profile, args.seed).app(), host=args.host, port=args.port, print=None)
@@ -25,6 +25,8 @@ module.exports = {
     log_date_format: 'YYYY-MM-DD HH:mm:ss Z',
 
     // Process management
+    // /api/v1/dids/next keeps rotation state in process memory: set
+    // ROTATION_STATE=redis before raising instances or switching to cluster mode
     instances: 1,
     exec_mode: 'fork',
     autorestart: true,
@@ -37,5 +39,44 @@ module.exports = {
 
     // Time to wait before forcing a reload
     kill_timeout: 5000
+  }, {
+    // Takes DIDs out of rotation when their reputation turns bad (and back in
+    // when it recovers); reputation writers only record scores
+    name: 'reputation-sweeper',
+    script: 'scripts/reputation_sweeper.py',
+    args: '--loop 300',
+    interpreter: 'python3',
+    env: {
+      PYTHONUNBUFFERED: '1'
+    },
+    error_file: './logs/reputation-sweeper-error.log',
+    out_file: './logs/reputation-sweeper-output.log',
+    merge_logs: true,
+    log_date_format: 'YYYY-MM-DD HH:mm:ss Z',
+    instances: 1,
+    exec_mode: 'fork',
+    autorestart: true,
+    watch: false,
+    min_uptime: '10s',
+    max_restarts: 10,
+    restart_delay: 30000
+  }, {
+    // Nightly: rolls leftover usage.today counters onto dailyUsage and compacts
+    // it. Runs once on start, then at 00:05 server time; exits when done.
+    name: 'daily-usage-rollup',
+    script: 'scripts/rollup_daily_usage.py',
+    interpreter: 'python3',
+    env: {
+      PYTHONUNBUFFERED: '1'
+    },
+    error_file: './logs/daily-usage-rollup-error.log',
+    out_file: './logs/daily-usage-rollup-output.log',
+    merge_logs: true,
+    log_date_format: 'YYYY-MM-DD HH:mm:ss Z',
+    instances: 1,
+    exec_mode: 'fork',
+    cron_restart: '5 0 * * *',
+    autorestart: false,
+    watch: false
   }]
 };
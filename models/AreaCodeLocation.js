@@ -1,4 +1,5 @@
 import mongoose from 'mongoose';
+import areaCodeProximity from '../services/area-code-proximity.js';
 
 // High-performance area code geolocation model for distance calculations
 const areaCodeLocationSchema = new mongoose.Schema({
@@ -85,7 +86,14 @@ areaCodeLocationSchema.index({
 });
 
 // Static method to calculate distance between two area codes
-areaCodeLocationSchema.statics.calculateDistance = function(areaCode1, areaCode2) {
+// Served from the proximity table (scripts/build_area_code_proximity.py) when
+// it knows both NPAs; the aggregation below is the fallback
+areaCodeLocationSchema.statics.calculateDistance = async function(areaCode1, areaCode2) {
+  const distance = areaCodeProximity.distance(areaCode1, areaCode2);
+  if (distance !== null) {
+    return [{ distance, areaCode1, areaCode2 }];
+  }
+
   return this.aggregate([
     {
       $facet: {
@@ -160,7 +168,12 @@ areaCodeLocationSchema.statics.calculateDistance = function(areaCode1, areaCode2
 };
 
 // Find area codes within a certain distance of a target area code
-areaCodeLocationSchema.statics.findNearbyAreaCodes = function(areaCode, maxDistanceMiles = 50) {
+areaCodeLocationSchema.statics.findNearbyAreaCodes = async function(areaCode, maxDistanceMiles = 50) {
+  const nearby = areaCodeProximity.nearby(areaCode, maxDistanceMiles, 100);
+  if (nearby) {
+    return nearby;
+  }
+
   return this.aggregate([
     // First get the target area code location
     {
@@ -238,7 +251,21 @@ areaCodeLocationSchema.statics.findNearbyAreaCodes = function(areaCode, maxDista
 };
 
 // Find optimal area code based on target coordinates
-areaCodeLocationSchema.statics.findOptimalAreaCode = function(targetLat, targetLng, excludeAreaCodes = []) {
+// From the proximity table, distances are to each area code's centre point
+// rather than averaged over its cities
+areaCodeLocationSchema.statics.findOptimalAreaCode = async function(targetLat, targetLng, excludeAreaCodes = []) {
+  const nearest = areaCodeProximity.nearestTo(targetLat, targetLng, { exclude: excludeAreaCodes, limit: 10 });
+  if (nearest) {
+    return nearest.map(npa => ({
+      _id: npa.areaCode,
+      closestCity: npa.city,
+      state: npa.state,
+      avgDistance: npa.distance,
+      minDistance: npa.distance,
+      cityCount: npa.cities
+    }));
+  }
+
   const targetPoint = [targetLng, targetLat]; // GeoJSON format: [longitude, latitude]
 
   return this.aggregate([
@@ -1,4 +1,5 @@
 import mongoose from 'mongoose';
+import poolGeoIndex from '../services/pool-geo-index.js';
 
 const campaignDIDPoolSchema = new mongoose.Schema({
   // Tenant and Campaign association
@@ -247,7 +248,7 @@ campaignDIDPoolSchema.methods.getNextDID = async function(customerInfo = {}) {
       break;
       
     case 'geographic':
-      selectedDID = await this.selectByGeographic(filteredDIDs, customerInfo);
+      selectedDID = await this.selectByGeographic(filteredDIDs, customerInfo, activeDIDs);
       break;
       
     default:
@@ -305,57 +306,29 @@ campaignDIDPoolSchema.methods.calculatePerformanceScore = function(did, config)
   );
 };
 
-// Geographic selection
-campaignDIDPoolSchema.methods.selectByGeographic = async function(dids, customerInfo) {
+// Geographic selection: nearest DID within maxDistance of the customer,
+// from the pool's spatial index (services/pool-geo-index.js)
+campaignDIDPoolSchema.methods.selectByGeographic = async function(dids, customerInfo, members = dids) {
   if (!customerInfo.customerZip && !customerInfo.customerState) {
     // Fall back to least-used if no location info
     return this.selectByLeastUsed(dids);
   }
 
   // Find customer location from zip or state
-  const AreaCodeLocation = mongoose.model('AreaCodeLocation');
-  let customerLocation = null;
-
-  if (customerInfo.customerZip) {
-    customerLocation = await AreaCodeLocation.findOne({ zipCode: customerInfo.customerZip });
-  }
-
-  if (!customerLocation && customerInfo.customerState) {
-    customerLocation = await AreaCodeLocation.findOne({ state: customerInfo.customerState });
-  }
-
+  const customerLocation = await poolGeoIndex.customerLocation(customerInfo);
   if (!customerLocation) {
     return this.selectByLeastUsed(dids);
   }
-  
-  // Sort by distance
-  const sortedDIDs = [...dids].sort((a, b) => {
-    const distanceA = a.getDistanceFrom(
-      customerLocation.location.coordinates[1],
-      customerLocation.location.coordinates[0]
-    );
-    const distanceB = b.getDistanceFrom(
-      customerLocation.location.coordinates[1],
-      customerLocation.location.coordinates[0]
-    );
-    
-    return distanceA - distanceB;
-  });
-  
-  // Filter by max distance
-  const maxDistance = this.rotationStrategy.config.maxDistance;
-  const nearbyDIDs = sortedDIDs.filter(did => {
-    const distance = did.getDistanceFrom(
-      customerLocation.location.coordinates[1],
-      customerLocation.location.coordinates[0]
-    );
-    return distance <= maxDistance;
+
+  const index = poolGeoIndex.forPool(this._id, members, dids);
+  const [nearest] = index.nearest(customerLocation.latitude, customerLocation.longitude, dids, {
+    maxDistance: this.rotationStrategy.config.maxDistance
   });
-  
-  if (nearbyDIDs.length > 0) {
-    return nearbyDIDs[0];
+
+  if (nearest) {
+    return nearest.did;
   }
-  
+
   // Fall back to least-used if no nearby DIDs
   return this.selectByLeastUsed(dids);
 };
@@ -406,6 +379,20 @@ campaignDIDPoolSchema.methods.updateStats = async function() {
   await this.save();
 };
 
+// Drop the pool's spatial index when its DID list changes
+campaignDIDPoolSchema.pre('save', function(next) {
+  this.$locals.didsChanged = this.isNew || this.isModified('dids');
+  next();
+});
+
+campaignDIDPoolSchema.post('save', function(doc) {
+  if (doc.$locals.didsChanged) poolGeoIndex.invalidate(doc._id);
+});
+
+campaignDIDPoolSchema.post('deleteOne', { document: true, query: false }, function(doc) {
+  poolGeoIndex.invalidate(doc._id);
+});
+
 // Static method to find pool by campaign
 campaignDIDPoolSchema.statics.findByCampaign = function(tenantId, campaignId) {
   return this.findOne({
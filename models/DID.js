@@ -1,5 +1,14 @@
 import mongoose from 'mongoose';
 
+// Canonical phone key: bare 10-digit NANP ("+12067586013", "12067586013" and
+// "2067586013" all become "2067586013"). Same rule as ReputationService.normalizePhone.
+export function toPhoneKey(phoneNumber) {
+  if (!phoneNumber) return null;
+  let n = String(phoneNumber).replace(/\D/g, '');
+  if (n.length === 11 && n.startsWith('1')) n = n.substring(1);
+  return n || null;
+}
+
 const didSchema = new mongoose.Schema({
   tenantId: {
     type: mongoose.Schema.Types.ObjectId,
@@ -13,6 +22,11 @@ const didSchema = new mongoose.Schema({
     trim: true,
     match: /^[\+]?[1-9][\d\s\-()]*$/ // Flexible phone number format
   },
+  // phoneNumber in canonical 10-digit form, kept in sync by the middleware below.
+  // Reputation writers match on this exactly instead of suffix regexes on phoneNumber.
+  phoneKey: {
+    type: String
+  },
   status: {
     type: String,
     enum: ['active', 'inactive'],
@@ -83,6 +97,14 @@ const didSchema = new mongoose.Schema({
       type: Number,
       default: 0
     },
+    // Today's call count; rolled into dailyUsage when the day changes
+    today: {
+      day: Date,
+      count: {
+        type: Number,
+        default: 0
+      }
+    },
     dailyUsage: [{
       date: Date,
       count: Number
@@ -147,6 +169,9 @@ const didSchema = new mongoose.Schema({
       default: 'Unknown'
     },
     lastChecked: Date,
+    // When the background scraper should look at this DID again (null = never checked).
+    // Mirrors DIDReputation.nextCheckDue so candidate selection is one query on dids.
+    nextCheckDue: Date,
     robokillerData: {
       userReports: Number,
       reputationStatus: String,
@@ -196,6 +221,12 @@ const didSchema = new mongoose.Schema({
     }
   }],
 
+  // Tenant rotation cycle (Tenant.rotationState.cycleId) this DID was last picked in
+  lastCycleId: {
+    type: Number,
+    default: 0
+  },
+
   // Track last campaign used
   lastCampaignUsed: {
     campaignId: String,
@@ -239,6 +270,7 @@ const didSchema = new mongoose.Schema({
 // Compound indexes for efficient queries
 didSchema.index({ tenantId: 1, status: 1 });
 didSchema.index({ phoneNumber: 1, tenantId: 1 }, { unique: true });
+didSchema.index({ phoneKey: 1, tenantId: 1 });
 didSchema.index({ tenantId: 1, 'location.state': 1 });
 didSchema.index({ tenantId: 1, 'location.areaCode': 1 });
 didSchema.index({ tenantId: 1, 'usage.lastUsed': 1 });
@@ -250,8 +282,14 @@ didSchema.index({ 'location.latitude': 1, 'location.longitude': 1 });
 didSchema.index({ tenantId: 1, status: 1, 'reputation.score': 1, 'usage.lastUsed': 1 });
 // Fallback index for queries without lastUsed sorting
 didSchema.index({ tenantId: 1, status: 1, 'reputation.score': 1 });
+// Background scraper candidate selection: due DIDs in nextCheckDue order, tenant filtered from the index
+didSchema.index({ status: 1, isActive: 1, 'reputation.nextCheckDue': 1, tenantId: 1 });
 // Index for daily usage filtering
 didSchema.index({ 'usage.dailyUsage.date': 1 });
+// Nightly rollup finds counters left over from previous days
+didSchema.index({ 'usage.today.day': 1 });
+// Reputation sweeper reads DIDs scored since its last watermark (bulk_update_reputation.py)
+didSchema.index({ 'reputation.lastChecked': 1 });
 
 // NPANXX-based geographic matching indexes (Phase 1)
 didSchema.index({ npanxx: 1 });
@@ -263,11 +301,24 @@ didSchema.index({ tenantId: 1, 'campaignAssociations.campaignId': 1 });
 didSchema.index({ tenantId: 1, 'campaignAssociations.poolId': 1 });
 didSchema.index({ 'campaignAssociations.poolId': 1, status: 1 });
 
+// Days of history kept in usage.dailyUsage
+const DAILY_USAGE_DAYS = 30;
+
+function startOfToday(now = new Date()) {
+  const today = new Date(now);
+  today.setHours(0, 0, 0, 0);
+  return today;
+}
+
 // Method to get today's usage count
 didSchema.methods.getTodayUsage = function() {
-  const today = new Date();
-  today.setHours(0, 0, 0, 0);
+  const today = startOfToday();
+
+  if (this.usage.today?.day) {
+    return this.usage.today.day.getTime() === today.getTime() ? this.usage.today.count : 0;
+  }
 
+  // DIDs not dialled since usage.today was introduced
   const todayUsage = this.usage.dailyUsage.find(day => {
     const dayDate = new Date(day.date);
     dayDate.setHours(0, 0, 0, 0);
@@ -279,32 +330,120 @@ didSchema.methods.getTodayUsage = function() {
 
 // Method to increment today's usage
 didSchema.methods.incrementTodayUsage = function() {
-  const today = new Date();
-  today.setHours(0, 0, 0, 0);
+  const today = startOfToday();
+  const current = this.usage.today;
 
-  const todayUsage = this.usage.dailyUsage.find(day => {
-    const dayDate = new Date(day.date);
-    dayDate.setHours(0, 0, 0, 0);
-    return dayDate.getTime() === today.getTime();
-  });
+  if (current?.day && current.day.getTime() === today.getTime()) {
+    current.count++;
+    return;
+  }
 
-  if (todayUsage) {
-    todayUsage.count++;
-  } else {
-    this.usage.dailyUsage.push({
-      date: today,
-      count: 1
-    });
+  if (current?.day && current.count > 0) {
+    this.usage.dailyUsage.push({ date: current.day, count: current.count });
   }
+  this.usage.today = { day: today, count: 1 };
 
   // Keep only last 30 days of usage data
   const thirtyDaysAgo = new Date();
-  thirtyDaysAgo.setDate(thirtyDaysAgo.getDate() - 30);
+  thirtyDaysAgo.setDate(thirtyDaysAgo.getDate() - DAILY_USAGE_DAYS);
   this.usage.dailyUsage = this.usage.dailyUsage.filter(day =>
     new Date(day.date) >= thirtyDaysAgo
   );
 };
 
+/**
+ * Pipeline stage for DIDs without usage.today yet: today's entries in
+ * dailyUsage (counted there before usage.today existed) become usage.today,
+ * so capacity does not restart mid-day. A no-op for every other DID.
+ */
+didSchema.statics.todayUsageSeed = function(now = new Date()) {
+  const today = startOfToday(now);
+  const tomorrow = new Date(today);
+  tomorrow.setDate(tomorrow.getDate() + 1);
+  const unseeded = { $eq: [{ $ifNull: ['$usage.today.day', null] }, null] };
+  const isToday = date => ({ $and: [{ $gte: [date, today] }, { $lt: [date, tomorrow] }] });
+  const dailyUsage = { $ifNull: ['$usage.dailyUsage', []] };
+
+  return [{
+    $set: {
+      'usage.today': {
+        $cond: [
+          unseeded,
+          {
+            day: today,
+            count: {
+              $sum: {
+                $map: {
+                  input: { $filter: { input: dailyUsage, as: 'day', cond: isToday('$$day.date') } },
+                  as: 'day',
+                  in: '$$day.count'
+                }
+              }
+            }
+          },
+          '$usage.today'
+        ]
+      },
+      'usage.dailyUsage': {
+        $cond: [
+          unseeded,
+          { $filter: { input: dailyUsage, as: 'day', cond: { $not: [isToday('$$day.date')] } } },
+          '$usage.dailyUsage'
+        ]
+      }
+    }
+  }];
+};
+
+/**
+ * Update pipeline that counts `calls` calls against usage.today in a single
+ * atomic write: same day increments, a new day moves the old counter onto
+ * dailyUsage and restarts. Extra fields (lastUsed, lastCampaign, ...) go in `set`;
+ * their values are written as $literal, since a pipeline reads a string
+ * starting with '$' as a field path and an array as an expression.
+ */
+didSchema.statics.todayUsageUpdate = function(now = new Date(), set = {}, calls = 1) {
+  const today = startOfToday(now);
+  const literals = {};
+  for (const [field, value] of Object.entries(set)) {
+    if (value !== undefined) literals[field] = { $literal: value };
+  }
+  const sameDay = { $eq: ['$usage.today.day', today] };
+  const carryOver = { $and: [{ $not: [sameDay] }, { $gt: ['$usage.today.count', 0] }] };
+  const oldest = new Date(today);
+  oldest.setDate(oldest.getDate() - DAILY_USAGE_DAYS);
+
+  return [...this.todayUsageSeed(now), {
+    $set: {
+      ...literals,
+      'usage.totalCalls': { $add: [{ $ifNull: ['$usage.totalCalls', 0] }, calls] },
+      'usage.dailyUsage': {
+        $cond: [
+          carryOver,
+          {
+            // Keep the last DAILY_USAGE_DAYS days, as incrementTodayUsage does
+            $filter: {
+              input: {
+                $concatArrays: [
+                  { $ifNull: ['$usage.dailyUsage', []] },
+                  [{ date: '$usage.today.day', count: '$usage.today.count' }]
+                ]
+              },
+              as: 'day',
+              cond: { $gte: ['$$day.date', oldest] }
+            }
+          },
+          { $ifNull: ['$usage.dailyUsage', []] }
+        ]
+      },
+      'usage.today': {
+        day: today,
+        count: { $cond: [sameDay, { $add: ['$usage.today.count', calls] }, calls] }
+      }
+    }
+  }];
+};
+
 // Method to check if DID has reached daily limit
 didSchema.methods.hasReachedDailyLimit = function(limit = 200) {
   return this.getTodayUsage() >= limit;
@@ -340,6 +479,8 @@ didSchema.methods.getDistanceFrom = function(latitude, longitude) {
 didSchema.pre('save', async function(next) {
   // Only populate if new document or phone number changed
   if (this.isNew || this.isModified('phoneNumber')) {
+    this.phoneKey = toPhoneKey(this.phoneNumber);
+
     try {
       // Import AreaCodeLocation here to avoid circular dependencies
       const AreaCodeLocation = mongoose.model('AreaCodeLocation');
@@ -405,6 +546,25 @@ didSchema.pre('save', async function(next) {
   next();
 });
 
+// insertMany skips save middleware
+didSchema.pre('insertMany', function(next, docs) {
+  for (const doc of [].concat(docs)) {
+    if (doc && doc.phoneNumber) doc.phoneKey = toPhoneKey(doc.phoneNumber);
+  }
+  next();
+});
+
+// Keep phoneKey in step when an update query rewrites phoneNumber
+didSchema.pre(['updateOne', 'updateMany', 'findOneAndUpdate'], function(next) {
+  const update = this.getUpdate() || {};
+  const phoneNumber = update.$set?.phoneNumber ?? update.phoneNumber ?? update.$setOnInsert?.phoneNumber;
+  if (phoneNumber) {
+    const target = update.$setOnInsert?.phoneNumber ? '$setOnInsert' : '$set';
+    this.setUpdate({ ...update, [target]: { ...update[target], phoneKey: toPhoneKey(phoneNumber) } });
+  }
+  next();
+});
+
 const DID = mongoose.model('DID', didSchema);
 
 export default DID;
\ No newline at end of file
@@ -0,0 +1,73 @@
+import mongoose from 'mongoose';
+
+// Append-only reputation samples, one document per DID per month.
+// Written in bulk by scripts/bulk_update_reputation.py (see scripts/reputation_history.py);
+// the packed sample layout below must match SAMPLE_FIELDS there.
+const SAMPLE_FIELDS = ['t', 'score', 'status', 'robokillerStatus', 'userReports', 'totalCalls', 'commentsCount'];
+const STATUS_NAMES = ['Unknown', 'Positive', 'Neutral', 'Negative'];
+const ROBOKILLER_NAMES = ['Unknown', 'Allowed', 'Blocked'];
+
+const reputationHistorySchema = new mongoose.Schema({
+  d: {
+    type: mongoose.Schema.Types.ObjectId,
+    ref: 'DID',
+    required: true
+  },
+  // Month bucket as YYYYMM
+  m: {
+    type: Number,
+    required: true
+  },
+  // [[secondsIntoMonth, score, status, robokillerStatus, userReports, totalCalls, commentsCount], ...]
+  s: {
+    type: [[Number]],
+    default: []
+  },
+  n: {
+    type: Number,
+    default: 0
+  },
+  expireAt: Date
+}, {
+  collection: 'reputation_history',
+  versionKey: false
+});
+
+reputationHistorySchema.index({ d: 1, m: 1 }, { unique: true });
+// Whole months are dropped once past retention
+reputationHistorySchema.index({ expireAt: 1 }, { expireAfterSeconds: 0 });
+
+function monthKey(date) {
+  return date.getUTCFullYear() * 100 + date.getUTCMonth() + 1;
+}
+
+function unpackSample(month, sample) {
+  const row = {};
+  SAMPLE_FIELDS.forEach((field, i) => { row[field] = sample[i]; });
+  const monthStart = Date.UTC(Math.floor(month / 100), (month % 100) - 1, 1);
+  row.checkedAt = new Date(monthStart + row.t * 1000);
+  delete row.t;
+  row.status = STATUS_NAMES[row.status] || 'Unknown';
+  row.robokillerStatus = ROBOKILLER_NAMES[row.robokillerStatus] || 'Unknown';
+  return row;
+}
+
+// Static method to get a DID's reputation time series, oldest first
+reputationHistorySchema.statics.getSeries = async function(didId, { since } = {}) {
+  const query = { d: didId };
+  if (since) {
+    query.m = { $gte: monthKey(since) };
+  }
+
+  const buckets = await this.find(query, { m: 1, s: 1 }).sort({ m: 1 }).lean();
+
+  let series = buckets.flatMap(bucket => bucket.s.map(sample => unpackSample(bucket.m, sample)));
+  if (since) {
+    series = series.filter(row => row.checkedAt >= since);
+  }
+  return series.sort((a, b) => a.checkedAt - b.checkedAt);
+};
+
+const ReputationHistory = mongoose.model('ReputationHistory', reputationHistorySchema);
+
+export default ReputationHistory;
@@ -351,9 +351,12 @@ const tenantSchema = new mongoose.Schema({
       type: Date,
       default: Date.now
     },
-    usedDidsInCycle: [{
-      type: String
-    }]
+    // Rotation cycle sequence number. A DID has been used this cycle when its
+    // lastCycleId equals cycleId; starting a new cycle is one increment.
+    cycleId: {
+      type: Number,
+      default: 1
+    }
   },
   // ── Free Caller Registry (FCR) profile ────────────────────────────────
   // Business profile a customer pastes into the FCR submission form at
@@ -460,6 +463,30 @@ tenantSchema.statics.findByDomain = function(domain) {
   return this.findOne({ domain, isActive: true });
 };
 
+/**
+ * Start the tenant's next rotation cycle, unless another caller already has.
+ * Returns the rotationState now in effect either way.
+ */
+tenantSchema.statics.advanceRotationCycle = async function(tenantId, fromCycleId) {
+  // Tenants created before cycleId existed are on cycle 1
+  const current = fromCycleId === 1 ? { $in: [1, null] } : fromCycleId;
+  const advanced = await this.findOneAndUpdate(
+    { _id: tenantId, 'rotationState.cycleId': current },
+    {
+      $set: {
+        'rotationState.cycleId': fromCycleId + 1,
+        'rotationState.currentIndex': 0,
+        'rotationState.lastReset': new Date()
+      }
+    },
+    { new: true, projection: { rotationState: 1 } }
+  ).lean();
+  if (advanced) return advanced.rotationState;
+
+  const tenant = await this.findById(tenantId, { rotationState: 1 }).lean();
+  return tenant?.rotationState;
+};
+
 // Pre-save: PAYG/annual/enterprise all share generous limits — pricing is
 // per-DID, not gated by plan tier. We only auto-bump limits if migrating off
 // a legacy basic/professional plan, never auto-shrink.
@@ -126,7 +126,7 @@ router.get('/callback', async (req, res) => {
           lastUsed: null,
           permissions: ['read', 'write']
         }],
-        rotationState: { currentIndex: 0, lastReset: new Date(), usedDidsInCycle: [] }
+        rotationState: { currentIndex: 0, lastReset: new Date(), cycleId: 1 }
       });
       const savedTenant = await newTenant.save();
       console.log('✅ New tenant created via PayPal login:', savedTenant.name);
@@ -28,6 +28,7 @@ except ImportError:
 
 from playwright.async_api import async_playwright, Page, Browser
 from captcha_solver import CaptchaSolver, CloudflareBypasser, ChallengeAction
+from browser_pool import ContextPool, RequestPacer
 
 
 @dataclass
@@ -129,7 +130,9 @@ class AICrawler:
         headless: bool = True,
         max_challenge_attempts: int = 10,
         page_timeout: int = 30000,
-        save_screenshots: bool = False
+        save_screenshots: bool = False,
+        context_max_uses: int = 50,
+        context_idle_timeout: float = 120.0
     ):
         self.model_url = model_url
         self.model_name = model_name
@@ -137,11 +140,14 @@ class AICrawler:
         self.max_challenge_attempts = max_challenge_attempts
         self.page_timeout = page_timeout
         self.save_screenshots = save_screenshots
+        self.context_max_uses = context_max_uses
+        self.context_idle_timeout = context_idle_timeout
 
         self.solver: Optional[CaptchaSolver] = None
         self.bypasser: Optional[CloudflareBypasser] = None
         self.playwright = None
         self.browser: Optional[Browser] = None
+        self.pool: Optional[ContextPool] = None
 
     async def __aenter__(self):
         await self.start()
@@ -170,8 +176,18 @@ class AICrawler:
             args=StealthBrowser.get_stealth_args()
         )
 
+        # Stealth contexts are reused across fetches instead of built per URL
+        self.pool = ContextPool(
+            factory=lambda proxy: self._create_stealth_context(),
+            max_uses=self.context_max_uses,
+            idle_timeout=self.context_idle_timeout,
+            page_timeout=self.page_timeout
+        )
+
     async def close(self):
         """Clean up resources"""
+        if self.pool:
+            await self.pool.close()
         if self.browser:
             await self.browser.close()
         if self.playwright:
@@ -266,65 +282,64 @@ class AICrawler:
         Returns:
             CrawlResult with HTML and metadata
         """
-        context = await self._create_stealth_context()
-        page = await context.new_page()
-
         result = CrawlResult(url=url, html="", success=False)
 
-        try:
-            # Set page timeout
-            page.set_default_timeout(self.page_timeout)
+        async with self.pool.lease() as lease:
+            page = lease.page
+            try:
+                await self._fetch_page(page, url, wait_for, wait_timeout, result)
+            except Exception as e:
+                result.error = str(e)
+                print(f"Error fetching {url}: {e}")
 
-            # Navigate to URL
-            response = await page.goto(url, wait_until="domcontentloaded")
-            result.status_code = response.status if response else None
+            if not result.success:
+                lease.discard()
 
-            # Check for Cloudflare challenge
-            html = await page.content()
-
-            if self.bypasser.is_cloudflare_challenge(html):
-                print(f"Cloudflare challenge detected on {url}")
+        return result
 
-                # Take initial screenshot
-                if self.save_screenshots:
-                    result.screenshots.append(await page.screenshot(type='png'))
+    async def _fetch_page(self, page: Page, url: str, wait_for: Optional[str], wait_timeout: int,
+                          result: CrawlResult):
+        """Load url on a pooled page and fill in result"""
+        # Navigate to URL
+        response = await page.goto(url, wait_until="domcontentloaded")
+        result.status_code = response.status if response else None
 
-                # Attempt to solve
-                success = await self.bypasser.solve_challenge(page)
-                result.challenge_solved = success
-                result.attempts = len(self.bypasser.solver._actions if hasattr(self.bypasser.solver, '_actions') else [])
+        # Check for Cloudflare challenge
+        html = await page.content()
 
-                if not success:
-                    result.error = "Failed to solve Cloudflare challenge"
-                    return result
+        if self.bypasser.is_cloudflare_challenge(html):
+            print(f"Cloudflare challenge detected on {url}")
 
-            # Wait for additional content if specified
-            if wait_for:
-                try:
-                    await page.wait_for_selector(wait_for, timeout=wait_timeout)
-                except Exception as e:
-                    print(f"Warning: wait_for selector not found: {e}")
+            # Take initial screenshot
+            if self.save_screenshots:
+                result.screenshots.append(await page.screenshot(type='png'))
 
-            # Add small delay for dynamic content
-            await asyncio.sleep(0.5)
+            # Attempt to solve
+            success = await self.bypasser.solve_challenge(page)
+            result.challenge_solved = success
+            result.attempts = len(self.bypasser.solver._actions if hasattr(self.bypasser.solver, '_actions') else [])
 
-            # Get final HTML
-            result.html = await page.content()
-            result.success = True
+            if not success:
+                result.error = "Failed to solve Cloudflare challenge"
+                return
 
-            # Final screenshot
-            if self.save_screenshots:
-                result.screenshots.append(await page.screenshot(type='png'))
+        # Wait for additional content if specified
+        if wait_for:
+            try:
+                await page.wait_for_selector(wait_for, timeout=wait_timeout)
+            except Exception as e:
+                print(f"Warning: wait_for selector not found: {e}")
 
-        except Exception as e:
-            result.error = str(e)
-            print(f"Error fetching {url}: {e}")
+        # Add small delay for dynamic content
+        await asyncio.sleep(0.5)
 
-        finally:
-            await page.close()
-            await context.close()
+        # Get final HTML
+        result.html = await page.content()
+        result.success = True
 
-        return result
+        # Final screenshot
+        if self.save_screenshots:
+            result.screenshots.append(await page.screenshot(type='png'))
 
     async def fetch_multiple(
         self,
@@ -338,24 +353,22 @@ class AICrawler:
         Args:
             urls: List of URLs to fetch
             concurrency: Max concurrent requests
-            delay_between: Delay between requests in seconds
+            delay_between: Minimum spacing between request starts in seconds
 
         Returns:
             List of CrawlResults
         """
         semaphore = asyncio.Semaphore(concurrency)
+        pacer = RequestPacer(delay_between)
         results = []
 
-        async def fetch_with_limit(url: str, index: int) -> CrawlResult:
+        async def fetch_with_limit(url: str) -> CrawlResult:
+            # Pace first, then take a slot: slots are only held while fetching
+            await pacer.wait()
             async with semaphore:
-                if index > 0:
-                    await asyncio.sleep(delay_between)
                 return await self.fetch(url)
 
-        tasks = [
-            fetch_with_limit(url, i)
-            for i, url in enumerate(urls)
-        ]
+        tasks = [fetch_with_limit(url) for url in urls]
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
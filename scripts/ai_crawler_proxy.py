@@ -35,6 +35,7 @@ import httpx
 import sys
 sys.path.insert(0, str(Path(__file__).parent))
 from captcha_solver import CaptchaSolver, CloudflareBypasser
+from browser_pool import ContextPool
 
 
 @dataclass
@@ -212,6 +213,7 @@ class ProxyCrawler:
     - Rotating proxy support
     - Consistent fingerprinting per session
     - Cookie persistence
+    - Browser contexts pooled per proxy and reused across fetches
     - Cloudflare bypass with AI
     """
 
@@ -225,6 +227,8 @@ class ProxyCrawler:
         max_challenge_attempts: int = 15,
         page_timeout: int = 60000,
         rotate_fingerprint: bool = False,
+        context_max_uses: int = 50,
+        context_idle_timeout: float = 120.0,
     ):
         self.proxy = proxy
         self.proxies = proxies or []
@@ -237,11 +241,14 @@ class ProxyCrawler:
         self.max_challenge_attempts = max_challenge_attempts
         self.page_timeout = page_timeout
         self.rotate_fingerprint = rotate_fingerprint
+        self.context_max_uses = context_max_uses
+        self.context_idle_timeout = context_idle_timeout
 
         self.solver: Optional[CaptchaSolver] = None
         self.bypasser: Optional[CloudflareBypasser] = None
         self.playwright = None
         self.browser: Optional[Browser] = None
+        self.pool: Optional[ContextPool] = None
 
         # Session persistence
         self.fingerprint = BrowserFingerprint.get_random()
@@ -307,8 +314,18 @@ class ProxyCrawler:
             args=args
         )
 
+        # One pool per proxy: a context is bound to its proxy at creation
+        self.pool = ContextPool(
+            factory=self._create_context,
+            max_uses=self.context_max_uses,
+            idle_timeout=self.context_idle_timeout,
+            page_timeout=self.page_timeout
+        )
+
     async def close(self):
         """Clean up resources"""
+        if self.pool:
+            await self.pool.close()
         if self.browser:
             await self.browser.close()
         if self.playwright:
@@ -421,71 +438,64 @@ class ProxyCrawler:
             result.proxy_used = proxy
             result.attempts = attempt + 1
 
-            context = await self._create_context(proxy)
-            page = await context.new_page()
-            page.set_default_timeout(self.page_timeout)
-
-            try:
-                response = await page.goto(url, wait_until="domcontentloaded")
-                result.status_code = response.status if response else None
-
-                # Wait for any dynamic content
-                await asyncio.sleep(2)
-
-                html = await page.content()
-
-                # Check for hard block
-                if self._is_blocked(html):
-                    result.blocked = True
-                    print(f"Attempt {attempt + 1}: Hard blocked" +
-                          (f" with proxy {proxy}" if proxy else ""))
-                    if retry_on_block and attempt < max_retries - 1:
-                        await page.close()
-                        await context.close()
-                        continue
-                    else:
-                        result.html = html
-                        result.error = "IP blocked by Cloudflare"
-                        break
-
-                # Check for solvable challenge
-                if self._is_challenge(html):
-                    print(f"Challenge detected, attempting to solve...")
-                    success = await self.bypasser.solve_challenge(page)
-                    result.challenge_solved = success
-
-                    if not success:
-                        result.error = "Failed to solve challenge"
-                        if retry_on_block and attempt < max_retries - 1:
-                            await page.close()
-                            await context.close()
-                            continue
-
-                # Wait for additional selector if specified
-                if wait_for:
-                    try:
-                        await page.wait_for_selector(wait_for, timeout=10000)
-                    except:
-                        pass
+            async with self.pool.lease(proxy) as lease:
+                page = lease.page
+                try:
+                    response = await page.goto(url, wait_until="domcontentloaded")
+                    result.status_code = response.status if response else None
 
-                # Get final content
-                result.html = await page.content()
-                result.success = True
+                    # Wait for any dynamic content
+                    await asyncio.sleep(2)
 
-                # Save cookies
-                cookies = await context.cookies()
-                for cookie in cookies:
-                    self.cookies[cookie["name"]] = cookie
+                    html = await page.content()
 
-                break
-
-            except Exception as e:
-                result.error = str(e)
-                print(f"Attempt {attempt + 1} error: {e}")
-
-            finally:
-                await page.close()
-                await context.close()
+                    # Check for hard block
+                    if self._is_blocked(html):
+                        result.blocked = True
+                        lease.discard()
+                        print(f"Attempt {attempt + 1}: Hard blocked" +
+                              (f" with proxy {proxy}" if proxy else ""))
+                        if retry_on_block and attempt < max_retries - 1:
+                            continue
+                        else:
+                            result.html = html
+                            result.error = "IP blocked by Cloudflare"
+                            break
+
+                    # Check for solvable challenge
+                    if self._is_challenge(html):
+                        print(f"Challenge detected, attempting to solve...")
+                        success = await self.bypasser.solve_challenge(page)
+                        result.challenge_solved = success
+
+                        if not success:
+                            result.error = "Failed to solve challenge"
+                            lease.discard()
+                            if retry_on_block and attempt < max_retries - 1:
+                                continue
+
+                    # Wait for additional selector if specified
+                    if wait_for:
+                        try:
+                            await page.wait_for_selector(wait_for, timeout=10000)
+                        except:
+                            pass
+
+                    # Get final content
+                    result.html = await page.content()
+                    result.success = True
+
+                    # Save cookies
+                    cookies = await lease.context.cookies()
+                    for cookie in cookies:
+                        self.cookies[cookie["name"]] = cookie
+
+                    break
+
+                except Exception as e:
+                    result.error = str(e)
+                    lease.discard()
+                    print(f"Attempt {attempt + 1} error: {e}")
 
         return result
 
@@ -16,11 +16,45 @@ import asyncio
 import json
 import sys
 from pathlib import Path
+from typing import List
 
 sys.path.insert(0, str(Path(__file__).parent))
 
 from ai_crawler import AICrawler
 
+# Selector mode parses the fetched HTML in-process; selectolax is fastest,
+# BeautifulSoup (installed alongside crawl4ai) is the fallback
+try:
+    from selectolax.parser import HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    from bs4 import BeautifulSoup
+    BS4_AVAILABLE = True
+except ImportError:
+    BS4_AVAILABLE = False
+
+# Not part of the visible text, same as innerText
+NON_TEXT_TAGS = ('script', 'style', 'noscript', 'template')
+
+
+def extract_selector(html: str, selector: str) -> List[str]:
+    """Stripped text of every element matching a CSS selector"""
+    if SELECTOLAX_AVAILABLE:
+        tree = HTMLParser(html)
+        tree.strip_tags(list(NON_TEXT_TAGS))
+        return [node.text(deep=True).strip() for node in tree.css(selector)]
+
+    if BS4_AVAILABLE:
+        soup = BeautifulSoup(html, 'html.parser')
+        for tag in soup(NON_TEXT_TAGS):
+            tag.decompose()
+        return [el.get_text().strip() for el in soup.select(selector)]
+
+    raise RuntimeError("selector extraction needs selectolax or beautifulsoup4 (pip install selectolax)")
+
 
 async def scrape(
     url: str,
@@ -67,26 +101,12 @@ async def scrape(
         result_data["challenge_solved"] = result.challenge_solved
         result_data["error"] = result.error
 
-        # Extract specific content if selector provided
-        if selector and result.success:
-            from playwright.async_api import async_playwright
-
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-                await page.set_content(result.html)
-
-                try:
-                    elements = await page.query_selector_all(selector)
-                    extracted = []
-                    for el in elements:
-                        text = await el.inner_text()
-                        extracted.append(text.strip())
-                    result_data["extracted"] = extracted
-                except Exception as e:
-                    result_data["extracted"] = f"Error extracting: {e}"
-
-                await browser.close()
+    # Extract specific content if selector provided
+    if selector and result_data["success"]:
+        try:
+            result_data["extracted"] = extract_selector(result_data["html"], selector)
+        except Exception as e:
+            result_data["extracted"] = f"Error extracting: {e}"
 
     # Output handling
     if output:
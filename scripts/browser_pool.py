@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Browser Context Pool and Request Pacing
+
+Creating a BrowserContext, running its init scripts and opening a page costs
+more than many of the fetches made with it. ContextPool keeps idle
+context+page pairs per proxy and hands them out again until they hit
+max_uses or sit idle longer than idle_timeout. Contexts that saw a block,
+a failed challenge or an exception are discarded instead of returned.
+
+RequestPacer spaces out request starts without holding a concurrency slot
+while it waits.
+
+Usage:
+    pool = ContextPool(factory=self._create_context, max_uses=50, idle_timeout=120)
+
+    async with pool.lease(proxy) as lease:
+        await lease.page.goto(url)
+        if blocked:
+            lease.discard()
+
+    await pool.close()
+"""
+
+import asyncio
+import contextlib
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+DIRECT = 'direct'
+
+
+class PooledContext:
+    """A context and its page, plus usage bookkeeping"""
+
+    __slots__ = ('key', 'context', 'page', 'uses', 'created_at', 'last_used', 'healthy')
+
+    def __init__(self, key: str, context, page):
+        self.key = key
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.healthy = True
+
+    def discard(self):
+        """Do not return this context to the pool (blocked, challenged, broken)"""
+        self.healthy = False
+
+
+class ContextPool:
+    """Idle BrowserContext/Page pairs keyed by proxy, recycled by use count and idle time"""
+
+    def __init__(self, factory: Callable[[Optional[str]], Awaitable], max_uses: int = 50,
+                 idle_timeout: float = 120.0, max_idle_per_key: int = 4, page_timeout: Optional[int] = None):
+        self.factory = factory
+        self.max_uses = max_uses
+        self.idle_timeout = idle_timeout
+        self.max_idle_per_key = max_idle_per_key
+        self.page_timeout = page_timeout
+
+        self.idle: Dict[str, List[PooledContext]] = {}
+        self.stats = {'created': 0, 'reused': 0, 'recycled': 0, 'discarded': 0}
+
+    async def acquire(self, proxy: Optional[str] = None) -> PooledContext:
+        key = proxy or DIRECT
+        now = time.monotonic()
+        entries = self.idle.get(key, [])
+
+        while entries:
+            # Most recently used first: its cookies and connections are the freshest
+            entry = entries.pop()
+            if now - entry.last_used <= self.idle_timeout and not entry.page.is_closed():
+                self.stats['reused'] += 1
+                return entry
+            self.stats['recycled'] += 1
+            await self._close(entry)
+
+        context = await self.factory(proxy)
+        page = await context.new_page()
+        if self.page_timeout:
+            page.set_default_timeout(self.page_timeout)
+        self.stats['created'] += 1
+        return PooledContext(key, context, page)
+
+    async def release(self, entry: PooledContext):
+        entry.uses += 1
+        entry.last_used = time.monotonic()
+
+        if not entry.healthy:
+            self.stats['discarded'] += 1
+            await self._close(entry)
+            return
+
+        entries = self.idle.setdefault(entry.key, [])
+        if entry.uses >= self.max_uses or len(entries) >= self.max_idle_per_key:
+            self.stats['recycled'] += 1
+            await self._close(entry)
+            return
+        entries.append(entry)
+
+    @contextlib.asynccontextmanager
+    async def lease(self, proxy: Optional[str] = None):
+        """Acquire a context for one fetch; exceptions discard it"""
+        entry = await self.acquire(proxy)
+        try:
+            yield entry
+        except BaseException:
+            entry.discard()
+            raise
+        finally:
+            await self.release(entry)
+
+    async def _close(self, entry: PooledContext):
+        try:
+            await entry.page.close()
+            await entry.context.close()
+        except Exception:
+            pass
+
+    async def close(self):
+        for entries in self.idle.values():
+            for entry in entries:
+                await self._close(entry)
+        self.idle.clear()
+
+
+class RequestPacer:
+    """Hands out request start times at least `interval` seconds apart.
+
+    Callers wait for their start time before taking a concurrency slot, so a
+    slot is never held just to sleep.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_start = 0.0
+
+    async def wait(self):
+        if self.interval <= 0:
+            return
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
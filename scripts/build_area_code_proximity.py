@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Area Code Proximity Table Builder
+
+Geographic DID matching needs "which NPAs are closest to this one, and how
+far". AreaCodeLocation.calculateDistance / findNearbyAreaCodes answer that
+with a haversine aggregation over the whole collection on every call. The set
+of NPAs changes a few times a year, so this job computes it once:
+
+  1. loads every AreaCodeLocation row plus ca-area-codes.csv
+  2. reduces each NPA to one point (the spherical mean of its cities)
+  3. computes the full NPA x NPA haversine matrix with NumPy
+  4. writes the K nearest neighbours of each NPA, with distances in miles,
+     to a JSON file that services/area-code-proximity.js loads into memory
+
+Re-run it after importing area codes (scripts/import-area-codes.js,
+patch-missing-npas.mjs); the API server picks the new file up on restart.
+
+Environment:
+- AREA_CODE_PROXIMITY_PATH  Output file (default: data/area-code-proximity.json)
+- PROXIMITY_TOP_K           Neighbours kept per NPA (default: 50)
+- MONGODB_URI               As for bulk_update_reputation.py
+
+Usage:
+  python3 build_area_code_proximity.py
+  python3 build_area_code_proximity.py --k 100 --csv ../ca-area-codes.csv
+  python3 build_area_code_proximity.py --no-db      # CSV only
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import bulk_update_reputation as updater  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+AREA_CODE_PROXIMITY_PATH = os.getenv(
+    'AREA_CODE_PROXIMITY_PATH', os.path.join(REPO_ROOT, 'data', 'area-code-proximity.json'))
+PROXIMITY_TOP_K = int(os.getenv('PROXIMITY_TOP_K', '50'))
+CA_AREA_CODES_CSV = os.path.join(REPO_ROOT, 'ca-area-codes.csv')
+
+# Same radius as the Mongo aggregations and DID.calculateDistance
+EARTH_RADIUS_MILES = 3959
+
+ARTIFACT_VERSION = 1
+
+
+async def load_db_rows():
+    """AreaCodeLocation rows as (areaCode, city, state, country, lat, lng)"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(updater.MONGODB_URI)
+    db = client.get_default_database()
+    rows = []
+    try:
+        cursor = db.areacodelocations.find(
+            {}, {'areaCode': 1, 'city': 1, 'state': 1, 'country': 1, 'location.coordinates': 1, '_id': 0})
+        async for doc in cursor:
+            coordinates = (doc.get('location') or {}).get('coordinates') or []
+            if len(coordinates) != 2:
+                continue
+            rows.append((doc.get('areaCode'), doc.get('city'), doc.get('state'),
+                         doc.get('country') or 'US', coordinates[1], coordinates[0]))
+    finally:
+        client.close()
+    return rows
+
+
+def load_csv_rows(path):
+    """Rows of an area code CSV (areaCode,city,state,country,lat,lng; no header)"""
+    rows = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for record in csv.reader(f):
+            if len(record) < 6:
+                continue
+            area_code, city, state, country, lat, lng = (field.strip() for field in record[:6])
+            try:
+                rows.append((area_code, city, state, country or 'US', float(lat), float(lng)))
+            except ValueError:
+                continue
+    return rows
+
+
+def group_by_area_code(rows):
+    """{areaCode: {'cities': [...], 'states': Counter, 'countries': Counter, 'points': [(lat, lng)]}}"""
+    groups = {}
+    seen = set()
+    for area_code, city, state, country, lat, lng in rows:
+        if not (area_code and len(area_code) == 3 and area_code.isdigit()):
+            continue
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            continue
+        # The CSV and the collection overlap for Canadian NPAs
+        key = (area_code, city, state, round(lat, 4), round(lng, 4))
+        if key in seen:
+            continue
+        seen.add(key)
+        group = groups.setdefault(area_code, {
+            'cities': [], 'states': Counter(), 'countries': Counter(), 'points': []})
+        group['cities'].append(city)
+        group['states'][state] += 1
+        group['countries'][country] += 1
+        group['points'].append((lat, lng))
+    return groups
+
+
+def centroids(groups, codes):
+    """Spherical mean (lat, lng) in degrees of each NPA's cities, as two arrays"""
+    import numpy as np
+
+    lat = np.empty(len(codes))
+    lng = np.empty(len(codes))
+    for i, code in enumerate(codes):
+        points = np.radians(np.asarray(groups[code]['points'], dtype=np.float64))
+        x = np.cos(points[:, 0]) * np.cos(points[:, 1])
+        y = np.cos(points[:, 0]) * np.sin(points[:, 1])
+        z = np.sin(points[:, 0])
+        lat[i] = np.degrees(np.arctan2(z.mean(), np.hypot(x.mean(), y.mean())))
+        lng[i] = np.degrees(np.arctan2(y.mean(), x.mean()))
+    return lat, lng
+
+
+def haversine_matrix(lat, lng):
+    """N x N great-circle distances in miles between points given in degrees"""
+    import numpy as np
+
+    phi = np.radians(lat)
+    lam = np.radians(lng)
+    d_phi = phi[:, None] - phi[None, :]
+    d_lam = lam[:, None] - lam[None, :]
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi)[:, None] * np.cos(phi)[None, :] * np.sin(d_lam / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def top_k(distances, k):
+    """(indexes, distances) of the k nearest other points per row, nearest first"""
+    import numpy as np
+
+    n = distances.shape[0]
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.int64), np.empty((n, 0))
+
+    masked = distances.copy()
+    np.fill_diagonal(masked, np.inf)
+    nearest = np.argpartition(masked, k - 1, axis=1)[:, :k]
+    nearest_distances = np.take_along_axis(masked, nearest, axis=1)
+    order = np.argsort(nearest_distances, axis=1, kind='stable')
+    return np.take_along_axis(nearest, order, axis=1), np.take_along_axis(nearest_distances, order, axis=1)
+
+
+def build_artifact(rows, k):
+    """The JSON document services/area-code-proximity.js loads"""
+    import numpy as np
+
+    groups = group_by_area_code(rows)
+    codes = sorted(groups)
+    lat, lng = centroids(groups, codes)
+    distances = haversine_matrix(lat, lng)
+    neighbours, neighbour_distances = top_k(distances, k)
+
+    return {
+        'version': ARTIFACT_VERSION,
+        'generatedAt': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'k': int(neighbours.shape[1]),
+        'areaCodes': codes,
+        'state': [groups[c]['states'].most_common(1)[0][0] for c in codes],
+        'country': [groups[c]['countries'].most_common(1)[0][0] for c in codes],
+        'city': [groups[c]['cities'][0] for c in codes],
+        'cities': [len(groups[c]['points']) for c in codes],
+        'lat': np.round(lat, 5).tolist(),
+        'lng': np.round(lng, 5).tolist(),
+        # Row i: indexes into areaCodes, nearest first, and their distances in miles
+        'neighbours': neighbours.tolist(),
+        'distances': np.round(neighbour_distances, 1).tolist(),
+    }
+
+
+def write_artifact(artifact, path):
+    """Write atomically so a server starting meanwhile never reads half a file"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+async def main(args):
+    rows = []
+    if not args.no_db:
+        db_rows = await load_db_rows()
+        print(f"📥 AreaCodeLocation rows: {len(db_rows)}")
+        rows.extend(db_rows)
+    if args.csv and os.path.exists(args.csv):
+        csv_rows = load_csv_rows(args.csv)
+        print(f"📥 {os.path.basename(args.csv)} rows: {len(csv_rows)}")
+        rows.extend(csv_rows)
+
+    if not rows:
+        print("❌ No area code locations found")
+        return 1
+
+    artifact = build_artifact(rows, args.k)
+    write_artifact(artifact, args.output)
+
+    size_kb = os.path.getsize(args.output) / 1024
+    print(f"✅ {len(artifact['areaCodes'])} NPAs, {artifact['k']} neighbours each -> {args.output} ({size_kb:.0f} KB)")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the area code nearest-neighbour table')
+    parser.add_argument('--k', type=int, default=PROXIMITY_TOP_K,
+                        help=f'Neighbours kept per NPA (default: {PROXIMITY_TOP_K})')
+    parser.add_argument('--csv', default=CA_AREA_CODES_CSV,
+                        help='Extra area code CSV merged with the collection (default: ca-area-codes.csv)')
+    parser.add_argument('--output', default=AREA_CODE_PROXIMITY_PATH,
+                        help='Output JSON file (default: data/area-code-proximity.json)')
+    parser.add_argument('--no-db', action='store_true',
+                        help='Build from the CSV only, without MongoDB')
+    args = parser.parse_args()
+
+    updater.load_env()
+
+    sys.exit(asyncio.run(main(args)))
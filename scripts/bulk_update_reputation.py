@@ -10,6 +10,8 @@ Usage:
   python3 bulk_update_reputation.py --force            # Force update ALL active DIDs
   python3 bulk_update_reputation.py --limit 1000       # Limit to 1000 DIDs
   python3 bulk_update_reputation.py --concurrency 30   # Set concurrency level
+  python3 bulk_update_reputation.py --no-proxy         # Scrape directly (benchmarks/local stand-in)
+  python3 bulk_update_reputation.py --profile-startup  # Import-time breakdown
 """
 
 import asyncio
@@ -20,15 +22,16 @@ import sys
 import re
 import random
 from datetime import datetime, timedelta
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
 
 # Add scripts directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from fast_robokiller_scraper import scrape_single, get_random_headers, BROWSER_PROFILES
+from proxy_pools import ProxyConnectionManager
+from reputation_history import ReputationHistoryWriter
 
-# Load environment variables
-load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
+# motor and dotenv are imported once arguments are parsed (load_env / bulk_update),
+# so --help and --profile-startup do not pay for them
+LAZY_IMPORTS = ('motor.motor_asyncio', 'dotenv')
 
 # MongoDB connection
 MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://127.0.0.1:27017/did_optimizer')
@@ -37,6 +40,16 @@ MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://127.0.0.1:27017/did_optimizer'
 WEBSHARE_API_KEY = os.getenv('WEBSHARE_API_KEY', 'qcv48genia4yzeayykuh4qzvqusywmbgko6k2ppv')
 
 
+def load_env():
+    """Load ../.env and refresh the settings that come from it"""
+    global MONGODB_URI, WEBSHARE_API_KEY
+    from dotenv import load_dotenv
+
+    load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
+    MONGODB_URI = os.getenv('MONGODB_URI', MONGODB_URI)
+    WEBSHARE_API_KEY = os.getenv('WEBSHARE_API_KEY', WEBSHARE_API_KEY)
+
+
 class ProxyRotator:
     """Smart proxy rotation with health tracking"""
 
@@ -90,6 +103,37 @@ class ProxyRotator:
         return sum(1 for s in self.proxy_stats.values() if s['blocked'] < 3)
 
 
+# Re-check intervals by reputation status, same as ReputationService.checkInterval
+CHECK_INTERVALS = {
+    'Positive': timedelta(hours=24),
+    'Neutral': timedelta(hours=12),
+    'Negative': timedelta(days=7),
+}
+
+
+def phone_key(phone):
+    """Canonical 10-digit phone, the form stored in DID.phoneKey"""
+    digits = re.sub(r'\D', '', phone or '')
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    return digits
+
+
+async def flush_did_updates(db, did_updates):
+    """Apply buffered per-DID $set updates with one unordered bulk_write"""
+    if not did_updates:
+        return 0
+    from pymongo import UpdateOne
+
+    pending = did_updates[:]
+    did_updates.clear()
+    result = await db.dids.bulk_write(
+        [UpdateOne({'_id': did_id}, {'$set': fields}) for did_id, fields in pending],
+        ordered=False
+    )
+    return result.modified_count
+
+
 def calculate_score(data):
     """Calculate reputation score from scraped data"""
     score = 50  # Base score
@@ -123,10 +167,10 @@ def calculate_score(data):
     return max(0, min(100, score))
 
 
-async def update_single_did(session, db, did, proxy_rotator):
-    """Scrape and update a single DID"""
+async def update_single_did(pools, did, proxy_rotator, did_updates, history=None):
+    """Scrape a single DID and buffer its update for the batch bulk_write"""
     phone = did.get('phoneNumber', '')
-    clean_number = re.sub(r'\D', '', phone)
+    clean_number = phone_key(phone)
 
     if len(clean_number) < 10:
         return {'success': False, 'phone': phone, 'error': 'Invalid phone number'}
@@ -135,18 +179,21 @@ async def update_single_did(session, db, did, proxy_rotator):
     proxy = proxy_rotator.get_random_proxy() if proxy_rotator else None
     proxy_url = proxy['url'] if proxy else None
 
-    # Scrape
-    result = await scrape_single(session, clean_number, proxy_url)
+    # Scrape through the proxy's own keep-alive pool
+    result = await scrape_single(pools.session_for(proxy_url), clean_number, proxy_url)
 
     if result.get('success') and result.get('data'):
         data = result['data']
         score = calculate_score(data)
+        checked_at = datetime.utcnow()
 
-        # Update MongoDB
+        # Written by exact _id in the batch bulk_write (flush_did_updates)
         update_data = {
+            'phoneKey': clean_number,
             'reputation.score': score,
             'reputation.status': data.get('reputationStatus', 'Unknown'),
-            'reputation.lastChecked': datetime.utcnow(),
+            'reputation.lastChecked': checked_at,
+            'reputation.nextCheckDue': checked_at + CHECK_INTERVALS.get(data.get('reputationStatus'), CHECK_INTERVALS['Neutral']),
             'reputation.robokillerData': {
                 'userReports': data.get('userReports', 0),
                 'reputationStatus': data.get('reputationStatus', 'Unknown'),
@@ -157,13 +204,14 @@ async def update_single_did(session, db, did, proxy_rotator):
                 'callerName': data.get('callerName'),
                 'commentsCount': data.get('commentsCount', 0)
             },
-            'updatedAt': datetime.utcnow()
+            'updatedAt': checked_at
         }
 
-        await db.dids.update_one(
-            {'_id': did['_id']},
-            {'$set': update_data}
-        )
+        did_updates.append((did['_id'], update_data))
+
+        # Appended to reputation_history in bulk once the batch is done
+        if history:
+            history.add(did['_id'], data, score, checked_at)
 
         if proxy_url:
             proxy_rotator.mark_success(proxy_url)
@@ -185,26 +233,30 @@ async def update_single_did(session, db, did, proxy_rotator):
         }
 
 
-async def bulk_update(force=False, limit=None, concurrency=50):
+async def bulk_update(force=False, limit=None, concurrency=50, use_proxies=True):
     """Main bulk update function"""
     print(f"\n{'='*70}")
     print("FAST BULK REPUTATION UPDATER")
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*70}\n")
 
+    from motor.motor_asyncio import AsyncIOMotorClient
+
     # Connect to MongoDB
     print("Connecting to MongoDB...")
     client = AsyncIOMotorClient(MONGODB_URI)
     db = client.get_default_database()
 
     # Load proxies
-    print("Loading proxies...")
-    proxy_rotator = ProxyRotator()
-    await proxy_rotator.load_proxies()
+    proxy_rotator = None
+    if use_proxies:
+        print("Loading proxies...")
+        proxy_rotator = ProxyRotator()
+        await proxy_rotator.load_proxies()
 
-    if not proxy_rotator.proxies:
-        print("WARNING: No proxies available, running without proxies")
-        proxy_rotator = None
+        if not proxy_rotator.proxies:
+            print("WARNING: No proxies available, running without proxies")
+            proxy_rotator = None
 
     # Build query
     query = {'isActive': True}
@@ -236,16 +288,20 @@ async def bulk_update(force=False, limit=None, concurrency=50):
 
     # Process in batches
     batch_size = concurrency * 2
-    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=10)
-    timeout = aiohttp.ClientTimeout(total=30)
+    pools = ProxyConnectionManager(timeout=aiohttp.ClientTimeout(total=30), direct_pool_size=concurrency)
+    history = ReputationHistoryWriter(db)
+    await history.ensure_indexes()
+    did_updates = []
 
-    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+    try:
         for i in range(0, total_dids, batch_size):
             batch = dids[i:i + batch_size]
 
             # Process batch
-            tasks = [update_single_did(session, db, did, proxy_rotator) for did in batch]
+            tasks = [update_single_did(pools, did, proxy_rotator, did_updates, history) for did in batch]
             results = await asyncio.gather(*tasks, return_exceptions=True)
+            await flush_did_updates(db, did_updates)
+            await history.flush()
 
             # Count results
             batch_success = 0
@@ -268,7 +324,12 @@ async def bulk_update(force=False, limit=None, concurrency=50):
             proxy_health = f" | Proxies: {proxy_rotator.get_healthy_count()}/{len(proxy_rotator.proxies)}" if proxy_rotator else ""
 
             print(f"[{done:5d}/{total_dids}] OK:{batch_success:3d} FAIL:{batch_fail:3d} | "
-                  f"Total: {successful}/{done} | Rate: {rate:.1f}/s{proxy_health}")
+                  f"Total: {successful}/{done} | Rate: {rate:.1f}/s{proxy_health} | "
+                  f"Reuse: {pools.stats()['reuse_ratio']:.0%}")
+    finally:
+        await pools.close()
+        await flush_did_updates(db, did_updates)
+        await history.flush()
 
     # Final stats
     total_time = (datetime.now() - start_time).total_seconds()
@@ -281,6 +342,12 @@ async def bulk_update(force=False, limit=None, concurrency=50):
     print(f"Failed:          {failed} ({failed/total_dids*100:.1f}%)")
     print(f"Total time:      {total_time:.1f}s ({total_time/60:.1f} min)")
     print(f"Average rate:    {total_dids/total_time:.1f} DIDs/sec")
+    pool_stats = pools.stats()
+    print(f"Connections:     {pool_stats['new_connections']} new, {pool_stats['reused_connections']} reused "
+          f"({pool_stats['reuse_ratio']:.1%} reuse) across {pool_stats['pools_opened']} proxy pools")
+    if pool_stats['handshake_ms_avg'] is not None:
+        print(f"Handshake time:  {pool_stats['handshake_ms_avg']} ms avg, {pool_stats['handshake_ms_p95']} ms p95")
+    print(f"History:         {history.stats['samples']} samples in {history.stats['flushes']} bulk writes")
     print(f"{'='*70}\n")
 
     # Get final reputation stats
@@ -306,6 +373,17 @@ if __name__ == '__main__':
                         help='Limit number of DIDs to update')
     parser.add_argument('--concurrency', '-c', type=int, default=50,
                         help='Number of concurrent requests (default: 50)')
+    parser.add_argument('--no-proxy', action='store_true',
+                        help='Skip Webshare proxies and scrape directly')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Print an import-time breakdown and exit')
     args = parser.parse_args()
 
-    asyncio.run(bulk_update(args.force, args.limit, args.concurrency))
+    if args.profile_startup:
+        from startup_profile import print_startup_profile
+        print_startup_profile(__file__, LAZY_IMPORTS)
+        sys.exit(0)
+
+    load_env()
+
+    asyncio.run(bulk_update(args.force, args.limit, args.concurrency, use_proxies=not args.no_proxy))
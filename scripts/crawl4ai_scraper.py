@@ -95,9 +95,9 @@ def extract_with_regex(html_content):
 
     # Extract reputation status
     reputation_patterns = [
-        r'reputation["']?\s*[:-]\s*["']?(positive|negative|neutral)',
-        r'class=["']reputation["'][^>]*>\s*(positive|negative|neutral)',
-        r'reputation-value["'][^>]*>\s*(positive|negative|neutral)'
+        r'reputation["\']?\s*[:-]\s*["\']?(positive|negative|neutral)',
+        r'class=["\']reputation["\'][^>]*>\s*(positive|negative|neutral)',
+        r'reputation-value["\'][^>]*>\s*(positive|negative|neutral)'
     ]
 
     for pattern in reputation_patterns:
@@ -109,9 +109,9 @@ def extract_with_regex(html_content):
 
     # Extract RoboKiller status
     status_patterns = [
-        r'robokiller["']?\s*[:-]\s*["']?(allowed|blocked)',
-        r'status["']?\s*[:-]\s*["']?(allowed|blocked)',
-        r'class=["']status["'][^>]*>\s*(allowed|blocked)'
+        r'robokiller["\']?\s*[:-]\s*["\']?(allowed|blocked)',
+        r'status["\']?\s*[:-]\s*["\']?(allowed|blocked)',
+        r'class=["\']status["\'][^>]*>\s*(allowed|blocked)'
     ]
 
     for pattern in status_patterns:
@@ -123,8 +123,8 @@ def extract_with_regex(html_content):
 
     # Extract user reports
     reports_patterns = [
-        r'user[\s\-]?reports?["']?\s*[:-]\s*["']?(\d+)',
-        r'reports?["']?\s*[:-]\s*["']?(\d+)',
+        r'user[\s\-]?reports?["\']?\s*[:-]\s*["\']?(\d+)',
+        r'reports?["\']?\s*[:-]\s*["\']?(\d+)',
         r'(\d+)\s*reports?'
     ]
 
@@ -136,8 +136,8 @@ def extract_with_regex(html_content):
 
     # Extract total calls
     calls_patterns = [
-        r'total[\s\-]?calls?["']?\s*[:-]\s*["']?(\d+)',
-        r'calls?["']?\s*[:-]\s*["']?(\d+)',
+        r'total[\s\-]?calls?["\']?\s*[:-]\s*["\']?(\d+)',
+        r'calls?["\']?\s*[:-]\s*["\']?(\d+)',
         r'(\d+)\s*calls?'
     ]
 
@@ -149,7 +149,7 @@ def extract_with_regex(html_content):
 
     # Extract last call date
     date_patterns = [
-        r'last[\s\-]?call["']?\s*[:-]\s*["']?([^<>"\n]+)',
+        r'last[\s\-]?call["\']?\s*[:-]\s*["\']?([^<>"\n]+)',
         r'(\w+\s+\d+,\s+\d{4})',
         r'(\d{1,2}/\d{1,2}/\d{2,4})'
     ]
@@ -162,7 +162,7 @@ def extract_with_regex(html_content):
 
     # Extract spam score
     spam_patterns = [
-        r'spam[\s\-]?score["']?\s*[:-]\s*["']?(\d+)',
+        r'spam[\s\-]?score["\']?\s*[:-]\s*["\']?(\d+)',
         r'(\d+)%?\s*spam'
     ]
 
@@ -5,9 +5,17 @@ import sys
 import re
 import os
 import logging
-import requests
-from crawl4ai import AsyncWebCrawler
-from playwright.async_api import async_playwright
+from llm_cache import get_extraction_cache
+from page_load import block_resources, goto_and_wait, dismiss_consent, ROBOKILLER_ANCHORS
+from screenshot_pipeline import ScreenshotPipeline
+
+# playwright and requests are imported inside the functions that use them:
+# Node spawns this script per lookup, and each of them costs more to import
+# than the rest of the module put together (see --profile-startup).
+LAZY_IMPORTS = ('playwright.async_api', 'requests')
+
+# Bump when the text extraction prompt changes so stale cached results are not reused
+TEXT_PROMPT_VERSION = 'robokiller-text-v1'
 
 # Suppress Crawl4AI logs completely to avoid stdout pollution
 logging.getLogger('crawl4ai').setLevel(logging.CRITICAL)
@@ -76,6 +84,8 @@ def save_screenshot(crawl_result, phone_number):
 
 async def capture_screenshot_playwright(url, clean_number, proxy_url=None):
     """Capture screenshot using Playwright with robust error handling"""
+    from playwright.async_api import async_playwright
+
     browser = None
     try:
         async with async_playwright() as p:
@@ -165,8 +175,10 @@ async def capture_screenshot_playwright(url, clean_number, proxy_url=None):
             except:
                 pass  # Ignore errors during cleanup
 
-async def scrape_with_single_browser(url, clean_number, proxy_url=None):
-    """Use a single Playwright browser for both screenshot and HTML extraction"""
+async def scrape_with_single_browser(url, clean_number, proxy_url=None, screenshots=None):
+    """Use a single Playwright browser for HTML extraction and, if a pipeline is given, a screenshot"""
+    from playwright.async_api import async_playwright
+
     browser = None
     try:
         async with async_playwright() as p:
@@ -180,58 +192,37 @@ async def scrape_with_single_browser(url, clean_number, proxy_url=None):
                 user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
             )
 
-            # Navigate to page
+            # Without a screenshot only the HTML matters; with one, images and CSS are kept
+            blocked = await block_resources(page, 'screenshot' if screenshots else 'data')
+
+            # Navigate, then wait for the reputation anchors rather than network idle
             try:
-                await page.goto(url, wait_until="networkidle", timeout=30000)
+                if not await goto_and_wait(page, url, ROBOKILLER_ANCHORS):
+                    print("⚠️ Reputation anchors not found, reading page anyway", file=sys.stderr)
             except Exception as nav_error:
-                print(f"⚠️ Navigation error (retrying): {nav_error}", file=sys.stderr)
-                try:
-                    await page.goto(url, wait_until="domcontentloaded", timeout=20000)
-                except Exception as retry_error:
-                    raise Exception(f"Navigation failed: {retry_error}")
+                raise Exception(f"Navigation failed: {nav_error}")
 
-            # Handle cookie consent
-            try:
-                consent_selectors = [
-                    'button:has-text("Accept All")',
-                    'button:has-text("Accept all")',
-                    '[aria-label*="Accept"]',
-                    '.accept-all',
-                    '#accept-all',
-                ]
-                for selector in consent_selectors:
-                    try:
-                        button = await page.wait_for_selector(selector, timeout=1500)
-                        if button:
-                            await button.click()
-                            await page.wait_for_timeout(500)
-                            break
-                    except:
-                        continue
-            except:
-                pass
+            # Cookie consent only gets in the way of the screenshot
+            if screenshots and await dismiss_consent(page):
+                await page.wait_for_timeout(500)
 
             # Get HTML content
             html_content = await page.content()
 
-            # Take screenshot
+            # Capture only; encoding and writing happen on the pipeline's workers
             screenshot_filename = None
-            try:
-                screenshot_dir = '/home/na/didapi/public/screenshots'
-                os.makedirs(screenshot_dir, exist_ok=True)
-                from datetime import datetime
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                screenshot_filename = f'robokiller_{clean_number}_{timestamp}.png'
-                filepath = os.path.join(screenshot_dir, screenshot_filename)
-                await page.screenshot(path=filepath, full_page=True)
-                print(f"✅ Screenshot saved: {screenshot_filename}", file=sys.stderr)
-            except Exception as ss_error:
-                print(f"⚠️ Screenshot failed: {ss_error}", file=sys.stderr)
-                screenshot_filename = None
+            if screenshots:
+                try:
+                    screenshot_filename = screenshots.submit(clean_number, await screenshots.capture(page))
+                except Exception as ss_error:
+                    print(f"⚠️ Screenshot failed: {ss_error}", file=sys.stderr)
 
             await browser.close()
             browser = None
 
+            if blocked:
+                print(f"🚫 Blocked requests: {blocked}", file=sys.stderr)
+
             return {
                 "success": True,
                 "html": html_content,
@@ -255,13 +246,13 @@ async def scrape_with_single_browser(url, clean_number, proxy_url=None):
                 pass
 
 
-async def scrape_robokiller_data(phone_number, proxy_url=None):
+async def scrape_robokiller_data(phone_number, proxy_url=None, screenshots=None):
     """Scrape RoboKiller reputation data using a single browser instance"""
     clean_number = re.sub(r'\D', '', phone_number)
     url = f"https://lookup.robokiller.com/search?q={clean_number}"
 
     # Use single browser for both screenshot and HTML extraction
-    browser_result = await scrape_with_single_browser(url, clean_number, proxy_url)
+    browser_result = await scrape_with_single_browser(url, clean_number, proxy_url, screenshots)
 
     if not browser_result["success"]:
         return {
@@ -381,6 +372,8 @@ def parse_reasoning_content(reasoning_text):
 
 def extract_with_enhanced_openrouter_text(text_content, phone_number):
     """Use vLLM OpenAI-compatible API to extract all reputation data from visible text content"""
+    import requests
+
     try:
         # Get API credentials from environment - vLLM configuration
         api_base = os.getenv('OPENAI_COMPATIBLE_URL', 'http://71.241.245.11:41924/v1')
@@ -396,6 +389,15 @@ def extract_with_enhanced_openrouter_text(text_content, phone_number):
         if len(content_to_analyze) > max_content_length:
             content_to_analyze = content_to_analyze[:max_content_length] + "..."
 
+        # Identical page text (e.g. numbers with no reports) skips inference entirely
+        cache = get_extraction_cache()
+        cache_key = cache.make_key(content_to_analyze, TEXT_PROMPT_VERSION, model, phone=phone_number) if cache else None
+        if cache:
+            cached_result = cache.get(cache_key)
+            if cached_result is not None:
+                print(f"⚡ vLLM extraction cache hit for {phone_number}", file=sys.stderr)
+                return cached_result
+
         # Enhanced prompt focused on visible text - concise for reasoning models
         prompt = f"""Extract reputation data from RoboKiller page text for {phone_number}.
 
@@ -474,6 +476,8 @@ Find: User reputation (Positive/Negative/Neutral), Robokiller status (Allowed/Bl
                         if json_match:
                             parsed_result = json.loads(json_match.group(1))
                             print(f"✅ vLLM extraction successful (markdown) for {phone_number}", file=sys.stderr)
+                            if cache:
+                                cache.put(cache_key, parsed_result, TEXT_PROMPT_VERSION, model)
                             return parsed_result
 
                     # Look for JSON pattern in the response
@@ -481,11 +485,15 @@ Find: User reputation (Positive/Negative/Neutral), Robokiller status (Allowed/Bl
                     if json_match:
                         parsed_result = json.loads(json_match.group(0))
                         print(f"✅ vLLM extraction successful (pattern) for {phone_number}", file=sys.stderr)
+                        if cache:
+                            cache.put(cache_key, parsed_result, TEXT_PROMPT_VERSION, model)
                         return parsed_result
                     else:
                         # Try parsing the whole content as JSON
                         parsed_result = json.loads(content)
                         print(f"✅ vLLM extraction successful (direct) for {phone_number}", file=sys.stderr)
+                        if cache:
+                            cache.put(cache_key, parsed_result, TEXT_PROMPT_VERSION, model)
                         return parsed_result
                 except json.JSONDecodeError as e:
                     # If reasoning model, try to parse extracted data from reasoning text
@@ -509,6 +517,8 @@ Find: User reputation (Positive/Negative/Neutral), Robokiller status (Allowed/Bl
 
 def extract_with_enhanced_openrouter(html_content, phone_number):
     """Use enhanced OpenRouter API prompt to extract all reputation data from HTML content"""
+    import requests
+
     try:
         # Get API credentials from environment
         api_key = os.getenv('OPENROUTER_API_KEY')
@@ -759,6 +769,11 @@ def extract_with_enhanced_logic(html_content):
     return data
 
 async def main():
+    if '--profile-startup' in sys.argv:
+        from startup_profile import print_startup_profile
+        print_startup_profile(__file__, LAZY_IMPORTS)
+        return
+
     if len(sys.argv) < 2:
         print(json.dumps({"success": False, "error": "Phone number required"}))
         sys.stdout.flush()
@@ -766,15 +781,19 @@ async def main():
 
     phone_number = sys.argv[1]
     proxy_url = None
+    take_screenshot = os.getenv('ROBOKILLER_SCREENSHOTS', '1') != '0'
 
-    # Check for proxy parameter
+    # Check for proxy / screenshot parameters
     for arg in sys.argv[2:]:
         if arg.startswith('--proxy='):
             proxy_url = arg.split('=', 1)[1]
-            break
+        elif arg == '--no-screenshot':
+            take_screenshot = False
 
+    screenshots = ScreenshotPipeline() if take_screenshot else None
     try:
-        result = await scrape_robokiller_data(phone_number, proxy_url)
+        result = await scrape_robokiller_data(phone_number, proxy_url, screenshots)
+        # The result goes out before the screenshot has been written
         print(json.dumps(result))
         sys.stdout.flush()
     except BrokenPipeError:
@@ -789,6 +808,9 @@ async def main():
         }
         print(json.dumps(error_result))
         sys.stdout.flush()
+    finally:
+        if screenshots:
+            await screenshots.close()
 
 if __name__ == "__main__":
     # Handle broken pipe errors at the top level
@@ -11,6 +11,10 @@ import sys
 import re
 import os
 import random
+import time
+
+# Overridable so benchmarks can point the scraper at a local stand-in server
+ROBOKILLER_SEARCH_URL = os.getenv('ROBOKILLER_SEARCH_URL', 'https://lookup.robokiller.com/search')
 
 # Browser fingerprint profiles - realistic combinations
 BROWSER_PROFILES = [
@@ -206,10 +210,54 @@ def is_blocked(html_content, status_code):
     return False, None
 
 
-async def scrape_single(session, phone_number, proxy=None):
+# Positional field order for --format=frames; sent in the header frame so the
+# reader never has to hardcode it. Bump FRAME_SCHEMA_VERSION when these change.
+FRAME_SCHEMA_VERSION = 1
+RECORD_FIELDS = ("phone", "success", "is_blocked", "status_code", "error", "method", "html_size", "data")
+REPUTATION_FIELDS = ("userReports", "reputationStatus", "totalCalls", "lastCallDate", "robokillerStatus",
+                     "spamScore", "callerName", "location", "carrier", "commentsCount")
+
+
+class ScrapeRecord:
+    """Result of one lookup; __slots__ keeps tens of thousands of these cheap"""
+
+    __slots__ = RECORD_FIELDS
+
+    def __init__(self, phone, success=False, is_blocked=None, status_code=None,
+                 error=None, method=None, html_size=None, data=None):
+        self.phone = phone
+        self.success = success
+        self.is_blocked = is_blocked
+        self.status_code = status_code
+        self.error = error
+        self.method = method
+        self.html_size = html_size
+        self.data = data
+
+    @classmethod
+    def failed(cls, phone, error, is_blocked=False, status_code=None):
+        return cls(phone, error=error, is_blocked=is_blocked, status_code=status_code)
+
+    def to_dict(self):
+        """Same shape scrape_single has always returned (unset fields omitted)"""
+        result = {"success": self.success, "phone": self.phone}
+        for field in RECORD_FIELDS[2:]:
+            value = getattr(self, field)
+            if value is not None:
+                result[field] = value
+        return result
+
+    def to_row(self):
+        """Positional form for frames: values in RECORD_FIELDS order, data in REPUTATION_FIELDS order"""
+        data = self.data
+        return [self.phone, self.success, self.is_blocked, self.status_code, self.error, self.method,
+                self.html_size, [data.get(f) for f in REPUTATION_FIELDS] if data is not None else None]
+
+
+async def scrape_record(session, phone_number, proxy=None):
     """Scrape a single phone number with randomized browser fingerprint"""
     clean_number = re.sub(r'\D', '', phone_number)
-    url = f"https://lookup.robokiller.com/search?q={clean_number}"
+    url = f"{ROBOKILLER_SEARCH_URL}?q={clean_number}"
 
     # Get randomized realistic browser headers
     headers = get_random_headers()
@@ -222,30 +270,23 @@ async def scrape_single(session, phone_number, proxy=None):
             blocked, block_reason = is_blocked(html, status)
 
             if blocked:
-                return {
-                    "success": False,
-                    "phone": clean_number,
-                    "error": block_reason,
-                    "is_blocked": True,
-                    "status_code": status
-                }
-
-            data = extract_reputation_data(html)
-            return {
-                "success": True,
-                "phone": clean_number,
-                "data": data,
-                "method": "fast_http",
-                "html_size": len(html),
-                "status_code": status
-            }
+                return ScrapeRecord.failed(clean_number, block_reason, is_blocked=True, status_code=status)
+
+            return ScrapeRecord(clean_number, success=True, data=extract_reputation_data(html),
+                                method="fast_http", html_size=len(html), status_code=status)
 
     except asyncio.TimeoutError:
-        return {"success": False, "phone": clean_number, "error": "Timeout", "is_blocked": False}
+        return ScrapeRecord.failed(clean_number, "Timeout")
     except aiohttp.ClientError as e:
-        return {"success": False, "phone": clean_number, "error": str(e), "is_blocked": False}
+        return ScrapeRecord.failed(clean_number, str(e))
     except Exception as e:
-        return {"success": False, "phone": clean_number, "error": str(e), "is_blocked": False}
+        return ScrapeRecord.failed(clean_number, str(e))
+
+
+async def scrape_single(session, phone_number, proxy=None):
+    """Scrape a single phone number; returns the result as a dict"""
+    record = await scrape_record(session, phone_number, proxy)
+    return record.to_dict()
 
 
 async def scrape_batch(phone_numbers, proxy=None, concurrency=10):
@@ -273,24 +314,113 @@ async def scrape_batch(phone_numbers, proxy=None, concurrency=10):
         return processed
 
 
+async def scrape_batch_stream(phone_numbers, proxy=None, concurrency=10):
+    """Scrape multiple phone numbers concurrently, yielding a ScrapeRecord as each completes"""
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    timeout = aiohttp.ClientTimeout(total=15)
+
+    async def scrape_safe(session, phone):
+        try:
+            return await scrape_record(session, phone, proxy)
+        except Exception as e:
+            return ScrapeRecord.failed(phone, str(e))
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        tasks = [asyncio.ensure_future(scrape_safe(session, phone)) for phone in phone_numbers]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def write_ndjson(record):
+    # Flush per line so the caller sees partial progress even if it kills us
+    print(json.dumps(record.to_dict()), flush=True)
+
+
+def write_frame(payload):
+    """Length-prefixed frame: 4-byte big-endian length, then compact UTF-8 JSON"""
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    out = sys.stdout.buffer
+    out.write(len(body).to_bytes(4, 'big'))
+    out.write(body)
+    out.flush()
+
+
+async def emit_stream(phone_numbers, proxy=None, concurrency=10, fmt='ndjson'):
+    """Write each result as it completes, then a summary.
+
+    ndjson: one JSON object per line.
+    frames: a header frame {"schema", "fields", "data_fields"}, then one frame
+            per result holding a positional row (no repeated keys), then the
+            summary frame.
+    """
+    start = time.monotonic()
+    counts = {"success": 0, "blocked": 0, "failed": 0}
+
+    if fmt == 'frames':
+        write_frame({"schema": FRAME_SCHEMA_VERSION, "fields": RECORD_FIELDS, "data_fields": REPUTATION_FIELDS})
+
+    async for record in scrape_batch_stream(phone_numbers, proxy=proxy, concurrency=concurrency):
+        if record.success:
+            counts["success"] += 1
+        elif record.is_blocked:
+            counts["blocked"] += 1
+        else:
+            counts["failed"] += 1
+        if fmt == 'frames':
+            write_frame(record.to_row())
+        else:
+            write_ndjson(record)
+
+    summary = {
+        "summary": True,
+        "count": sum(counts.values()),
+        **counts,
+        "elapsed_ms": int((time.monotonic() - start) * 1000)
+    }
+    if fmt == 'frames':
+        write_frame(summary)
+    else:
+        print(json.dumps(summary), flush=True)
+
+
 async def main():
+    if '--profile-startup' in sys.argv:
+        from startup_profile import print_startup_profile
+        print_startup_profile(__file__)
+        return
+
     if len(sys.argv) < 2:
         print(json.dumps({"success": False, "error": "Phone number required"}))
         return
 
     proxy_url = None
     concurrency = 20
+    stream_format = None
 
     for arg in sys.argv[1:]:
         if arg.startswith('--proxy='):
             proxy_url = arg.split('=', 1)[1]
         elif arg.startswith('--concurrency='):
             concurrency = int(arg.split('=', 1)[1])
+        elif arg == '--ndjson':
+            stream_format = 'ndjson'
+        elif arg.startswith('--format='):
+            stream_format = arg.split('=', 1)[1]
 
     # Batch mode: --numbers=num1,num2,num3,...
+    # With --ndjson (or --format=ndjson), one line per number as it completes plus a final
+    # {"summary": true, ...} line. --format=frames streams the same results as length-prefixed
+    # positional rows for large sweeps (see emit_stream).
     numbers_arg = next((a for a in sys.argv[1:] if a.startswith('--numbers=')), None)
     if numbers_arg:
         phone_numbers = [n.strip() for n in numbers_arg.split('=', 1)[1].split(',') if n.strip()]
+        if stream_format in ('ndjson', 'frames'):
+            await emit_stream(phone_numbers, proxy=proxy_url, concurrency=concurrency, fmt=stream_format)
+            return
         results = await scrape_batch(phone_numbers, proxy=proxy_url, concurrency=concurrency)
         print(json.dumps({"batch": True, "results": results, "count": len(results)}))
         return
@@ -9,13 +9,33 @@ Sources:
 - ProxyScrape API
 - Free-Proxy-List.net
 - GeoNode Free Proxy API
+
+Validation probes every candidate through one shared session with bounded
+concurrency, stops as soon as enough proxies answer, and returns them ranked
+by latency (fastest first).
+
+Environment:
+- PROXY_TEST_URL          URL fetched through each candidate (default: https://httpbin.org/ip)
+- PROXY_TEST_CONCURRENCY  Candidates probed at once (default: 50)
+- PROXY_TEST_TIMEOUT      Seconds before a candidate is given up on (default: 8)
+
+Usage:
+    python3 free_proxy_loader.py [count] [test_url]
+    python3 free_proxy_loader.py 10 http://127.0.0.1:8899/search?q=5551234567
 """
 
 import asyncio
 import aiohttp
+import os
 import re
+import sys
+import time
 from typing import List, Dict, Optional
 
+PROXY_TEST_URL = os.getenv('PROXY_TEST_URL', 'https://httpbin.org/ip')
+PROXY_TEST_CONCURRENCY = int(os.getenv('PROXY_TEST_CONCURRENCY', '50'))
+PROXY_TEST_TIMEOUT = float(os.getenv('PROXY_TEST_TIMEOUT', '8'))
+
 
 async def fetch_proxyscrape(protocol: str = "http", country: str = "US") -> List[Dict]:
     """Fetch from ProxyScrape API"""
@@ -125,55 +145,106 @@ async def load_all_free_proxies() -> List[Dict]:
     return unique_proxies
 
 
-async def test_proxy(proxy: Dict, test_url: str = "https://httpbin.org/ip") -> bool:
-    """Test if a proxy works"""
+async def probe_proxy(session: aiohttp.ClientSession, proxy: Dict, test_url: str = PROXY_TEST_URL,
+                      timeout: float = PROXY_TEST_TIMEOUT) -> Optional[Dict]:
+    """Fetch test_url through the proxy; returns latency/throughput stats or None if it failed"""
     proxy_url = f"http://{proxy['host']}:{proxy['port']}"
+    started = time.perf_counter()
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                test_url,
-                proxy=proxy_url,
-                timeout=aiohttp.ClientTimeout(total=10)
-            ) as resp:
-                return resp.status == 200
-    except:
-        return False
-
-
-async def get_working_proxies(count: int = 10) -> List[Dict]:
-    """Load and test proxies, return working ones"""
+        async with session.get(
+            test_url,
+            proxy=proxy_url,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as resp:
+            first_byte = time.perf_counter()
+            body = await resp.read()
+            if resp.status != 200 or not body:
+                return None
+    except Exception:
+        return None
+
+    finished = time.perf_counter()
+    transfer = finished - first_byte
+    return {
+        'latency_ms': round((first_byte - started) * 1000, 1),
+        'total_ms': round((finished - started) * 1000, 1),
+        'bytes': len(body),
+        # Tiny bodies transfer in well under a millisecond; report them against the total time
+        'throughput_kbps': round(len(body) / 1024 / (transfer if transfer > 0.001 else finished - started), 1),
+    }
+
+
+async def test_proxy(proxy: Dict, test_url: str = PROXY_TEST_URL) -> bool:
+    """Test if a proxy works"""
+    async with aiohttp.ClientSession() as session:
+        return await probe_proxy(session, proxy, test_url) is not None
+
+
+async def validate_proxies(proxies: List[Dict], count: int, test_url: str = PROXY_TEST_URL,
+                           concurrency: int = PROXY_TEST_CONCURRENCY,
+                           timeout: float = PROXY_TEST_TIMEOUT) -> List[Dict]:
+    """Probe candidates concurrently until `count` work; returns them fastest first.
+
+    Each returned proxy dict gains latency_ms, total_ms, bytes and throughput_kbps.
+    Probes still in flight when enough proxies are found are cancelled.
+    """
+    working: List[Dict] = []
+    if not proxies or count <= 0:
+        return working
+
+    candidates = iter(proxies)
+    enough = asyncio.Event()
+
+    async def worker(session: aiohttp.ClientSession):
+        for proxy in candidates:
+            if enough.is_set():
+                return
+            stats = await probe_proxy(session, proxy, test_url, timeout)
+            if stats is None:
+                continue
+            working.append({**proxy, **stats})
+            print(f"  ✓ {proxy['host']}:{proxy['port']} {stats['latency_ms']:.0f}ms")
+            if len(working) >= count:
+                enough.set()
+
+    # Every probe goes to a different proxy, so pooled connections would never be reused
+    connector = aiohttp.TCPConnector(limit=concurrency, force_close=True)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        workers = [asyncio.create_task(worker(session)) for _ in range(min(concurrency, len(proxies)))]
+        all_done = asyncio.gather(*workers, return_exceptions=True)
+        enough_waiter = asyncio.create_task(enough.wait())
+        await asyncio.wait([all_done, enough_waiter], return_when=asyncio.FIRST_COMPLETED)
+
+        enough_waiter.cancel()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(all_done, enough_waiter, return_exceptions=True)
+
+    working.sort(key=lambda p: (p['latency_ms'], -p['throughput_kbps']))
+    return working[:count]
+
+
+async def get_working_proxies(count: int = 10, test_url: str = PROXY_TEST_URL,
+                              concurrency: int = PROXY_TEST_CONCURRENCY) -> List[Dict]:
+    """Load and test proxies, return working ones ranked by latency"""
     all_proxies = await load_all_free_proxies()
 
-    print(f"Testing proxies (need {count} working)...")
-    working = []
-
-    # Test in batches
-    batch_size = 20
-    for i in range(0, len(all_proxies), batch_size):
-        if len(working) >= count:
-            break
-
-        batch = all_proxies[i:i+batch_size]
-        tasks = [test_proxy(p) for p in batch]
-        results = await asyncio.gather(*tasks)
-
-        for proxy, works in zip(batch, results):
-            if works:
-                working.append(proxy)
-                print(f"  ✓ {proxy['host']}:{proxy['port']}")
-                if len(working) >= count:
-                    break
+    print(f"Testing proxies (need {count} working, {concurrency} at a time)...")
+    started = time.perf_counter()
+    working = await validate_proxies(all_proxies, count, test_url, concurrency)
 
-    print(f"Found {len(working)} working proxies")
+    print(f"Found {len(working)} working proxies in {time.perf_counter() - started:.1f}s")
     return working
 
 
 if __name__ == "__main__":
     async def main():
-        proxies = await get_working_proxies(5)
-        print("\nWorking proxies:")
+        count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+        test_url = sys.argv[2] if len(sys.argv) > 2 else PROXY_TEST_URL
+        proxies = await get_working_proxies(count, test_url)
+        print("\nWorking proxies (fastest first):")
         for p in proxies:
-            print(f"  {p['host']}:{p['port']} ({p['source']})")
+            print(f"  {p['host']}:{p['port']} ({p['source']}) {p['latency_ms']:.0f}ms, {p['throughput_kbps']:.0f} KB/s")
 
     asyncio.run(main())
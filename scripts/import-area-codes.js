@@ -67,6 +67,7 @@ async function importAreaCodes() {
     }
 
     console.log('\n🎉 Area code import completed successfully!');
+    console.log('   Rebuild the nearest-NPA table: python3 scripts/build_area_code_proximity.py');
 
   } catch (error) {
     console.error('❌ Error importing area codes:', error);
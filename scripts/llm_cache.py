@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Content-addressed LLM Extraction Cache
+
+Stores parsed LLM extraction results in a local SQLite database so identical
+page text never goes through inference twice. RoboKiller/YouMail pages for
+numbers with no reports are the same text apart from the number itself, so
+the number is masked out before hashing.
+
+Key: sha256(normalized text | prompt version | model name)
+
+Environment:
+- LLM_CACHE_PATH         SQLite file (default: <repo>/cache/llm_extraction.sqlite3)
+- LLM_CACHE_MAX_ENTRIES  Evict least recently used rows above this (default: 50000)
+- LLM_CACHE_TTL_DAYS     Entries older than this are treated as misses (default: 14)
+- LLM_CACHE_DISABLED     Set to 1 to bypass the cache entirely
+
+Usage:
+    from llm_cache import get_extraction_cache
+
+    cache = get_extraction_cache()
+    key = cache.make_key(text, PROMPT_VERSION, model, phone=phone) if cache else None
+    cached = cache.get(key) if cache else None
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'cache', 'llm_extraction.sqlite3'
+)
+
+# Run the eviction sweep once every N writes rather than on every put
+EVICT_EVERY = 200
+
+
+def normalize_text(text: str, phone: Optional[str] = None) -> str:
+    """Collapse whitespace and mask the looked-up number in any common format"""
+    normalized = re.sub(r'\s+', ' ', text or '').strip()
+
+    digits = re.sub(r'\D', '', phone or '')
+    if len(digits) == 11 and digits[0] == '1':
+        digits = digits[1:]
+    if len(digits) == 10:
+        # Matches 5551234567, 555-123-4567, (555) 123-4567, 555.123.4567, +1 555...
+        pattern = (r'(?:\+?1[\s.\-]?)?\(?' + digits[:3] + r'\)?[\s.\-]?'
+                   + digits[3:6] + r'[\s.\-]?' + digits[6:])
+        normalized = re.sub(pattern, '<PHONE>', normalized)
+
+    return normalized
+
+
+class ExtractionCache:
+    """SQLite-backed cache of parsed extraction results with TTL and LRU eviction"""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = 50000,
+        ttl_days: float = 14,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Several scraper processes share the file, so use WAL and wait on locks
+        self.conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                prompt_version TEXT NOT NULL,
+                model TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_extractions_last_used ON extractions (last_used)')
+
+    @staticmethod
+    def make_key(text: str, prompt_version: str, model: str, phone: Optional[str] = None) -> str:
+        """Hash normalized text together with the prompt version and model name"""
+        digest = hashlib.sha256()
+        for part in (normalize_text(text, phone), prompt_version, model):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached result for key, or None on miss/expiry"""
+        now = time.time()
+        try:
+            row = self.conn.execute(
+                'SELECT value, created_at FROM extractions WHERE key = ?', (key,)
+            ).fetchone()
+
+            if not row or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+
+            self.conn.execute(
+                'UPDATE extractions SET last_used = ?, hit_count = hit_count + 1 WHERE key = ?',
+                (now, key)
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM cache read failed: {e}", file=sys.stderr)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict, prompt_version: str, model: str):
+        """Store a parsed result; only call this for successful extractions"""
+        now = time.time()
+        try:
+            self.conn.execute(
+                """INSERT OR REPLACE INTO extractions
+                   (key, prompt_version, model, value, created_at, last_used, hit_count)
+                   VALUES (?, ?, ?, ?, ?, ?, 0)""",
+                (key, prompt_version, model, json.dumps(value), now, now)
+            )
+
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 1:
+                self.evict()
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM cache write failed: {e}", file=sys.stderr)
+
+    def evict(self) -> int:
+        """Drop expired rows, then least recently used rows above max_entries"""
+        cutoff = time.time() - self.ttl_seconds
+        removed = self.conn.execute('DELETE FROM extractions WHERE created_at < ?', (cutoff,)).rowcount
+
+        count = self.conn.execute('SELECT COUNT(*) FROM extractions').fetchone()[0]
+        if count > self.max_entries:
+            removed += self.conn.execute(
+                """DELETE FROM extractions WHERE key IN (
+                       SELECT key FROM extractions ORDER BY last_used ASC LIMIT ?
+                   )""",
+                (count - self.max_entries,)
+            ).rowcount
+
+        return removed
+
+    def stats(self) -> Dict:
+        entries = self.conn.execute('SELECT COUNT(*) FROM extractions').fetchone()[0]
+        return {'entries': entries, 'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        try:
+            self.conn.close()
+        except sqlite3.Error:
+            pass
+
+
+_default_cache = None
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """Shared cache configured from the environment; None if disabled or unavailable"""
+    global _default_cache
+
+    if os.getenv('LLM_CACHE_DISABLED') == '1':
+        return None
+    if _default_cache is None:
+        try:
+            _default_cache = ExtractionCache(
+                path=os.getenv('LLM_CACHE_PATH', DEFAULT_CACHE_PATH),
+                max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '50000')),
+                ttl_days=float(os.getenv('LLM_CACHE_TTL_DAYS', '14')),
+            )
+        except (sqlite3.Error, OSError, ValueError) as e:
+            # A broken cache must never stop extraction
+            print(f"⚠️ LLM cache unavailable: {e}", file=sys.stderr)
+            return None
+    return _default_cache
+
+
+if __name__ == "__main__":
+    cache = get_extraction_cache()
+    if not cache:
+        print("LLM cache disabled")
+        sys.exit(0)
+
+    if '--evict' in sys.argv:
+        print(f"Evicted {cache.evict()} entries")
+    print(json.dumps(cache.stats()))
@@ -0,0 +1,93 @@
+import mongoose from 'mongoose';
+import dotenv from 'dotenv';
+
+dotenv.config();
+
+// Backfills DID.reputation.nextCheckDue, which the background scraper uses to
+// pick due DIDs with one indexed query. Run after migrate-phone-key.js.
+//
+//   1. Copy DIDReputation.nextCheckDue onto DIDs by phoneKey (exact, bulk)
+//   2. DIDs still without one but with a lastChecked (written by the Python
+//      updater, which has no DIDReputation row) get lastChecked + interval
+//
+// Usage: node scripts/migrate-next-check-due.js [--batch 2000]
+
+const batchArg = process.argv.indexOf('--batch');
+const BATCH_SIZE = batchArg > -1 ? parseInt(process.argv[batchArg + 1], 10) : 2000;
+
+// Same as ReputationService.checkInterval
+const HOUR = 60 * 60 * 1000;
+const CHECK_INTERVAL_MS = { Positive: 24 * HOUR, Neutral: 12 * HOUR, Negative: 7 * 24 * HOUR };
+
+async function migrateNextCheckDue() {
+  try {
+    await mongoose.connect(process.env.MONGODB_URI);
+    console.log('✅ Connected to MongoDB');
+
+    const db = mongoose.connection.db;
+    const dids = db.collection('dids');
+
+    // Step 1: from DIDReputation
+    const cursor = db.collection('didreputations').find(
+      { nextCheckDue: { $ne: null } },
+      { projection: { phoneNumber: 1, nextCheckDue: 1 } }
+    ).batchSize(BATCH_SIZE);
+
+    let fromReputation = 0;
+    let bulkOps = [];
+    for await (const rep of cursor) {
+      bulkOps.push({
+        updateMany: {
+          filter: { phoneKey: rep.phoneNumber },
+          update: { $set: { 'reputation.nextCheckDue': rep.nextCheckDue } }
+        }
+      });
+      if (bulkOps.length >= BATCH_SIZE) {
+        fromReputation += (await dids.bulkWrite(bulkOps, { ordered: false })).modifiedCount;
+        bulkOps = [];
+        console.log(`✅ Copied nextCheckDue from DIDReputation to ${fromReputation} DIDs`);
+      }
+    }
+    if (bulkOps.length > 0) {
+      fromReputation += (await dids.bulkWrite(bulkOps, { ordered: false })).modifiedCount;
+    }
+    console.log(`✅ Copied nextCheckDue from DIDReputation to ${fromReputation} DIDs`);
+
+    // Step 2: derive from lastChecked + status interval, server-side in one statement
+    const derived = await dids.updateMany(
+      { 'reputation.nextCheckDue': null, 'reputation.lastChecked': { $ne: null } },
+      [{
+        $set: {
+          'reputation.nextCheckDue': {
+            $add: ['$reputation.lastChecked', {
+              $switch: {
+                branches: [
+                  { case: { $eq: ['$reputation.status', 'Positive'] }, then: CHECK_INTERVAL_MS.Positive },
+                  { case: { $eq: ['$reputation.status', 'Negative'] }, then: CHECK_INTERVAL_MS.Negative }
+                ],
+                default: CHECK_INTERVAL_MS.Neutral
+              }
+            }]
+          }
+        }
+      }]
+    );
+    console.log(`✅ Derived nextCheckDue from lastChecked for ${derived.modifiedCount} DIDs`);
+
+    console.log('\n🔧 Building candidate selection index...');
+    await dids.createIndex({ status: 1, isActive: 1, 'reputation.nextCheckDue': 1, tenantId: 1 });
+
+    const neverChecked = await dids.countDocuments({ 'reputation.nextCheckDue': null });
+    console.log(`📊 ${neverChecked} DIDs have never been checked and will be scraped first`);
+
+    await mongoose.connection.close();
+    console.log('\n✅ Migration completed successfully');
+    process.exit(0);
+  } catch (error) {
+    console.error('❌ Migration failed:', error);
+    await mongoose.connection.close();
+    process.exit(1);
+  }
+}
+
+migrateNextCheckDue();
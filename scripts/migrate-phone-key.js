@@ -0,0 +1,85 @@
+import mongoose from 'mongoose';
+import dotenv from 'dotenv';
+
+dotenv.config();
+
+// Backfills DID.phoneKey (canonical 10-digit phone) and builds its index.
+// Safe to re-run: only DIDs without a phoneKey are touched.
+//
+// Usage: node scripts/migrate-phone-key.js [--batch 2000]
+
+const batchArg = process.argv.indexOf('--batch');
+const BATCH_SIZE = batchArg > -1 ? parseInt(process.argv[batchArg + 1], 10) : 2000;
+
+// Same rule as toPhoneKey in models/DID.js
+function toPhoneKey(phoneNumber) {
+  if (!phoneNumber) return null;
+  let n = String(phoneNumber).replace(/\D/g, '');
+  if (n.length === 11 && n.startsWith('1')) n = n.substring(1);
+  return n || null;
+}
+
+async function migratePhoneKey() {
+  try {
+    await mongoose.connect(process.env.MONGODB_URI);
+    console.log('✅ Connected to MongoDB');
+
+    const dids = mongoose.connection.db.collection('dids');
+    const missing = { $or: [{ phoneKey: { $exists: false } }, { phoneKey: null }] };
+
+    const total = await dids.countDocuments(missing);
+    console.log(`📊 Found ${total} DIDs without phoneKey`);
+
+    // Page by _id rather than skip: updated DIDs drop out of the filter, so skip would miss rows
+    let updatedCount = 0;
+    let processed = 0;
+    let lastId = null;
+
+    while (true) {
+      const page = await dids.find(
+        lastId ? { $and: [missing, { _id: { $gt: lastId } }] } : missing,
+        { projection: { phoneNumber: 1 } }
+      ).sort({ _id: 1 }).limit(BATCH_SIZE).toArray();
+
+      if (page.length === 0) break;
+      lastId = page[page.length - 1]._id;
+
+      const bulkOps = page
+        .map(did => ({ _id: did._id, phoneKey: toPhoneKey(did.phoneNumber) }))
+        .filter(did => did.phoneKey)
+        .map(did => ({
+          updateOne: {
+            filter: { _id: did._id },
+            update: { $set: { phoneKey: did.phoneKey } }
+          }
+        }));
+
+      if (bulkOps.length > 0) {
+        const result = await dids.bulkWrite(bulkOps, { ordered: false });
+        updatedCount += result.modifiedCount;
+      }
+      processed += page.length;
+
+      console.log(`✅ Processed ${processed}/${total} DIDs (updated: ${updatedCount})`);
+    }
+
+    console.log('\n🔧 Building { phoneKey: 1, tenantId: 1 } index...');
+    await dids.createIndex({ phoneKey: 1, tenantId: 1 });
+
+    const remaining = await dids.countDocuments(missing);
+    console.log(`\n✅ Total updated: ${updatedCount} DIDs with phoneKey`);
+    if (remaining > 0) {
+      console.log(`⚠️ ${remaining} DIDs have no digits in phoneNumber and were left without a phoneKey`);
+    }
+
+    await mongoose.connection.close();
+    console.log('\n✅ Migration completed successfully');
+    process.exit(0);
+  } catch (error) {
+    console.error('❌ Migration failed:', error);
+    await mongoose.connection.close();
+    process.exit(1);
+  }
+}
+
+migratePhoneKey();
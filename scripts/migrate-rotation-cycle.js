@@ -0,0 +1,63 @@
+import mongoose from 'mongoose';
+import dotenv from 'dotenv';
+
+dotenv.config();
+
+// Replaces Tenant.rotationState.usedDidsInCycle with the cycle sequence scheme:
+// each tenant gets rotationState.cycleId (1 if missing), the DIDs listed in its
+// usedDidsInCycle get lastCycleId = cycleId so the current cycle carries on,
+// and the array is removed.
+//
+// Usage: node scripts/migrate-rotation-cycle.js [--batch 2000]
+
+const batchArg = process.argv.indexOf('--batch');
+const BATCH_SIZE = batchArg > -1 ? parseInt(process.argv[batchArg + 1], 10) : 2000;
+
+async function migrateRotationCycle() {
+  try {
+    await mongoose.connect(process.env.MONGODB_URI);
+    console.log('✅ Connected to MongoDB');
+
+    const db = mongoose.connection.db;
+    const tenants = db.collection('tenants');
+    const dids = db.collection('dids');
+
+    const cursor = tenants.find({}, { projection: { name: 1, rotationState: 1 } });
+
+    let tenantCount = 0;
+    let didCount = 0;
+    for await (const tenant of cursor) {
+      const cycleId = tenant.rotationState?.cycleId || 1;
+      const used = (tenant.rotationState?.usedDidsInCycle || [])
+        .filter(id => mongoose.Types.ObjectId.isValid(id))
+        .map(id => new mongoose.Types.ObjectId(id));
+
+      for (let i = 0; i < used.length; i += BATCH_SIZE) {
+        const result = await dids.updateMany(
+          { _id: { $in: used.slice(i, i + BATCH_SIZE) }, tenantId: tenant._id },
+          { $set: { lastCycleId: cycleId } }
+        );
+        didCount += result.modifiedCount;
+      }
+
+      await tenants.updateOne(
+        { _id: tenant._id },
+        { $set: { 'rotationState.cycleId': cycleId }, $unset: { 'rotationState.usedDidsInCycle': '' } }
+      );
+      tenantCount++;
+      console.log(`✅ ${tenant.name || tenant._id}: cycle ${cycleId}, ${used.length} DIDs used this cycle`);
+    }
+
+    console.log(`\n✅ Migrated ${tenantCount} tenants, stamped lastCycleId on ${didCount} DIDs`);
+
+    await mongoose.connection.close();
+    console.log('\n✅ Migration completed successfully');
+    process.exit(0);
+  } catch (error) {
+    console.error('❌ Migration failed:', error);
+    await mongoose.connection.close();
+    process.exit(1);
+  }
+}
+
+migrateRotationCycle();
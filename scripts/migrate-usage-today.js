@@ -0,0 +1,38 @@
+import mongoose from 'mongoose';
+import dotenv from 'dotenv';
+import DID from '../models/DID.js';
+
+dotenv.config();
+
+// Seeds DID.usage.today for DIDs that only have usage.dailyUsage: today's
+// dailyUsage entries become usage.today = {day, count} and leave the array.
+// Run once before starting the server with usage.today, so the selection
+// index and capacity checks see today's calls instead of restarting at 0.
+// (DID.todayUsageUpdate seeds the same way on a DID's first pick.)
+//
+// Usage: node scripts/migrate-usage-today.js
+
+async function migrateUsageToday() {
+  try {
+    await mongoose.connect(process.env.MONGODB_URI);
+    console.log('✅ Connected to MongoDB');
+
+    const dids = mongoose.connection.db.collection('dids');
+    const result = await dids.updateMany(
+      { 'usage.today.day': { $exists: false } },
+      DID.todayUsageSeed(new Date())
+    );
+
+    console.log(`✅ Seeded usage.today on ${result.modifiedCount} of ${result.matchedCount} DIDs`);
+
+    await mongoose.connection.close();
+    console.log('\n✅ Migration completed successfully');
+    process.exit(0);
+  } catch (error) {
+    console.error('❌ Migration failed:', error);
+    await mongoose.connection.close();
+    process.exit(1);
+  }
+}
+
+migrateUsageToday();
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Lean Playwright Page Loads for Reputation Lookups
+
+The browser-based scrapers only read the HTML (and sometimes take a
+screenshot), yet a default page load pulls every image, font, stylesheet and
+tracker through a metered proxy and then waits for the network to go idle.
+This module aborts non-essential requests with a route handler and waits
+only until the elements the parsers read are in the DOM.
+
+Profiles:
+  data        HTML only: blocks images, media, fonts, stylesheets, trackers
+  screenshot  Page must still look right: blocks media, web fonts, trackers
+
+Environment:
+- PAGE_ANCHOR_TIMEOUT_MS  How long to wait for the data anchors (default: 5000)
+
+Usage:
+    from page_load import block_resources, goto_and_wait, ROBOKILLER_ANCHORS
+
+    blocked = await block_resources(page, 'data')
+    found = await goto_and_wait(page, url, ROBOKILLER_ANCHORS)
+    html = await page.content()
+"""
+
+import os
+import re
+from typing import Dict
+
+ANCHOR_TIMEOUT_MS = int(os.getenv('PAGE_ANCHOR_TIMEOUT_MS', '5000'))
+
+RESOURCE_PROFILES = {
+    'data': frozenset({'image', 'media', 'font', 'stylesheet', 'texttrack', 'manifest'}),
+    'screenshot': frozenset({'media', 'font', 'texttrack', 'manifest'}),
+}
+
+# Analytics, ad and session-replay hosts seen on the lookup sites
+TRACKER_PATTERN = re.compile(
+    r'google-analytics\.com|googletagmanager\.com|doubleclick\.net|googlesyndication\.com|'
+    r'facebook\.net|connect\.facebook|hotjar\.com|segment\.(?:io|com)|clarity\.ms|'
+    r'newrelic\.com|nr-data\.net|amplitude\.com|mixpanel\.com|fullstory\.com|quantserve\.com|'
+    r'adsrvr\.org|criteo\.|taboola\.com|outbrain\.com'
+)
+
+# Elements the parsers read; once any is in the DOM the page is usable
+ROBOKILLER_ANCHORS = '#userReputation, #roboStatus, #lastCall, meta[property="og:description"]'
+YOUMAIL_ANCHORS = '.ym-phone-summary-info-name, .ym-phone-summary, .typical-message-text'
+
+# One combined selector: a single short wait instead of one timeout per candidate
+CONSENT_SELECTOR = ', '.join([
+    'button:has-text("Accept All")',
+    'button:has-text("Accept all")',
+    '[aria-label*="Accept"]',
+    '.accept-all',
+    '#accept-all',
+])
+
+
+async def block_resources(target, profile: str = 'data') -> Dict[str, int]:
+    """Abort requests the profile does not need on a Page or BrowserContext.
+
+    Returns a live {resource_type: count} dict of what has been aborted.
+    """
+    blocked_types = RESOURCE_PROFILES[profile]
+    blocked: Dict[str, int] = {}
+
+    async def handle(route):
+        request = route.request
+        if request.resource_type in blocked_types or TRACKER_PATTERN.search(request.url):
+            blocked[request.resource_type] = blocked.get(request.resource_type, 0) + 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await target.route('**/*', handle)
+    return blocked
+
+
+async def goto_and_wait(page, url: str, anchors: str, nav_timeout: int = 20000,
+                        anchor_timeout: int = ANCHOR_TIMEOUT_MS) -> bool:
+    """Navigate, then wait only until one of the anchors is attached.
+
+    Returns False if no anchor appeared in time (block and challenge pages
+    have none); the caller still reads the page and decides what it is.
+    """
+    await page.goto(url, wait_until='domcontentloaded', timeout=nav_timeout)
+    try:
+        await page.wait_for_selector(anchors, state='attached', timeout=anchor_timeout)
+        return True
+    except Exception:
+        return False
+
+
+async def dismiss_consent(page, timeout: int = 1500) -> bool:
+    """Click a cookie consent button if one shows up within the timeout"""
+    try:
+        button = await page.wait_for_selector(CONSENT_SELECTOR, timeout=timeout)
+        await button.click()
+        return True
+    except Exception:
+        return False
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Per-proxy Keep-alive Connection Pools
+
+A single shared TCPConnector only reuses a connection through a proxy when
+the next request happens to pick the same proxy before the socket is handed
+to someone else, so most lookups pay a fresh proxy CONNECT plus TLS
+handshake to lookup.robokiller.com. ProxyConnectionManager gives every proxy
+its own ClientSession with a small keep-alive pool and a DNS cache, closes
+pools that have gone idle, and counts how often connections are reused and
+how long new ones take to set up.
+
+Environment:
+- PROXY_POOL_SIZE          Connections kept per proxy (default: 4)
+- PROXY_KEEPALIVE_SECONDS  Idle time before a pooled connection is closed (default: 30)
+- PROXY_POOL_IDLE_SECONDS  Idle time before a whole proxy pool is closed (default: 120)
+- DNS_CACHE_TTL_SECONDS    DNS cache lifetime per pool (default: 300)
+
+Usage:
+    pools = ProxyConnectionManager()
+    try:
+        result = await scrape_single(pools.session_for(proxy_url), phone, proxy_url)
+    finally:
+        await pools.close()
+    print(pools.stats())
+"""
+
+import asyncio
+import collections
+import os
+import time
+from typing import Dict, Optional
+
+import aiohttp
+
+PROXY_POOL_SIZE = int(os.getenv('PROXY_POOL_SIZE', '4'))
+PROXY_KEEPALIVE_SECONDS = float(os.getenv('PROXY_KEEPALIVE_SECONDS', '30'))
+PROXY_POOL_IDLE_SECONDS = float(os.getenv('PROXY_POOL_IDLE_SECONDS', '120'))
+DNS_CACHE_TTL_SECONDS = int(os.getenv('DNS_CACHE_TTL_SECONDS', '300'))
+
+# Only the most recent handshake timings are kept for the percentiles
+HANDSHAKE_SAMPLES = 5000
+
+DIRECT = 'direct'
+
+
+class ProxyConnectionManager:
+    """One keep-alive ClientSession per proxy, with reuse and handshake stats"""
+
+    def __init__(self, pool_size: int = PROXY_POOL_SIZE, keepalive_timeout: float = PROXY_KEEPALIVE_SECONDS,
+                 pool_idle_timeout: float = PROXY_POOL_IDLE_SECONDS, dns_ttl: int = DNS_CACHE_TTL_SECONDS,
+                 timeout: Optional[aiohttp.ClientTimeout] = None, direct_pool_size: Optional[int] = None):
+        self.pool_size = pool_size
+        # Without a proxy every request shares one pool, so it needs the full concurrency
+        self.direct_pool_size = direct_pool_size or pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.pool_idle_timeout = pool_idle_timeout
+        self.dns_ttl = dns_ttl
+        self.timeout = timeout or aiohttp.ClientTimeout(total=30)
+
+        self.sessions: Dict[str, aiohttp.ClientSession] = {}
+        self.last_used: Dict[str, float] = {}
+        self._last_sweep = time.monotonic()
+        self._closing = set()
+
+        self.counters = {'requests': 0, 'new_connections': 0, 'reused_connections': 0,
+                         'dns_cache_hits': 0, 'dns_cache_misses': 0, 'pools_opened': 0, 'pools_closed': 0}
+        self.handshake_ms = collections.deque(maxlen=HANDSHAKE_SAMPLES)
+        self._trace_config = self._build_trace_config()
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self.counters['requests'] += 1
+
+        async def on_create_start(session, ctx, params):
+            ctx.connect_started = time.perf_counter()
+
+        async def on_create_end(session, ctx, params):
+            # Covers TCP connect to the proxy, CONNECT tunnel and the TLS handshake
+            self.counters['new_connections'] += 1
+            self.handshake_ms.append((time.perf_counter() - ctx.connect_started) * 1000)
+
+        async def on_reuse(session, ctx, params):
+            self.counters['reused_connections'] += 1
+
+        async def on_dns_hit(session, ctx, params):
+            self.counters['dns_cache_hits'] += 1
+
+        async def on_dns_miss(session, ctx, params):
+            self.counters['dns_cache_misses'] += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_start.append(on_create_start)
+        trace.on_connection_create_end.append(on_create_end)
+        trace.on_connection_reuseconn.append(on_reuse)
+        trace.on_dns_cache_hit.append(on_dns_hit)
+        trace.on_dns_cache_miss.append(on_dns_miss)
+        return trace
+
+    def session_for(self, proxy_url: Optional[str]) -> aiohttp.ClientSession:
+        """Session whose pool only ever carries traffic through this proxy"""
+        key = proxy_url or DIRECT
+        now = time.monotonic()
+        if now - self._last_sweep > self.pool_idle_timeout / 4:
+            self._close_idle(now)
+
+        session = self.sessions.get(key)
+        if session is None or session.closed:
+            size = self.direct_pool_size if key == DIRECT else self.pool_size
+            connector = aiohttp.TCPConnector(
+                limit=size,
+                limit_per_host=size,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_ttl,
+            )
+            session = aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                            trace_configs=[self._trace_config])
+            self.sessions[key] = session
+            self.counters['pools_opened'] += 1
+
+        self.last_used[key] = now
+        return session
+
+    def _close_idle(self, now: float):
+        """Drop pools for proxies that have not been used recently (e.g. marked unhealthy)"""
+        self._last_sweep = now
+        for key in [k for k, used in self.last_used.items() if now - used > self.pool_idle_timeout]:
+            session = self.sessions.pop(key, None)
+            del self.last_used[key]
+            if session and not session.closed:
+                # Nothing is in flight: requests time out long before the pool goes idle
+                task = asyncio.get_running_loop().create_task(session.close())
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+                self.counters['pools_closed'] += 1
+
+    async def close(self):
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+        for session in self.sessions.values():
+            if not session.closed:
+                await session.close()
+        self.counters['pools_closed'] += len(self.sessions)
+        self.sessions.clear()
+        self.last_used.clear()
+
+    def stats(self) -> Dict:
+        connections = self.counters['new_connections'] + self.counters['reused_connections']
+        handshakes = sorted(self.handshake_ms)
+        return {
+            **self.counters,
+            'open_pools': len(self.sessions),
+            'reuse_ratio': round(self.counters['reused_connections'] / connections, 3) if connections else 0.0,
+            'handshake_ms_avg': round(sum(handshakes) / len(handshakes), 1) if handshakes else None,
+            'handshake_ms_p95': round(handshakes[int(0.95 * (len(handshakes) - 1))], 1) if handshakes else None,
+        }
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Reputation History Store
+
+reputation.robokillerData on a DID only holds the latest scrape. Every
+scrape is also appended here so trends and report velocity can be read
+back without re-scraping.
+
+One document per DID per month, with samples packed as small int arrays:
+
+    {
+      d: ObjectId(did), m: 202610,            # unique {d, m}
+      s: [[t, score, status, rk, reports, calls, comments], ...],
+      n: <samples pushed>, expireAt: <month end + retention>
+    }
+
+t is seconds since the start of the month; status and rk are the enum
+codes in STATUS_CODES and ROBOKILLER_CODES. A TTL index on expireAt drops
+whole months once they are older than the retention period.
+
+Environment:
+- REPUTATION_HISTORY_DAYS         Retention after the end of a month (default: 400)
+- REPUTATION_HISTORY_MAX_SAMPLES  Samples kept per DID per month (default: 500)
+
+Usage:
+    history = ReputationHistoryWriter(db)
+    await history.ensure_indexes()
+    history.add(did['_id'], data, score, checked_at)
+    await history.flush()                          # one bulk_write per batch
+
+    series = await load_series(db, did_id, since=datetime(2026, 1, 1))
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+REPUTATION_HISTORY_DAYS = int(os.getenv('REPUTATION_HISTORY_DAYS', '400'))
+REPUTATION_HISTORY_MAX_SAMPLES = int(os.getenv('REPUTATION_HISTORY_MAX_SAMPLES', '500'))
+
+COLLECTION = 'reputation_history'
+
+# Order of the values in a packed sample; models/ReputationHistory.js decodes the same layout
+SAMPLE_FIELDS = ('t', 'score', 'status', 'robokillerStatus', 'userReports', 'totalCalls', 'commentsCount')
+
+STATUS_CODES = {'Unknown': 0, 'Positive': 1, 'Neutral': 2, 'Negative': 3}
+ROBOKILLER_CODES = {'Unknown': 0, 'Allowed': 1, 'Blocked': 2}
+
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+ROBOKILLER_NAMES = {code: name for name, code in ROBOKILLER_CODES.items()}
+
+
+def month_key(ts: datetime) -> int:
+    return ts.year * 100 + ts.month
+
+
+def month_start(key: int) -> datetime:
+    return datetime(key // 100, key % 100, 1)
+
+
+def next_month(start: datetime) -> datetime:
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def pack_sample(data: Dict, score: int, checked_at: datetime) -> List[int]:
+    """Encode one scrape as [t, score, status, rk, reports, calls, comments]"""
+    start = datetime(checked_at.year, checked_at.month, 1)
+    return [
+        int((checked_at - start).total_seconds()),
+        int(score),
+        STATUS_CODES.get(data.get('reputationStatus'), 0),
+        ROBOKILLER_CODES.get(data.get('robokillerStatus'), 0),
+        int(data.get('userReports') or 0),
+        int(data.get('totalCalls') or 0),
+        int(data.get('commentsCount') or 0),
+    ]
+
+
+def unpack_sample(month: int, sample: List[int]) -> Dict:
+    row = dict(zip(SAMPLE_FIELDS, sample))
+    row['checkedAt'] = month_start(month) + timedelta(seconds=row.pop('t'))
+    row['status'] = STATUS_NAMES.get(row['status'], 'Unknown')
+    row['robokillerStatus'] = ROBOKILLER_NAMES.get(row['robokillerStatus'], 'Unknown')
+    return row
+
+
+class ReputationHistoryWriter:
+    """Buffers samples and appends them with one unordered bulk_write per flush"""
+
+    def __init__(self, db, retention_days: int = REPUTATION_HISTORY_DAYS,
+                 max_samples: int = REPUTATION_HISTORY_MAX_SAMPLES):
+        self.collection = db[COLLECTION]
+        self.retention = timedelta(days=retention_days)
+        self.max_samples = max_samples
+        self.pending = []
+        self.stats = {'samples': 0, 'flushes': 0, 'errors': 0}
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([('d', 1), ('m', 1)], unique=True)
+        await self.collection.create_index('expireAt', expireAfterSeconds=0)
+
+    def add(self, did_id, data: Dict, score: int, checked_at: datetime):
+        key = month_key(checked_at)
+        self.pending.append((did_id, key, pack_sample(data, score, checked_at)))
+
+    async def flush(self) -> int:
+        """Write buffered samples; returns how many were written"""
+        if not self.pending:
+            return 0
+        from pymongo import UpdateOne
+        from pymongo.errors import BulkWriteError
+
+        pending, self.pending = self.pending, []
+        operations = []
+        for did_id, key, sample in pending:
+            expire_at = next_month(month_start(key)) + self.retention
+            operations.append(UpdateOne(
+                {'d': did_id, 'm': key},
+                {
+                    '$push': {'s': {'$each': [sample], '$slice': -self.max_samples}},
+                    '$inc': {'n': 1},
+                    '$setOnInsert': {'expireAt': expire_at},
+                },
+                upsert=True,
+            ))
+
+        failed = 0
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Concurrent first writes to a new month race on the unique index;
+            # the losers find the winner's document on a second attempt
+            errors = e.details.get('writeErrors', [])
+            retry = [operations[error['index']] for error in errors if error.get('code') == 11000]
+            failed = len(errors) - len(retry)
+            if retry:
+                try:
+                    await self.collection.bulk_write(retry, ordered=False)
+                except BulkWriteError as again:
+                    failed += len(again.details.get('writeErrors', []))
+
+        self.stats['errors'] += failed
+        self.stats['samples'] += len(operations) - failed
+        self.stats['flushes'] += 1
+        return len(operations) - failed
+
+
+async def load_series(db, did_id, since: Optional[datetime] = None) -> List[Dict]:
+    """A DID's samples in time order, read from the {d, m} index in one query"""
+    query = {'d': did_id}
+    if since:
+        query['m'] = {'$gte': month_key(since)}
+
+    series = []
+    async for bucket in db[COLLECTION].find(query, {'m': 1, 's': 1}).sort('m', 1):
+        series.extend(unpack_sample(bucket['m'], sample) for sample in bucket.get('s', []))
+
+    if since:
+        series = [row for row in series if row['checkedAt'] >= since]
+    series.sort(key=lambda row: row['checkedAt'])
+    return series
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Reputation Queue Worker
+
+Consumes reputation jobs (200 numbers each) straight from Redis and runs a
+whole job as one streaming pipeline: all lookups in flight at once through
+per-proxy keep-alive pools, DIDReputation, DID and reputation_history writes
+flushed as unordered bulk_writes while the remaining lookups finish, and
+blocked numbers retried once on other proxies. Auto-disable is left to
+reputation_sweeper.py.
+
+Enable with REPUTATION_WORKER=python on the Node side; services/reputation-queue.js
+then pushes jobs to these lists instead of Bull:
+
+  <prefix>:high, <prefix>:normal    pending jobs, JSON {id, phoneNumbers, priority, attempts, ...}
+  <prefix>:processing:<worker id>   jobs this worker holds
+  <prefix>:worker:<worker id>       liveness key (TTL), refreshed while the worker runs;
+                                    running workers re-queue processing lists without one
+  <prefix>:completed, <prefix>:failed   counters read by getQueueStatus()
+
+Environment:
+- REDIS_URL                      Redis connection (default: redis://127.0.0.1:6379/0)
+- REPUTATION_QUEUE_PREFIX        List key prefix (default: reputation:jobs)
+- REPUTATION_WORKER_ID           Name of this worker's processing list (default: hostname:pid)
+- REPUTATION_JOB_CONCURRENCY     Jobs processed at once (default: 3)
+- REPUTATION_SCRAPE_CONCURRENCY  Lookups in flight per job (default: 50)
+- MONGODB_URI, WEBSHARE_API_KEY  As for bulk_update_reputation.py
+
+Usage:
+  python3 reputation_queue_worker.py
+  python3 reputation_queue_worker.py --no-proxy --once   # drain the queue, then exit
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import socket
+import sys
+import time
+from datetime import datetime
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import bulk_update_reputation as updater  # noqa: E402
+from bulk_update_reputation import CHECK_INTERVALS, ProxyRotator, phone_key  # noqa: E402
+from fast_robokiller_scraper import ScrapeRecord, scrape_record  # noqa: E402
+from proxy_pools import ProxyConnectionManager  # noqa: E402
+from reputation_history import ReputationHistoryWriter  # noqa: E402
+
+REDIS_URL = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/0')
+QUEUE_PREFIX = os.getenv('REPUTATION_QUEUE_PREFIX', 'reputation:jobs')
+# Unique per process, so workers sharing a host never share a processing list
+WORKER_ID = os.getenv('REPUTATION_WORKER_ID', f'{socket.gethostname()}:{os.getpid()}')
+JOB_CONCURRENCY = int(os.getenv('REPUTATION_JOB_CONCURRENCY', '3'))
+SCRAPE_CONCURRENCY = int(os.getenv('REPUTATION_SCRAPE_CONCURRENCY', '50'))
+
+# Flush database writes every N finished lookups
+WRITE_CHUNK = 50
+
+# Liveness key lifetime and refresh period; a worker id whose key is still
+# alive is held by a running worker and cannot be started twice
+HEARTBEAT_TTL = 30
+HEARTBEAT_INTERVAL = 10
+
+# How often a running worker looks for processing lists of dead workers; a
+# crashed worker's liveness key outlives it by up to HEARTBEAT_TTL
+RECOVER_INTERVAL = HEARTBEAT_TTL
+
+
+def reputation_score(data):
+    """Same scoring as ReputationService.calculateReputationScore, so both workers agree"""
+    score = 50
+
+    if data.get('reputationStatus') == 'Positive':
+        score += 30
+    elif data.get('reputationStatus') == 'Negative':
+        score -= 30
+
+    reports = data.get('userReports') or 0
+    if reports > 0:
+        score -= min(reports * 2, 20)
+
+    if data.get('robokillerStatus') == 'Blocked':
+        score -= 20
+    elif data.get('robokillerStatus') == 'Allowed':
+        score += 10
+
+    if data.get('spamScore') is not None:
+        score -= data['spamScore'] / 5
+
+    # Math.round rounds halves up; Python's round() would not
+    return max(0, min(100, math.floor(score + 0.5)))
+
+
+class JobWriter:
+    """Buffers one job's DIDReputation, DID and history updates and applies them in bulk"""
+
+    def __init__(self, db):
+        self.db = db
+        self.reputation_ops = []
+        self.did_ops = []
+        self.samples = []
+        self.history = ReputationHistoryWriter(db)
+        self.written = 0
+
+    def add(self, number, data):
+        from pymongo import UpdateMany, UpdateOne
+
+        now = datetime.utcnow()
+        status = data.get('reputationStatus') or 'Unknown'
+        score = reputation_score(data)
+        negative = status == 'Negative'
+        next_check_due = now + CHECK_INTERVALS.get(status, CHECK_INTERVALS['Neutral'])
+
+        self.reputation_ops.append(UpdateOne(
+            {'phoneNumber': number},
+            {
+                '$set': {
+                    'robokillerData': data,
+                    'reputationScore': score,
+                    'lastChecked': now,
+                    'nextCheckDue': next_check_due,
+                    'isBlacklisted': negative,
+                    'blacklistedAt': now if negative else None,
+                    'updatedAt': now,
+                },
+                '$inc': {'checkCount': 1},
+                '$setOnInsert': {'createdAt': now},
+            },
+            upsert=True,
+        ))
+
+        self.did_ops.append(UpdateMany({'phoneKey': number}, {'$set': {
+            'reputation.score': score,
+            'reputation.status': status,
+            'reputation.lastChecked': now,
+            'reputation.nextCheckDue': next_check_due,
+            'reputation.robokillerData': data,
+        }}))
+        self.samples.append((number, data, score, now))
+
+    def __len__(self):
+        return len(self.reputation_ops)
+
+    async def flush(self):
+        if not self.reputation_ops:
+            return
+        reputation_ops, self.reputation_ops = self.reputation_ops, []
+        did_ops, self.did_ops = self.did_ops, []
+        samples, self.samples = self.samples, []
+
+        # History is kept per DID: one $in read maps the numbers to their DIDs
+        did_ids = {}
+        cursor = self.db.dids.find({'phoneKey': {'$in': [s[0] for s in samples]}}, {'_id': 1, 'phoneKey': 1})
+        async for did in cursor:
+            did_ids.setdefault(did['phoneKey'], []).append(did['_id'])
+        for number, data, score, checked_at in samples:
+            for did_id in did_ids.get(number, []):
+                self.history.add(did_id, data, score, checked_at)
+
+        await asyncio.gather(
+            self.db.didreputations.bulk_write(reputation_ops, ordered=False),
+            self.db.dids.bulk_write(did_ops, ordered=False),
+            self.history.flush(),
+        )
+        self.written += len(reputation_ops)
+
+
+async def scrape_stream(pools, rotator, numbers, concurrency):
+    """Yield a ScrapeRecord per number as lookups finish, each through a rotated proxy"""
+    slots = asyncio.Semaphore(concurrency)
+
+    async def scrape(number):
+        async with slots:
+            proxy = rotator.get_random_proxy() if rotator else None
+            proxy_url = proxy['url'] if proxy else None
+            try:
+                record = await scrape_record(pools.session_for(proxy_url), number, proxy_url)
+            except Exception as e:
+                record = ScrapeRecord.failed(number, str(e))
+            if proxy_url:
+                if record.success:
+                    rotator.mark_success(proxy_url)
+                elif record.is_blocked:
+                    rotator.mark_blocked(proxy_url)
+            return record
+
+    tasks = [asyncio.ensure_future(scrape(number)) for number in numbers]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def process_job(job, db, pools, rotator, concurrency=SCRAPE_CONCURRENCY):
+    """Scrape and store one job; returns {total, success, failed}"""
+    numbers = [n for n in dict.fromkeys(phone_key(p) for p in job.get('phoneNumbers', [])) if len(n) == 10]
+    writer = JobWriter(db)
+    succeeded = set()
+
+    pending = numbers
+    for _ in range(2):
+        blocked = []
+        async for record in scrape_stream(pools, rotator, pending, concurrency):
+            if record.success and record.data:
+                writer.add(record.phone, record.data)
+                succeeded.add(record.phone)
+                if len(writer) >= WRITE_CHUNK:
+                    await writer.flush()
+            elif record.is_blocked:
+                blocked.append(record.phone)
+        # Blocked lookups get one more try through different proxies
+        pending = blocked
+        if not pending or not rotator:
+            break
+
+    await writer.flush()
+    return {'total': len(numbers), 'success': len(succeeded), 'failed': len(numbers) - len(succeeded)}
+
+
+class QueueWorker:
+    """Takes jobs from the Redis lists (high before normal) and runs up to job_concurrency at once"""
+
+    def __init__(self, redis, db, pools, rotator, prefix=QUEUE_PREFIX, worker_id=WORKER_ID,
+                 job_concurrency=JOB_CONCURRENCY, scrape_concurrency=SCRAPE_CONCURRENCY):
+        self.redis = redis
+        self.db = db
+        self.pools = pools
+        self.rotator = rotator
+        self.prefix = prefix
+        self.high = f'{prefix}:high'
+        self.normal = f'{prefix}:normal'
+        self.worker_id = worker_id
+        self.processing = f'{prefix}:processing:{worker_id}'
+        self.heartbeat_key = f'{prefix}:worker:{worker_id}'
+        self.job_concurrency = job_concurrency
+        self.scrape_concurrency = scrape_concurrency
+        self.stopping = asyncio.Event()
+        self.running = set()
+
+    async def claim(self):
+        """Take this worker id, or raise if a live worker already holds it"""
+        if not await self.redis.set(self.heartbeat_key, os.getpid(), nx=True, ex=HEARTBEAT_TTL):
+            raise RuntimeError(f"worker id {self.worker_id} is held by a running worker "
+                               f"({self.heartbeat_key}); set REPUTATION_WORKER_ID")
+
+    async def heartbeat(self):
+        last_recover = time.monotonic()
+        while not self.stopping.is_set():
+            await self.redis.set(self.heartbeat_key, os.getpid(), ex=HEARTBEAT_TTL)
+            if time.monotonic() - last_recover >= RECOVER_INTERVAL:
+                last_recover = time.monotonic()
+                try:
+                    await self.recover(own=False)
+                except Exception as e:
+                    print(f"⚠️ Rep-queue recovery failed: {e}", file=sys.stderr)
+            try:
+                await asyncio.wait_for(self.stopping.wait(), HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def recover(self, own=True):
+        """
+        Put back jobs taken by workers that are no longer running (the id
+        changes per process), and this worker's own list when own is set
+        (at startup only: while running it holds jobs in flight)
+        """
+        async for key in self.redis.scan_iter(match=f'{self.prefix}:processing:*'):
+            key = key.decode() if isinstance(key, bytes) else key
+            worker_id = key[len(f'{self.prefix}:processing:'):]
+            if key == self.processing:
+                if not own:
+                    continue
+            elif await self.redis.exists(f'{self.prefix}:worker:{worker_id}'):
+                continue
+            recovered = 0
+            while await self.redis.rpoplpush(key, self.normal):
+                recovered += 1
+            if recovered:
+                print(f"♻️ Re-queued {recovered} unfinished job(s) from {key}")
+
+    async def next_job(self):
+        raw = await self.redis.rpoplpush(self.high, self.processing)
+        if raw is None:
+            # Block briefly on normal; high is checked again at least once a second
+            raw = await self.redis.brpoplpush(self.normal, self.processing, timeout=1)
+        return raw
+
+    async def run(self, once=False):
+        await self.claim()
+        heartbeat = asyncio.create_task(self.heartbeat())
+        try:
+            await self.recover()
+            await self.consume(once)
+        finally:
+            self.stopping.set()
+            await heartbeat
+            await self.redis.delete(self.heartbeat_key)
+
+    async def consume(self, once):
+        slots = asyncio.Semaphore(self.job_concurrency)
+
+        while not self.stopping.is_set():
+            await slots.acquire()
+            raw = await self.next_job()
+            if raw is None:
+                slots.release()
+                if once and not self.running:
+                    break
+                continue
+
+            task = asyncio.create_task(self.handle(raw))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+        if self.running:
+            await asyncio.gather(*self.running, return_exceptions=True)
+
+    async def handle(self, raw):
+        start = time.monotonic()
+        job = {}
+        try:
+            job = json.loads(raw)
+            result = await process_job(job, self.db, self.pools, self.rotator, self.scrape_concurrency)
+            await self.redis.incr(f'{self.prefix}:completed')
+            print(f"✅ Rep-queue job {job.get('id')}: {result['success']}/{result['total']} ok "
+                  f"in {time.monotonic() - start:.1f}s")
+        except Exception as e:
+            attempts_made = job.get('attemptsMade', 0) + 1
+            if job and attempts_made < job.get('attempts', 1):
+                await self.redis.lpush(self.normal, json.dumps({**job, 'attemptsMade': attempts_made}))
+                print(f"⚠️ Rep-queue job {job.get('id')} failed, retrying: {e}", file=sys.stderr)
+            else:
+                await self.redis.incr(f'{self.prefix}:failed')
+                print(f"❌ Rep-queue job {job.get('id')} failed: {e}", file=sys.stderr)
+        finally:
+            await self.redis.lrem(self.processing, 1, raw)
+
+    def stop(self):
+        self.stopping.set()
+
+
+async def main(args):
+    import redis.asyncio as aioredis
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(updater.MONGODB_URI)
+    db = client.get_default_database()
+    # REDIS_URL may come from ../.env, which is only loaded once arguments are parsed
+    redis = aioredis.from_url(os.getenv('REDIS_URL', REDIS_URL), decode_responses=True)
+
+    rotator = None
+    if not args.no_proxy:
+        rotator = ProxyRotator()
+        await rotator.load_proxies()
+        if not rotator.proxies:
+            print("WARNING: No proxies available, running without proxies")
+            rotator = None
+
+    pools = ProxyConnectionManager(timeout=aiohttp.ClientTimeout(total=30),
+                                   direct_pool_size=args.scrape_concurrency)
+    await ReputationHistoryWriter(db).ensure_indexes()
+    worker = QueueWorker(redis, db, pools, rotator, job_concurrency=args.jobs,
+                         scrape_concurrency=args.scrape_concurrency)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    print(f"🚀 Reputation worker {WORKER_ID} listening on {worker.high} / {worker.normal} "
+          f"({args.jobs} jobs x {args.scrape_concurrency} lookups)")
+    try:
+        await worker.run(once=args.once)
+    finally:
+        await pools.close()
+        await redis.aclose()
+        client.close()
+        print("🛑 Reputation worker stopped")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Python consumer for the DID reputation queue')
+    parser.add_argument('--jobs', type=int, default=JOB_CONCURRENCY,
+                        help=f'Jobs processed at once (default: {JOB_CONCURRENCY})')
+    parser.add_argument('--scrape-concurrency', type=int, default=SCRAPE_CONCURRENCY,
+                        help=f'Lookups in flight per job (default: {SCRAPE_CONCURRENCY})')
+    parser.add_argument('--no-proxy', action='store_true',
+                        help='Skip Webshare proxies and scrape directly')
+    parser.add_argument('--once', action='store_true',
+                        help='Exit once the queue is empty')
+    args = parser.parse_args()
+
+    updater.load_env()
+
+    asyncio.run(main(args))
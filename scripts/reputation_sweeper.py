@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Reputation Auto-disable Sweeper
+
+Takes DIDs out of rotation when their reputation turns bad and puts them back
+when it recovers. Reputation writers only record scores; this sweeper owns
+the status change, so queue jobs never wait on it.
+
+Each run reads the DIDReputation rows changed since the last watermark (one
+pass over the updatedAt index) and classifies each number:
+
+  disable  isBlacklisted, or reputationScore < AUTO_DISABLE_THRESHOLD
+  recover  not blacklisted and reputationScore >= AUTO_RECOVER_THRESHOLD
+
+then reads the matching DIDs by phoneKey (one pass over the phoneKey index).
+bulk_update_reputation.py scores DIDs in place without a DIDReputation row,
+so a third pass reads DIDs whose reputation.lastChecked moved past the
+watermark and classifies them by reputation.score the same way (it never
+re-enables a DID disabled as blacklisted). Changes are applied with unordered
+bulk_writes. Disabled DIDs are stamped with autoDisabled {at, reason, score};
+only DIDs carrying that stamp are ever re-enabled, so manually deactivated
+DIDs stay off.
+
+Scheduled by ecosystem.config.cjs (the reputation-sweeper app, --loop 300).
+
+Environment:
+- AUTO_DISABLE_THRESHOLD  Disable below this score (default: 40)
+- AUTO_RECOVER_THRESHOLD  Re-enable at or above this score (default: 50)
+- MONGODB_URI             As for bulk_update_reputation.py
+
+Usage:
+  python3 reputation_sweeper.py                # changes since the last run
+  python3 reputation_sweeper.py --dry-run      # report only, watermark untouched
+  python3 reputation_sweeper.py --full         # re-evaluate every reputation
+  python3 reputation_sweeper.py --loop 300     # keep running, every 5 minutes
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import bulk_update_reputation as updater  # noqa: E402
+
+AUTO_DISABLE_THRESHOLD = int(os.getenv('AUTO_DISABLE_THRESHOLD', '40'))
+AUTO_RECOVER_THRESHOLD = int(os.getenv('AUTO_RECOVER_THRESHOLD', '50'))
+
+STATE_ID = 'reputation_auto_disable'
+
+# Writes still in flight when a run starts must not fall behind the watermark
+WATERMARK_LAG = timedelta(seconds=5)
+
+# phoneKeys per $in query and operations per bulk_write
+CHUNK = 1000
+
+# DIDs listed per action in the report
+REPORT_SAMPLE = 20
+
+
+def classify(reputation):
+    """('disable', reason) / ('recover', None) / (None, None) for one DIDReputation row"""
+    score = reputation.get('reputationScore')
+    if reputation.get('isBlacklisted'):
+        return 'disable', 'blacklisted'
+    if score is None:
+        return None, None
+    if score < AUTO_DISABLE_THRESHOLD:
+        return 'disable', 'low_score'
+    if score >= AUTO_RECOVER_THRESHOLD:
+        return 'recover', None
+    return None, None
+
+
+def classify_did(did):
+    """Same as classify() for a DID scored in place (dids.reputation.score)"""
+    score = (did.get('reputation') or {}).get('score')
+    if score is None:
+        return None, None
+    if score < AUTO_DISABLE_THRESHOLD:
+        return 'disable', 'low_score'
+    if score >= AUTO_RECOVER_THRESHOLD:
+        if (did.get('autoDisabled') or {}).get('reason') == 'blacklisted':
+            return None, None
+        return 'recover', None
+    return None, None
+
+
+def plan(did, action, reason, score, report, operations, now):
+    """Queue the status change one decision means for one DID, if any"""
+    from pymongo import UpdateOne
+
+    if action == 'disable' and did.get('status') == 'active':
+        report['disable'].append((did['phoneNumber'], reason, score))
+        operations.append(UpdateOne(
+            {'_id': did['_id'], 'status': 'active'},
+            {'$set': {'status': 'inactive', 'updatedAt': now,
+                      'autoDisabled': {'at': now, 'reason': reason, 'score': score}}}
+        ))
+    elif action == 'recover' and did.get('status') == 'inactive' and did.get('autoDisabled'):
+        report['recover'].append((did['phoneNumber'], did['autoDisabled'].get('reason'), score))
+        operations.append(UpdateOne(
+            {'_id': did['_id'], 'status': 'inactive'},
+            {'$set': {'status': 'active', 'updatedAt': now}, '$unset': {'autoDisabled': ''}}
+        ))
+    else:
+        report['unchanged'] += 1
+
+
+async def sweep(db, dry_run=False, full=False):
+    """One watermark-to-now sweep; returns the report dict"""
+    state = await db.sweeper_state.find_one({'_id': STATE_ID}) or {}
+    since = None if full else state.get('watermark')
+    until = datetime.utcnow() - WATERMARK_LAG
+
+    # Pass 1: changed reputations
+    window = {'$lte': until}
+    if since:
+        window['$gt'] = since
+    decisions = {}
+    scanned = 0
+    cursor = db.didreputations.find(
+        {'updatedAt': window},
+        {'_id': 0, 'phoneNumber': 1, 'reputationScore': 1, 'isBlacklisted': 1}
+    ).sort('updatedAt', 1)
+    async for reputation in cursor:
+        scanned += 1
+        action, reason = classify(reputation)
+        if action:
+            decisions[reputation['phoneNumber']] = (action, reason, reputation.get('reputationScore'))
+
+    # Pass 2: the DIDs those numbers belong to
+    now = datetime.utcnow()
+    operations = []
+    report = {'since': since, 'until': until, 'reputations_scanned': scanned, 'dids_scanned': 0,
+              'candidates': len(decisions), 'disable': [], 'recover': [], 'unchanged': 0}
+    keys = list(decisions)
+    for i in range(0, len(keys), CHUNK):
+        cursor = db.dids.find(
+            {'phoneKey': {'$in': keys[i:i + CHUNK]}},
+            {'phoneKey': 1, 'phoneNumber': 1, 'tenantId': 1, 'status': 1, 'autoDisabled': 1}
+        )
+        async for did in cursor:
+            action, reason, score = decisions[did['phoneKey']]
+            plan(did, action, reason, score, report, operations, now)
+
+    # Pass 3: DIDs scored in place since the watermark (bulk_update_reputation.py)
+    cursor = db.dids.find(
+        {'reputation.lastChecked': window},
+        {'phoneKey': 1, 'phoneNumber': 1, 'tenantId': 1, 'status': 1, 'autoDisabled': 1, 'reputation.score': 1}
+    )
+    async for did in cursor:
+        report['dids_scanned'] += 1
+        if did.get('phoneKey') in decisions:
+            continue  # DIDReputation already decided this number
+        action, reason = classify_did(did)
+        if action:
+            report['candidates'] += 1
+            plan(did, action, reason, did['reputation']['score'], report, operations, now)
+
+    if dry_run:
+        return report
+
+    modified = 0
+    for i in range(0, len(operations), CHUNK):
+        result = await db.dids.bulk_write(operations[i:i + CHUNK], ordered=False)
+        modified += result.modified_count
+    report['modified'] = modified
+
+    await db.sweeper_state.update_one(
+        {'_id': STATE_ID},
+        {'$set': {'watermark': until, 'lastRun': now,
+                  'lastReport': {k: len(v) if isinstance(v, list) else v
+                                 for k, v in report.items() if k not in ('since', 'until')}}},
+        upsert=True
+    )
+    return report
+
+
+def print_report(report, dry_run):
+    since = report['since'].strftime('%Y-%m-%d %H:%M:%S') if report['since'] else 'the beginning'
+    print(f"{'DRY RUN - ' if dry_run else ''}Reputation sweep: changes since {since}")
+    print(f"  Reputations scanned: {report['reputations_scanned']}")
+    print(f"  DIDs scored in place: {report['dids_scanned']}")
+    print(f"  Numbers to act on:   {report['candidates']}")
+    print(f"  DIDs to disable:     {len(report['disable'])}")
+    print(f"  DIDs to re-enable:   {len(report['recover'])}")
+    print(f"  DIDs already right:  {report['unchanged']}")
+    if 'modified' in report:
+        print(f"  DIDs updated:        {report['modified']}")
+
+    for label, rows in (('disable', report['disable']), ('re-enable', report['recover'])):
+        for phone, reason, score in rows[:REPORT_SAMPLE]:
+            print(f"    {label:9s} {phone} ({reason}, score {score})")
+        if len(rows) > REPORT_SAMPLE:
+            print(f"    ... {len(rows) - REPORT_SAMPLE} more to {label}")
+
+
+async def main(args):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(updater.MONGODB_URI)
+    db = client.get_default_database()
+    await db.didreputations.create_index('updatedAt')
+    await db.dids.create_index('reputation.lastChecked')
+
+    try:
+        while True:
+            report = await sweep(db, dry_run=args.dry_run, full=args.full)
+            print_report(report, args.dry_run)
+            if not args.loop:
+                break
+            await asyncio.sleep(args.loop)
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Auto-disable and recover DIDs from reputation changes')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Report what would change without writing or moving the watermark')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore the watermark and evaluate every reputation')
+    parser.add_argument('--loop', type=int, default=None, metavar='SECONDS',
+                        help='Repeat every SECONDS instead of running once')
+    args = parser.parse_args()
+
+    updater.load_env()
+
+    asyncio.run(main(args))
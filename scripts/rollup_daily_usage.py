@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Nightly DID Usage Rollup
+
+/dids/next counts calls in DID.usage.today = {day, count}: an atomic $inc on
+the same day, and on the first call of a new day the old counter is appended
+to usage.dailyUsage before it restarts. DIDs that were not dialled since
+midnight still hold yesterday's counter, and older dailyUsage arrays can
+carry several entries for one day. This job:
+
+  1. moves every counter left over from a previous day onto dailyUsage
+     (one server-side update_many; safe against concurrent dials)
+  2. compacts dailyUsage: one entry per day, oldest first, last N days only
+
+Run it shortly after midnight, in the same timezone as the API server, since
+"today" is the server's local midnight. ecosystem.config.cjs schedules it as
+the PM2 app daily-usage-rollup (00:05).
+
+Environment:
+- DAILY_USAGE_DAYS  Days of history kept in dailyUsage (default: 30)
+- MONGODB_URI       As for bulk_update_reputation.py
+
+Usage:
+  python3 rollup_daily_usage.py
+  python3 rollup_daily_usage.py --dry-run
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import bulk_update_reputation as updater  # noqa: E402
+
+DAILY_USAGE_DAYS = int(os.getenv('DAILY_USAGE_DAYS', '30'))
+
+# Operations per bulk_write
+CHUNK = 1000
+
+
+def local_midnight(now=None):
+    """Today's local midnight as the naive UTC datetime pymongo stores"""
+    now = (now or datetime.now()).astimezone()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return midnight.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def compact_daily_usage(entries, oldest):
+    """One {date, count} per day from `oldest` on, sorted by date"""
+    counts = {}
+    for entry in entries or []:
+        date = entry.get('date')
+        if date is None or date < oldest:
+            continue
+        counts[date] = counts.get(date, 0) + (entry.get('count') or 0)
+    return [{'date': date, 'count': counts[date]} for date in sorted(counts)]
+
+
+async def roll_over(db, today, dry_run=False):
+    """Move counters from previous days onto dailyUsage; returns DIDs affected"""
+    stale = {'usage.today.day': {'$lt': today}, 'usage.today.count': {'$gt': 0}}
+    if dry_run:
+        return await db.dids.count_documents(stale)
+
+    result = await db.dids.update_many(stale, [{
+        '$set': {
+            'usage.dailyUsage': {'$concatArrays': [
+                {'$ifNull': ['$usage.dailyUsage', []]},
+                [{'date': '$usage.today.day', 'count': '$usage.today.count'}],
+            ]},
+            'usage.today': {'day': today, 'count': 0},
+        }
+    }])
+    return result.modified_count
+
+
+async def compact(db, oldest, dry_run=False):
+    """Rewrite every dailyUsage array that is not already compact; returns (scanned, changed)"""
+    from pymongo import UpdateOne
+
+    scanned = 0
+    changed = 0
+    operations = []
+    cursor = db.dids.find({'usage.dailyUsage.0': {'$exists': True}}, {'usage.dailyUsage': 1})
+    async for did in cursor:
+        scanned += 1
+        current = did['usage']['dailyUsage']
+        compacted = compact_daily_usage(current, oldest)
+        if compacted == [{'date': e.get('date'), 'count': e.get('count')} for e in current]:
+            continue
+        changed += 1
+        # Only if no dial has rolled a counter over since it was read
+        operations.append(UpdateOne(
+            {'_id': did['_id'], 'usage.dailyUsage': current},
+            {'$set': {'usage.dailyUsage': compacted}}
+        ))
+        if len(operations) >= CHUNK and not dry_run:
+            await db.dids.bulk_write(operations, ordered=False)
+            operations = []
+
+    if operations and not dry_run:
+        await db.dids.bulk_write(operations, ordered=False)
+    return scanned, changed
+
+
+async def main(args):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(updater.MONGODB_URI)
+    db = client.get_default_database()
+
+    today = local_midnight()
+    oldest = today - timedelta(days=args.days)
+    prefix = 'DRY RUN - ' if args.dry_run else ''
+
+    try:
+        print(f"{prefix}📅 Rolling up DID usage before {today:%Y-%m-%d %H:%M} UTC, keeping {args.days} days")
+        rolled = await roll_over(db, today, dry_run=args.dry_run)
+        print(f"  ✅ Counters moved to dailyUsage: {rolled}")
+        scanned, changed = await compact(db, oldest, dry_run=args.dry_run)
+        print(f"  ✅ dailyUsage arrays compacted:  {changed} of {scanned}")
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Roll DID daily usage counters into dailyUsage history')
+    parser.add_argument('--days', type=int, default=DAILY_USAGE_DAYS,
+                        help=f'Days of history to keep (default: {DAILY_USAGE_DAYS})')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Report what would change without writing')
+    args = parser.parse_args()
+
+    updater.load_env()
+
+    asyncio.run(main(args))
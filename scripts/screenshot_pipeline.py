@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Queued Screenshot Pipeline
+
+Screenshots are evidence for the UI, not input to extraction, so lookups
+hand the captured bytes to this queue and return their data straight away.
+A bounded set of workers encodes and writes the files in the background.
+
+- Capture is a JPEG at a capped size (SCREENSHOT_MAX_WIDTH x SCREENSHOT_MAX_HEIGHT)
+  instead of an unbounded full-page PNG
+- WebP re-encoding when SCREENSHOT_FORMAT=webp and Pillow is installed
+- File names are content hashes (robokiller_<number>_<hash>.<ext>), so an
+  unchanged page is stored once
+- Only the newest SCREENSHOT_KEEP_PER_NUMBER files are kept per number
+- A sweeper deletes the oldest files when the directory exceeds SCREENSHOT_MAX_MB
+
+Environment:
+- SCREENSHOT_DIR              Output directory (default: /home/na/didapi/public/screenshots)
+- SCREENSHOT_WORKERS          Encoder/writer workers (default: 2)
+- SCREENSHOT_QUEUE_SIZE       Pending screenshots before new ones are dropped (default: 100)
+- SCREENSHOT_FORMAT           jpeg or webp (default: jpeg)
+- SCREENSHOT_QUALITY          Encoder quality 1-100 (default: 70)
+- SCREENSHOT_MAX_WIDTH/HEIGHT Capture size cap in pixels (default: 1280 x 2400)
+- SCREENSHOT_KEEP_PER_NUMBER  Files kept per number (default: 5)
+- SCREENSHOT_MAX_MB           Directory size budget (default: 500)
+
+Usage:
+    pipeline = ScreenshotPipeline()
+    filename = pipeline.submit(clean_number, await pipeline.capture(page))
+    ...
+    await pipeline.close()   # drains the queue
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import sys
+from typing import Optional
+
+SCREENSHOT_DIR = os.getenv('SCREENSHOT_DIR', '/home/na/didapi/public/screenshots')
+SCREENSHOT_WORKERS = int(os.getenv('SCREENSHOT_WORKERS', '2'))
+SCREENSHOT_QUEUE_SIZE = int(os.getenv('SCREENSHOT_QUEUE_SIZE', '100'))
+SCREENSHOT_FORMAT = os.getenv('SCREENSHOT_FORMAT', 'jpeg')
+SCREENSHOT_QUALITY = int(os.getenv('SCREENSHOT_QUALITY', '70'))
+SCREENSHOT_MAX_WIDTH = int(os.getenv('SCREENSHOT_MAX_WIDTH', '1280'))
+SCREENSHOT_MAX_HEIGHT = int(os.getenv('SCREENSHOT_MAX_HEIGHT', '2400'))
+SCREENSHOT_KEEP_PER_NUMBER = int(os.getenv('SCREENSHOT_KEEP_PER_NUMBER', '5'))
+SCREENSHOT_MAX_MB = float(os.getenv('SCREENSHOT_MAX_MB', '500'))
+
+# Run the directory size sweep once every N written files
+SWEEP_EVERY = 50
+
+EXTENSIONS = {'jpeg': 'jpg', 'webp': 'webp'}
+
+
+def _webp_available() -> bool:
+    try:
+        import PIL.Image  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class ScreenshotPipeline:
+    """Bounded background queue that encodes, deduplicates and prunes screenshots"""
+
+    def __init__(self, directory: str = SCREENSHOT_DIR, workers: int = SCREENSHOT_WORKERS,
+                 queue_size: int = SCREENSHOT_QUEUE_SIZE, fmt: str = SCREENSHOT_FORMAT,
+                 quality: int = SCREENSHOT_QUALITY, keep_per_number: int = SCREENSHOT_KEEP_PER_NUMBER,
+                 max_bytes: int = int(SCREENSHOT_MAX_MB * 1024 * 1024), prefix: str = 'robokiller'):
+        if fmt == 'webp' and not _webp_available():
+            print("⚠️ Pillow not installed, writing JPEG screenshots instead of WebP", file=sys.stderr)
+            fmt = 'jpeg'
+        self.directory = directory
+        self.fmt = fmt
+        self.quality = quality
+        self.keep_per_number = keep_per_number
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.worker_count = workers
+        self.workers = []
+        self.stats = {'queued': 0, 'written': 0, 'deduplicated': 0, 'dropped': 0, 'pruned': 0, 'errors': 0}
+
+    async def capture(self, page) -> bytes:
+        """JPEG of the page, capped in width and height"""
+        size = await page.evaluate('() => [document.documentElement.scrollWidth, document.documentElement.scrollHeight]')
+        width = min(size[0] or SCREENSHOT_MAX_WIDTH, SCREENSHOT_MAX_WIDTH)
+        height = min(size[1] or SCREENSHOT_MAX_HEIGHT, SCREENSHOT_MAX_HEIGHT)
+        return await page.screenshot(type='jpeg', quality=self.quality, full_page=True,
+                                     clip={'x': 0, 'y': 0, 'width': width, 'height': height})
+
+    def filename_for(self, number: str, image: bytes) -> str:
+        digest = hashlib.sha256(image).hexdigest()[:16]
+        return f'{self.prefix}_{number}_{digest}.{EXTENSIONS[self.fmt]}'
+
+    def submit(self, number: str, image: bytes) -> Optional[str]:
+        """Queue a captured screenshot; returns the file name it will be written as.
+
+        Returns None when the queue is full: the screenshot is dropped rather
+        than making the lookup wait.
+        """
+        if not self.workers:
+            self.workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+        filename = self.filename_for(number, image)
+        try:
+            self.queue.put_nowait((number, image, filename))
+        except asyncio.QueueFull:
+            self.stats['dropped'] += 1
+            print(f"⚠️ Screenshot queue full, dropped {filename}", file=sys.stderr)
+            return None
+        self.stats['queued'] += 1
+        return filename
+
+    async def _worker(self):
+        while True:
+            number, image, filename = await self.queue.get()
+            try:
+                # Encoding and disk I/O run off the event loop
+                await asyncio.to_thread(self._store, number, image, filename)
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"❌ Screenshot write failed for {filename}: {e}", file=sys.stderr)
+            finally:
+                self.queue.task_done()
+
+    def _store(self, number: str, image: bytes, filename: str):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, filename)
+
+        if os.path.exists(path):
+            # Same page as before: just mark it as the newest for retention
+            os.utime(path)
+            self.stats['deduplicated'] += 1
+        else:
+            if self.fmt == 'webp':
+                from PIL import Image
+                out = io.BytesIO()
+                Image.open(io.BytesIO(image)).save(out, 'WEBP', quality=self.quality)
+                image = out.getvalue()
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(image)
+            os.replace(tmp_path, path)
+            self.stats['written'] += 1
+            if self.stats['written'] % SWEEP_EVERY == 0:
+                self.sweep()
+
+        self._prune_number(number)
+
+    def _prune_number(self, number: str):
+        """Keep only the newest keep_per_number files for this number"""
+        marker = f'{self.prefix}_{number}_'
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                 if name.startswith(marker) and not name.endswith('.tmp')]
+        if len(files) <= self.keep_per_number:
+            return
+        files.sort(key=os.path.getmtime, reverse=True)
+        for path in files[self.keep_per_number:]:
+            self._remove(path)
+
+    def sweep(self):
+        """Delete the oldest screenshots until the directory is under its size budget"""
+        if not os.path.isdir(self.directory):
+            return
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.startswith(f'{self.prefix}_'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                total -= size
+
+    def _remove(self, path: str) -> bool:
+        try:
+            os.remove(path)
+            self.stats['pruned'] += 1
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def close(self):
+        """Wait for queued screenshots to be written, then stop the workers"""
+        if self.workers:
+            await self.queue.join()
+            for worker in self.workers:
+                worker.cancel()
+            await asyncio.gather(*self.workers, return_exceptions=True)
+            self.workers = []
+        await asyncio.to_thread(self.sweep)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Import-time profiling for the scraper entry points
+
+Node spawns the scrapers once per job, so every lookup pays their import
+time. Entry points accept --profile-startup, which re-imports the script in
+a fresh interpreter under `python -X importtime` and prints where the time
+goes, plus the cost of each dependency that is only imported on a specific
+code path (playwright, requests, motor, ...).
+
+Usage:
+  python3 scripts/fast_robokiller_scraper.py --profile-startup
+  python3 scripts/startup_profile.py enhanced_openrouter_scraper playwright.async_api requests
+"""
+
+import os
+import subprocess
+import sys
+from typing import Dict, Optional, Sequence
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure_import(module: str, runs: int = 3) -> Optional[Dict]:
+    """Import a module in fresh interpreters; return the fastest run's breakdown.
+
+    Returns {"total_us": int, "modules": [(name, self_us, cumulative_us), ...]}
+    or None if the module cannot be imported.
+    """
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=SCRIPTS_DIR, capture_output=True, text=True,
+            env={**os.environ, 'PYTHONPATH': SCRIPTS_DIR, 'PYTHONDONTWRITEBYTECODE': '1'}
+        )
+        if proc.returncode != 0:
+            return None
+
+        modules = []
+        total_us = 0
+        for line in proc.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            name = name[1:].rstrip()  # drop the separator space, keep the nesting indent
+            modules.append((name, int(self_us), int(cumulative_us)))
+            if name == module:
+                total_us = int(cumulative_us)
+
+        if best is None or total_us < best['total_us']:
+            best = {'total_us': total_us, 'modules': modules}
+    return best
+
+
+def print_startup_profile(script_path: str, lazy_modules: Sequence[str] = (), top: int = 15):
+    """Print an import-time breakdown for an entry point script to stderr"""
+    module = os.path.splitext(os.path.basename(script_path))[0]
+    result = measure_import(module)
+    if result is None:
+        print(f"❌ {module} failed to import", file=sys.stderr)
+        return
+
+    print(f"⏱️  Startup profile: {module} imports in {result['total_us'] / 1000:.1f} ms", file=sys.stderr)
+
+    # Direct imports of the script; deeper ones are inside their parent's cumulative time.
+    # importtime lists children before their parent, indented one level (two spaces).
+    modules = result['modules']
+    end = next(i for i, m in enumerate(modules) if m[0] == module)
+    direct = []
+    for name, self_us, cumulative_us in reversed(modules[:end]):
+        if not name.startswith(' '):
+            break
+        if not name.startswith('   '):
+            direct.append((name, self_us, cumulative_us))
+    direct.sort(key=lambda m: m[2], reverse=True)
+
+    print(f"   {'module':<40} {'cumulative ms':>14} {'self ms':>9}", file=sys.stderr)
+    for name, self_us, cumulative_us in direct[:top]:
+        print(f"   {name.strip():<40} {cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}", file=sys.stderr)
+
+    if lazy_modules:
+        print("   Deferred until their code path runs:", file=sys.stderr)
+        for lazy in lazy_modules:
+            lazy_result = measure_import(lazy, runs=1)
+            cost = f"{lazy_result['total_us'] / 1000:.1f} ms" if lazy_result else 'not installed'
+            print(f"   {lazy:<40} {cost:>14}", file=sys.stderr)
+
+
+def cold_start_ms(module: str, runs: int = 3) -> Optional[float]:
+    """Fastest import time of a module in a fresh interpreter, in ms"""
+    result = measure_import(module, runs)
+    return result['total_us'] / 1000 if result else None
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(__doc__, file=sys.stderr)
+        sys.exit(1)
+    print_startup_profile(sys.argv[1], sys.argv[2:])
@@ -173,9 +173,11 @@ function mapRowToDid(row, didCol, tenantId, sysUserId, capacity) {
     }];
   }
 
+  // Raw collection writes bypass the DID model middleware, so set phoneKey here
   const insert = {
     tenantId,
     phoneNumber: phone,
+    phoneKey: phone.slice(2),
     createdBy: sysUserId,
     capacity,
   };
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Cold-start budget for the scraper entry points
+
+Fails when importing an entry point in a fresh interpreter takes longer than
+its budget, or when it eagerly imports a dependency that should stay lazy.
+
+Usage:
+  python3 scripts/test_startup_budget.py
+  STARTUP_BUDGET_SCALE=2 python3 scripts/test_startup_budget.py   # slow CI machine
+  python3 -m pytest scripts/test_startup_budget.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from startup_profile import measure_import  # noqa: E402
+
+# entry point -> (budget in ms, packages that must not load at import time)
+BUDGETS = {
+    'fast_robokiller_scraper': (500, ('requests', 'playwright', 'crawl4ai', 'motor')),
+    'enhanced_openrouter_scraper': (300, ('requests', 'playwright', 'crawl4ai')),
+    'bulk_update_reputation': (550, ('motor', 'pymongo', 'dotenv', 'requests', 'playwright')),
+}
+
+BUDGET_SCALE = float(os.getenv('STARTUP_BUDGET_SCALE', '1'))
+
+
+def check_entry_point(module: str):
+    budget_ms, forbidden = BUDGETS[module]
+    result = measure_import(module)
+    assert result is not None, f"{module} failed to import"
+
+    loaded = {name.strip().split('.')[0] for name, _, _ in result['modules']}
+    eager = sorted(loaded & set(forbidden))
+    assert not eager, f"{module} imports {', '.join(eager)} at load time"
+
+    elapsed_ms = result['total_us'] / 1000
+    limit_ms = budget_ms * BUDGET_SCALE
+    assert elapsed_ms <= limit_ms, f"{module} cold start {elapsed_ms:.1f} ms exceeds budget {limit_ms:.0f} ms"
+    return elapsed_ms
+
+
+def test_fast_robokiller_scraper_startup():
+    check_entry_point('fast_robokiller_scraper')
+
+
+def test_enhanced_openrouter_scraper_startup():
+    check_entry_point('enhanced_openrouter_scraper')
+
+
+def test_bulk_update_reputation_startup():
+    check_entry_point('bulk_update_reputation')
+
+
+if __name__ == '__main__':
+    failed = 0
+    for module in BUDGETS:
+        try:
+            elapsed_ms = check_entry_point(module)
+            print(f"✅ {module}: {elapsed_ms:.1f} ms (budget {BUDGETS[module][0] * BUDGET_SCALE:.0f} ms)")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {e}")
+    sys.exit(1 if failed else 0)
@@ -25,12 +25,18 @@ from playwright.async_api import async_playwright, Page, BrowserContext
 from motor.motor_asyncio import AsyncIOMotorClient
 import httpx
 
+from llm_cache import get_extraction_cache
+from page_load import block_resources, goto_and_wait, YOUMAIL_ANCHORS
+
 # Configuration
 WEBSHARE_API_KEY = os.getenv('WEBSHARE_API_KEY', 'qcv48genia4yzeayykuh4qzvqusywmbgko6k2ppv')
 AI_MODEL_URL = os.getenv('AI_MODEL_URL', 'http://199.68.217.31:47101/v1')
 AI_MODEL_NAME = os.getenv('AI_MODEL_NAME', 'captcha-solver')
 MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://127.0.0.1:27017/did-optimizer')
 
+# Bump when the extraction prompt changes so stale cached results are not reused
+REPUTATION_PROMPT_VERSION = 'youmail-html-v1'
+
 
 @dataclass
 class YouMailReputation:
@@ -118,6 +124,7 @@ class AIAnalyzer:
     def __init__(self, model_url: str = AI_MODEL_URL, model_name: str = AI_MODEL_NAME):
         self.model_url = model_url
         self.model_name = model_name
+        self.cache = get_extraction_cache()
 
     async def analyze_challenge(self, screenshot: bytes, width: int, height: int) -> Dict:
         """Analyze screenshot for Cloudflare challenges"""
@@ -168,6 +175,14 @@ JSON response only:
         # Truncate to ~20K chars (safe for 32K context with prompt overhead)
         relevant_html = clean_html[:20000]
 
+        # Identical pages skip inference entirely
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(relevant_html, REPUTATION_PROMPT_VERSION, self.model_name, phone=phone)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         prompt = f"""Analyze this YouMail phone lookup page for {phone} and extract ALL reputation information.
 
 Return a JSON object with these fields (use null if not found, be thorough):
@@ -218,7 +233,10 @@ Page HTML:
                     content = data['choices'][0]['message']['content']
                     match = re.search(r'\{.*\}', content, re.DOTALL)
                     if match:
-                        return json.loads(match.group(0))
+                        extracted = json.loads(match.group(0))
+                        if self.cache and extracted:
+                            self.cache.put(cache_key, extracted, REPUTATION_PROMPT_VERSION, self.model_name)
+                        return extracted
                 else:
                     print(f"AI response missing choices: {str(data)[:200]}", file=sys.stderr)
         except Exception as e:
@@ -361,6 +379,8 @@ class YouMailAIScraper:
                         if len(html) > 10000:
                             self.sessions_created += 1
                             print(f"✓ Session {self.sessions_created} ready (proxy: {proxy['host']})", file=sys.stderr)
+                            # Challenge is solved; lookups only need the HTML from here on
+                            await block_resources(context, 'data')
                             return YouMailSession(context, page, proxy)
 
                 await context.close()
@@ -396,8 +416,9 @@ class YouMailAIScraper:
             try:
                 # Use path format
                 url = f"https://directory.youmail.com/phone/{formatted}"
-                await self.session.page.goto(url, wait_until='domcontentloaded')
-                await asyncio.sleep(1)
+                # Wait for the summary block instead of a fixed sleep; block/challenge
+                # pages never render it and are caught by the checks below
+                await goto_and_wait(self.session.page, url, YOUMAIL_ANCHORS, nav_timeout=self.timeout)
 
                 html = await self.session.page.content()
                 self.session.lookup_count += 1
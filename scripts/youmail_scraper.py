@@ -36,6 +36,8 @@ from pathlib import Path
 from playwright.async_api import async_playwright, Page, BrowserContext
 import httpx
 
+from page_load import block_resources, goto_and_wait, YOUMAIL_ANCHORS
+
 # Configuration
 WEBSHARE_API_KEY = os.getenv('WEBSHARE_API_KEY', 'qcv48genia4yzeayykuh4qzvqusywmbgko6k2ppv')
 AI_MODEL_URL = os.getenv('AI_MODEL_URL', 'http://199.68.217.31:47101/v1')
@@ -376,6 +378,8 @@ class YouMailScraper:
                         html = await page.content()
                         if len(html) > 10000 and 'youmail' in html.lower():
                             print(f"  ✓ Session established! (HTML: {len(html)} bytes)", file=sys.stderr)
+                            # Challenge is solved; lookups only need the HTML from here on
+                            await block_resources(context, 'data')
                             return YouMailSession(context, page, proxy)
 
                 await context.close()
@@ -420,8 +424,9 @@ class YouMailScraper:
 
             try:
                 # Navigate to phone page using existing session
-                await self.session.page.goto(url, wait_until='domcontentloaded')
-                await asyncio.sleep(1.5)
+                # Wait for the summary block instead of a fixed sleep; block/challenge
+                # pages never render it and are caught by the checks below
+                await goto_and_wait(self.session.page, url, YOUMAIL_ANCHORS, nav_timeout=self.timeout)
 
                 html = await self.session.page.content()
                 self.session.lookup_count += 1
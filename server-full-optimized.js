@@ -287,8 +287,6 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) {
     // Calculate today's date boundaries for daily usage filtering
     const today = new Date();
     today.setHours(0, 0, 0, 0);
-    const tomorrow = new Date(today);
-    tomorrow.setDate(tomorrow.getDate() + 1);
 
     // Try to get rotation state from cache first
     let rotationState = getCachedRotationState(tenantId);
@@ -299,7 +297,7 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) {
       rotationState = freshTenant.rotationState || {
         currentIndex: 0,
         lastReset: new Date(),
-        usedDidsInCycle: []
+        cycleId: 1
       };
       setCachedRotationState(tenantId, rotationState);
     }
@@ -307,10 +305,11 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) {
     console.log('🔍 Rotation state loaded:', {
       cached: rotationState !== null,
       currentIndex: rotationState.currentIndex,
-      usedInCycle: rotationState.usedDidsInCycle?.length || 0
+      cycleId: rotationState.cycleId || 1
     });
 
-    const usedDidsSet = new Set(rotationState.usedDidsInCycle || []);
+    // DIDs picked this cycle carry its number in lastCycleId
+    let cycleId = rotationState.cycleId || 1;
 
     // **OPTIMIZED AGGREGATION PIPELINE**
     // Combines multiple queries into one efficient aggregation:
@@ -329,28 +328,7 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) {
       {
         $addFields: {
           todayUsage: {
-            $let: {
-              vars: {
-                todayEntry: {
-                  $arrayElemAt: [
-                    {
-                      $filter: {
-                        input: { $ifNull: ['$usage.dailyUsage', []] },
-                        as: 'day',
-                        cond: {
-                          $and: [
-                            { $gte: ['$$day.date', today] },
-                            { $lt: ['$$day.date', tomorrow] }
-                          ]
-                        }
-                      }
-                    },
-                    0
-                  ]
-                }
-              },
-              in: { $ifNull: ['$$todayEntry.count', 0] }
-            }
+            $cond: [{ $eq: ['$usage.today.day', today] }, '$usage.today.count', 0]
           },
           effectiveCapacity: { $ifNull: ['$capacity', defaultCapacity] }
         }
@@ -360,7 +338,7 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) {
         $addFields: {
           hasCapacity: { $lt: ['$todayUsage', '$effectiveCapacity'] },
           hasGoodReputation: { $gte: [{ $ifNull: ['$reputation.score', 50] }, 50] },
-          isUnusedInCycle: { $not: { $in: ['$_id', Array.from(usedDidsSet)] } }
+          isUnusedInCycle: { $ne: [{ $ifNull: ['$lastCycleId', 0] }, cycleId] }
         }
       },
       // Facet to get both counts and candidate DIDs
@@ -378,6 +356,9 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) {
                 },
                 hasCapacity: {
                   $sum: { $cond: ['$hasCapacity', 1, 0] }
+                },
+                usedInCycle: {
+                  $sum: { $cond: [{ $and: ['$hasGoodReputation', { $not: ['$isUnusedInCycle'] }] }, 1, 0] }
                 }
               }
             }
@@ -475,7 +456,7 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) {
     console.log(`⚡ Aggregation completed in ${queryTime}ms`);
 
     // Extract results
-    const stats = result.stats[0] || { total: 0, active: 0, goodReputation: 0, hasCapacity: 0 };
+    const stats = result.stats[0] || { total: 0, active: 0, goodReputation: 0, hasCapacity: 0, usedInCycle: 0 };
     let selectedDid = result.strategy1[0] || result.strategy2[0] || result.strategy3[0] || result.strategy4[0];
     let strategy = selectedDid ?
       (result.strategy1[0] ? 'Strategy 1: Unused in cycle' :
@@ -493,14 +474,14 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) {
     });
 
     // Check if we need to reset cycle
-    const shouldResetCycle = usedDidsSet.size >= stats.goodReputation ||
+    const shouldResetCycle = stats.usedInCycle >= stats.goodReputation ||
                             (new Date() - new Date(rotationState.lastReset)) > 24 * 60 * 60 * 1000;
 
     if (shouldResetCycle && result.strategy2[0]) {
       console.log('🔄 Resetting rotation cycle - starting fresh round');
-      usedDidsSet.clear();
-      rotationState.currentIndex = 0;
-      rotationState.lastReset = new Date();
+      rotationState = await Tenant.advanceRotationCycle(tenantId, cycleId) || rotationState;
+      cycleId = rotationState.cycleId || cycleId + 1;
+      setCachedRotationState(tenantId, rotationState);
       selectedDid = result.strategy2[0]; // Use strategy 2 after reset
     }
 
@@ -549,14 +530,6 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) {
       });
     }
 
-    // Update rotation state
-    usedDidsSet.add(selectedDid._id.toString());
-    rotationState.currentIndex = (rotationState.currentIndex + 1) % stats.active;
-    rotationState.usedDidsInCycle = Array.from(usedDidsSet);
-
-    // Cache the updated rotation state
-    setCachedRotationState(tenantId, rotationState);
-
     console.log('🎯 Selected DID:', {
       number: selectedDid.phoneNumber,
       strategy: strategy,
@@ -566,7 +539,7 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) {
     });
 
     // **OPTIMIZED: Batch all writes together**
-    // Update DID usage, save rotation state, and create call record in parallel
+    // Update DID usage and cycle membership, and create call record in parallel
     const now = new Date();
     const uniqueid = req.headers['x-request-id'] || '';
 
@@ -574,31 +547,15 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) {
       // Update DID usage with atomic operations
       DID.findByIdAndUpdate(
         selectedDid._id,
-        {
-          $set: {
-            'usage.lastUsed': now,
-            'usage.lastCampaign': campaign_id,
-            'usage.lastAgent': agent_id
-          },
-          $inc: { 'usage.totalCalls': 1 },
-          $push: {
-            'usage.dailyUsage': {
-              $each: [{ date: today, count: 1 }],
-              $position: 0,
-              $slice: 30 // Keep only last 30 days
-            }
-          }
-        },
+        DID.todayUsageUpdate(now, {
+          'usage.lastUsed': now,
+          'usage.lastCampaign': campaign_id,
+          'usage.lastAgent': agent_id,
+          lastCycleId: cycleId
+        }),
         { new: false } // We don't need the updated document
       ).lean(),
 
-      // Save rotation state to tenant (async, non-blocking)
-      Tenant.findByIdAndUpdate(
-        tenantId,
-        { $set: { rotationState: rotationState } },
-        { new: false }
-      ).lean(),
-
       // Create call record (async, non-blocking)
       CallRecord.create({
         didId: selectedDid._id,
@@ -623,8 +580,8 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) {
 
     console.log('✅ All updates completed:', {
       selectedDID: selectedDid.phoneNumber,
-      newIndex: rotationState.currentIndex,
-      usedInCycle: usedDidsSet.size,
+      cycleId,
+      usedInCycle: stats.usedInCycle + 1,
       totalActive: stats.active,
       queryTime: `${queryTime}ms`
     });
@@ -1007,7 +964,7 @@ passport.use(new GoogleStrategy({
         rotationState: {
           currentIndex: 0,
           lastReset: new Date(),
-          usedDidsInCycle: []
+          cycleId: 1
         }
       });
       const savedTenant = await newTenant.save();
@@ -1241,7 +1198,7 @@ app.post('/api/v1/auth/register', async (req, res) => {
       rotationState: {
         currentIndex: 0,
         lastReset: new Date(),
-        usedDidsInCycle: []
+        cycleId: 1
       }
     });
     const savedTenant = await newTenant.save();
@@ -57,7 +57,7 @@ import { errorHandler, notFound } from './middleware/errorHandler.js';
 // IMPORTANT: Import models BEFORE routes so mongoose.model() works in route files
 import User from './models/User.js';
 import Tenant from './models/Tenant.js';
-import DID from './models/DID.js';
+import DID, { toPhoneKey } from './models/DID.js';
 import CallRecord from './models/CallRecord.js';
 import AuditLog from './models/AuditLog.js';
 import AreaCodeLocation from './models/AreaCodeLocation.js';
@@ -86,6 +86,10 @@ import { calculateResellerCharge, RESELLER_PRICING_TIERS } from './services/bill
 import { startAllBillingJobs } from './services/billing/monthlyBilling.js';
 import { startVicidialDidSyncJob } from './services/vicidial-sync-cron.js';
 import backgroundScraperService from './services/background-scraper-service.js';
+import didSelectionIndex from './services/did-selection-index.js';
+import areaCodeProximity from './services/area-code-proximity.js';
+import selectionWrites from './services/selection-write-buffer.js';
+import rotationStore from './services/rotation-state-store.js';
 import { reputationQueue, getQueueStatus } from './services/reputation-queue.js';
 
 // API key validation middleware using the same DB connection
@@ -152,8 +156,16 @@ const PORT = process.env.PORT || 3000;
 // once caused a 2.5h scraper stall after a connection hiccup.)
 mongoose.set('bufferCommands', false);
 
+// Nearest-NPA table from scripts/build_area_code_proximity.py (optional)
+areaCodeProximity.load();
+
 mongoose.connect(process.env.MONGODB_URI || 'mongodb://127.0.0.1:27017/did-optimizer')
-  .then(() => console.log('✅ MongoDB connected'))
+  .then(() => {
+    console.log('✅ MongoDB connected');
+    didSelectionIndex.start().catch(err => {
+      console.error('❌ DID selection index warm-up failed (tenants load on first use):', err.message);
+    });
+  })
   .catch(err => {
     console.error('❌ MongoDB connection error:', err);
     console.log('⚠️ Running without database connection...');
@@ -186,6 +198,11 @@ async function getLocationByAreaCode(areaCode) {
     return { state: 'Unknown', city: 'Unknown' };
   }
 
+  const cached = areaCodeProximity.location(areaCode);
+  if (cached) {
+    return { state: cached.state, city: cached.city, country: cached.country };
+  }
+
   try {
     const location = await AreaCodeLocation.findOne({ areaCode });
     if (location) {
@@ -374,182 +391,75 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) => {
       customer_phone
     } = req.query;
 
-    // Find an available DID for this tenant
-    logger.debug('🔍 Searching for DIDs with query:');
-    logger.debug('   Tenant ID:', req.tenant._id);
-    logger.debug('   Status: active');
-
-    // Enhanced Round-Robin Rotation Algorithm
-    // Reload tenant to get latest rotation state
-    const tenantQueryStart = Date.now();
-    const freshTenant = await Tenant.findById(req.tenant._id);
-    timings.tenantQuery = Date.now() - tenantQueryStart;
-    logger.debug(`⏱️ Tenant query: ${timings.tenantQuery}ms`);
-    logger.debug('🔍 Fresh tenant rotation state from DB:', freshTenant.rotationState);
-
-    let rotationState = freshTenant.rotationState || {
-      currentIndex: 0,
-      lastReset: new Date(),
-      usedDidsInCycle: []
-    };
-
-    // Initialize usedDidsInCycle as a Set for processing
-    const usedDidsSet = new Set(rotationState.usedDidsInCycle || []);
-
-    // Reset cycle if all DIDs have been used or it's been more than 24 hours
-    const countQueryStart = Date.now();
-    const activeDids = await DID.countDocuments({ tenantId: req.tenant._id, status: 'active' });
-    const goodReputationDids = await DID.countDocuments({
-      tenantId: req.tenant._id,
-      status: 'active',
-      'reputation.score': { $gte: 50 }
-    });
-    timings.countQueries = Date.now() - countQueryStart;
-    logger.debug(`⏱️ Count queries: ${timings.countQueries}ms`);
-
-    const shouldResetCycle = usedDidsSet.size >= goodReputationDids ||
-                            (new Date() - new Date(rotationState.lastReset)) > 24 * 60 * 60 * 1000;
-
-    if (shouldResetCycle) {
-      logger.debug('🔄 Resetting rotation cycle - starting fresh round');
-      usedDidsSet.clear();
-      rotationState.currentIndex = 0;
-      rotationState.lastReset = new Date();
-    }
-
-    logger.debug('🎯 Rotation State:', {
-      currentIndex: rotationState.currentIndex,
-      usedInCycle: usedDidsSet.size,
-      totalActive: activeDids,
-      goodReputation: goodReputationDids
-    });
+    // Pick from the resident selection index (services/did-selection-index.js):
+    // an in-memory heap peek instead of re-reading the tenant, counting DIDs
+    // and running up to four sorted finds on every dial
+    const selectStart = Date.now();
+    const selectionIndex = await didSelectionIndex.forTenant(req.tenant._id);
 
     // ── FAS Probe Budget: exclude over-budget probationary DIDs ─────────
     // DIDs in probation are selectable until their per-window budget is
-    // exhausted. Build a set of phone-number variants to $nin out.
-    // Lookup is one indexed scan on didreputations — cheap.
-    let probeExcludePhones = [];
+    // exhausted. The over-budget set is cached by phoneKey for a few seconds.
+    let probeExcludeKeys = null;
     try {
-      const DIDReputation = mongoose.model('DIDReputation');
-      const overBudget = await DIDReputation.find(
-        {
-          probationaryUntil: { $gt: new Date() },
-          $expr: { $gte: ['$probeBudgetUsed', '$probeBudgetTotal'] }
-        },
-        { phoneNumber: 1, _id: 0 }
-      ).lean();
-      // didreputations stores bare 10-digit; DID.phoneNumber may be
-      // '+1xxx', '1xxx', or bare. Expand to all three variants.
-      probeExcludePhones = overBudget.flatMap(r => {
-        const p = r.phoneNumber;
-        return p ? [p, `1${p}`, `+1${p}`] : [];
-      });
-      if (probeExcludePhones.length) {
-        logger.debug(`🧪 Probe-budget excluding ${overBudget.length} over-budget DIDs from selection`);
+      probeExcludeKeys = await didSelectionIndex.probeBudgetExclusions();
+      if (probeExcludeKeys.size) {
+        logger.debug(`🧪 Probe-budget excluding ${probeExcludeKeys.size} over-budget DIDs from selection`);
       }
     } catch (probeErr) {
       logger.warn('⚠️ Probe-budget exclusion lookup failed (continuing without):', probeErr.message);
     }
 
-    // FAST: Just sort by lastUsed (indexed field) instead of calculating usage
-    // This avoids the expensive $reduce operation on 3,174 DIDs
-    const getLeastUsedDID = async (baseQuery) => {
-      // Inject probe-budget exclusion if present
-      const q = probeExcludePhones.length
-        ? { ...baseQuery, phoneNumber: { $nin: probeExcludePhones } }
-        : baseQuery;
-      // Find DIDs sorted by lastUsed (oldest first = least recently used)
-      const dids = await DID.find(q)
-        .sort({ 'usage.lastUsed': 1, 'reputation.score': -1, createdAt: 1 })
-        .limit(1)
-        .lean();
-
-      return dids[0] || null;
+    // Priority order (local presence first, one in-memory lookup chain):
+    // 1. Same exchange (NPANXX of customer_phone)
+    // 2. Same area code (customer_phone or customer_area_code)
+    // 3. Same state (customer_state)
+    // 4. Nearest area codes the tenant has DIDs in (area code proximity table)
+    // 5. Any active DID with good reputation (≥50)
+    // 6. Any active DID
+    // Within each, DIDs not yet used this cycle and under capacity come first.
+    const customerNpanxx = (customer_phone || '').replace(/\D/g, '').replace(/^1(?=\d{10}$)/, '').substring(0, 6);
+    const customerNpa = customerNpanxx.length === 6 ? customerNpanxx.substring(0, 3)
+      : /^\d{3}$/.test(customer_area_code || '') ? customer_area_code : null;
+    const selectQuery = {
+      state: customer_state || null,
+      npa: customerNpa,
+      npanxx: customerNpanxx.length === 6 ? customerNpanxx : null,
+      excludeKeys: probeExcludeKeys
     };
 
-    // NEW STRATEGY: Always select DID with least usage (no capacity filtering)
-    // Priority order:
-    // 1. State + NPANXX match (if customer data provided)
-    // 2. State match only (if customer state provided)
-    // 3. Any active DID with good reputation (≥50)
-    // 4. Any active DID
-
-    let query = {
-      tenantId: req.tenant._id,
-      status: 'active'
-    };
-
-    let selectedDidObj = null;
-    let did = null;
-    const findQueryStart = Date.now();
-
-    // Try geographic matching if customer data is available
-    if (customer_state && customer_phone) {
-      // Extract NPANXX (first 6 digits) from customer phone
-      const npanxx = customer_phone.replace(/\D/g, '').substring(0, 6);
-
-      if (npanxx.length === 6) {
-        logger.debug(`🌍 Trying geographic match: State=${customer_state}, NPANXX=${npanxx}`);
-
-        // Try state + NPANXX match first
-        const geoQuery = {
-          ...query,
-          state: customer_state,
-          npanxx: npanxx,
-          'reputation.score': { $gte: 50 }
-        };
-
-        selectedDidObj = await getLeastUsedDID(geoQuery);
-        if (selectedDidObj) {
-          logger.info(`✅ Geographic match found: State + NPANXX match`);
-        } else {
-          // Try state-only match
-          logger.debug(`🌍 No NPANXX match, trying state-only: ${customer_state}`);
-          const stateQuery = {
-            ...query,
-            state: customer_state,
-            'reputation.score': { $gte: 50 }
-          };
-          selectedDidObj = await getLeastUsedDID(stateQuery);
-          if (selectedDidObj) {
-            logger.info(`✅ Geographic match found: State-only match`);
-          }
-        }
+    // ROTATION_STATE=redis: cycle, cycle membership and today's counts are
+    // shared by every process (services/rotation-state-store.js) and the DID
+    // is claimed there atomically. Otherwise this process's index is the state.
+    let pick = null;
+    let sharedRotation = rotationStore.enabled();
+    if (sharedRotation) {
+      try {
+        pick = await rotationStore.claimNext(selectionIndex, selectQuery);
+        if (pick?.cycleAdvanced) logger.debug('🔄 Resetting rotation cycle - starting fresh round');
+      } catch (redisErr) {
+        logger.warn('⚠️ Shared rotation state unavailable, selecting locally:', redisErr.message);
+        sharedRotation = false;
       }
     }
-
-    // If no geographic match, use any active DID with good reputation
-    if (!selectedDidObj) {
-      logger.debug('🔄 No geographic match, selecting least-used DID with good reputation');
-      const goodRepQuery = {
-        ...query,
-        'reputation.score': { $gte: 50 }
-      };
-      selectedDidObj = await getLeastUsedDID(goodRepQuery);
-    }
-
-    // Last resort: any active DID
-    if (!selectedDidObj) {
-      logger.debug('⚠️ No good reputation DIDs, using any active DID');
-      selectedDidObj = await getLeastUsedDID(query);
+    if (!sharedRotation) {
+      // A new cycle is one conditional increment of Tenant.rotationState.cycleId;
+      // DIDs carry the cycle they were last picked in (DID.lastCycleId)
+      if (selectionIndex.cycleExhausted()) {
+        logger.debug('🔄 Resetting rotation cycle - starting fresh round');
+        const cycleStart = Date.now();
+        await selectionIndex.advanceCycle();
+        timings.cycleAdvance = Date.now() - cycleStart;
+      }
+      pick = selectionIndex.select(selectQuery);
     }
+    timings.select = Date.now() - selectStart;
 
-    timings.findQuery = Date.now() - findQueryStart;
-
-    // Fetch full Mongoose document (we have lean() object, need full document for save())
-    did = selectedDidObj ? await DID.findById(selectedDidObj._id) : null;
-
-    // Check total DIDs for this tenant
-    const totalDids = await DID.countDocuments({ tenantId: req.tenant._id });
-
-    logger.debug('📊 DID Statistics:');
-    logger.debug('   Total DIDs for tenant:', totalDids);
-    logger.debug('   Active DIDs for tenant:', activeDids);
-    logger.debug('   Good reputation DIDs (≥50):', goodReputationDids);
-    logger.debug('   Bad reputation DIDs (<50):', activeDids - goodReputationDids);
+    const indexStats = selectionIndex.stats();
+    logger.debug('📊 DID Statistics:', indexStats);
 
     // CRITICAL: Should always have a DID now with least-used strategy
-    if (!did) {
+    if (!pick) {
       logger.error('❌ CRITICAL: No active DIDs found in database!');
       return res.status(500).json({
         success: false,
@@ -561,12 +471,20 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) => {
       });
     }
 
+    const did = pick.entry;
+    logger.info(`✅ DID selected by ${pick.strategy}`);
+
     // Check if DID is over capacity and log/track accordingly
-    const currentUsage = did.getTodayUsage();
+    // (a shared claim has already counted this call)
+    const currentUsage = sharedRotation ? did.todayCount - 1 : selectionIndex.todayUsage(did);
     const defaultCapacity = parseInt(process.env.DEFAULT_DID_CAPACITY || '100', 10);
     const capacity = did.capacity || defaultCapacity;
     const isOverCapacity = (currentUsage >= capacity);
 
+    // Claim the DID in the index before any await, so concurrent dials move on
+    const now = new Date();
+    if (!sharedRotation) selectionIndex.markUsed(did, now.getTime());
+
     if (isOverCapacity) {
       logger.warn(`⚠️ CAPACITY EXCEEDED: ${did.phoneNumber} has ${currentUsage} calls (capacity: ${capacity})`);
       logger.warn(`   Continuing with least-used DID strategy - no shortage disruption`);
@@ -617,109 +535,51 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) => {
         }
       }
     } else {
-      logger.info('🎯 DID Selected:', `${did.phoneNumber} (Usage: ${currentUsage}/${capacity}, Reputation: ${did.reputation?.score || 'N/A'})`);
+      logger.info('🎯 DID Selected:', `${did.phoneNumber} (Usage: ${currentUsage}/${capacity}, Reputation: ${did.score})`);
     }
 
-    // Update rotation state atomically (no locks, no contention!)
-    const tenantSaveStart = Date.now();
-    await Tenant.findByIdAndUpdate(
-      req.tenant._id,
-      {
-        $set: {
-          'rotationState.currentIndex': (rotationState.currentIndex + 1) % activeDids,
-          'rotationState.lastReset': rotationState.lastReset
-        },
-        $addToSet: {
-          'rotationState.usedDidsInCycle': did._id.toString()
-        }
-      }
-    );
-    timings.tenantSave = Date.now() - tenantSaveStart;
-    logger.debug(`⏱️ Tenant atomic update: ${timings.tenantSave}ms`);
-    logger.debug('✅ Rotation state updated atomically');
-
-    // Update last used timestamp and usage tracking
-    const now = new Date();
-
-    // Initialize usage object if it doesn't exist
-    if (!did.usage) {
-      did.usage = {
-        totalCalls: 0,
-        dailyUsage: [],
-        lastUsed: null,
-        lastCampaign: null,
-        lastAgent: null
-      };
-    }
-
-    did.usage.lastUsed = now;
-    did.usage.totalCalls = (did.usage.totalCalls || 0) + 1;
-    did.usage.lastCampaign = campaign_id;
-    did.usage.lastAgent = agent_id;
-
-    // Increment today's usage count for daily limit tracking
-    did.incrementTodayUsage();
-
-    const todayUsage = did.getTodayUsage();
+    // DID usage, probe budget and CallRecord writes go through the write-behind
+    // buffer (services/selection-write-buffer.js) and are flushed in batches
+    // every few ms; the DID is returned without waiting for them
+    const bufferStart = Date.now();
+    await selectionWrites.admit();
+    timings.backpressure = Date.now() - bufferStart;
 
+    // usage.today is incremented, or reset when the day has changed
     logger.debug('📝 Updating DID usage:', {
       did: did.phoneNumber,
-      didId: did._id,
-      oldLastUsed: did.usage.lastUsed,
+      didId: did.id,
       newLastUsed: now,
-      totalCalls: did.usage.totalCalls,
-      todayUsage,
+      todayUsage: did.todayCount,
       dailyCapacity: capacity,
-      percentageUsed: `${Math.round((todayUsage / capacity) * 100)}%`,
+      percentageUsed: `${Math.round((did.todayCount / capacity) * 100)}%`,
       campaign: campaign_id,
       agent: agent_id
     });
-
-    try {
-      const didSaveStart = Date.now();
-      const savedDid = await did.save();
-      timings.didSave = Date.now() - didSaveStart;
-      logger.debug(`⏱️ DID save: ${timings.didSave}ms`);
-      logger.debug('✅ DID usage updated successfully:', {
-        id: savedDid._id,
-        phone: savedDid.phoneNumber,
-        lastUsed: savedDid.usage?.lastUsed,
-        totalCalls: savedDid.usage?.totalCalls
-      });
-    } catch (saveError) {
-      logger.error('❌ ERROR saving DID usage:', saveError);
-      logger.error('❌ DID object:', JSON.stringify(did, null, 2));
-    }
+    // Query params can repeat (arrays); the String fields take a single value
+    selectionWrites.recordDidUse(did._id, now, {
+      'usage.lastUsed': now,
+      'usage.lastCampaign': campaign_id === undefined ? undefined : String([].concat(campaign_id)[0]),
+      'usage.lastAgent': agent_id === undefined ? undefined : String([].concat(agent_id)[0]),
+      lastCycleId: did.lastCycleId
+    });
 
     // ── FAS Probe Budget: increment probeBudgetUsed if this DID is on probe ──
     // Conditional update — only $inc when still under budget and still in the
     // probe window. Idempotent, race-safe across concurrent selectors.
-    try {
-      const DIDReputation = mongoose.model('DIDReputation');
-      const phone10 = (did.phoneNumber || '').replace(/\D/g, '').replace(/^1(?=\d{10}$)/, '');
-      if (phone10.length === 10) {
-        await DIDReputation.updateOne(
-          {
-            phoneNumber: phone10,
-            probationaryUntil: { $gt: new Date() },
-            $expr: { $lt: ['$probeBudgetUsed', '$probeBudgetTotal'] }
-          },
-          { $inc: { probeBudgetUsed: 1 } }
-        );
-      }
-    } catch (probeIncErr) {
-      logger.warn('⚠️ Probe-budget increment failed (non-fatal):', probeIncErr.message);
+    if (did.phoneKey?.length === 10) {
+      selectionWrites.recordProbeUse(did.phoneKey, now);
     }
 
     // Create call record for tracking (will be updated later with final disposition)
     const uniqueid = req.headers['x-request-id'] || ''; // From AGI script
     const customerStateCode = (customer_state || '').substring(0, 2).toUpperCase();
 
-    const callRecord = new CallRecord({
+    const callRecordId = selectionWrites.recordCall({
       didId: did._id,
       tenantId: req.tenant._id,
       phoneNumber: customer_phone || 'unknown',
-      callTimestamp: new Date(),
+      callTimestamp: now,
       duration: 0, // Will be updated when call completes
       result: 'answered', // Default - will be updated when call completes
       disposition: 'initiated', // Initial state
@@ -735,40 +595,28 @@ app.get('/api/v1/dids/next', validateApiKey, async (req, res) => {
       }
     });
 
-    const callRecordSaveStart = Date.now();
-    try {
-      await callRecord.save();
-      timings.callRecordSave = Date.now() - callRecordSaveStart;
-      logger.debug(`⏱️ CallRecord save: ${timings.callRecordSave}ms`);
-    } catch (saveErr) {
-      logger.warn('⚠️ CallRecord save failed (non-fatal):', saveErr.message);
-    }
-
-    logger.debug('📞 Call record created:', callRecord._id, '| Uniqueid:', uniqueid, '| DID:', did.phoneNumber);
+    logger.debug('📞 Call record queued:', callRecordId, '| Uniqueid:', uniqueid, '| DID:', did.phoneNumber);
 
     console.log('✅ Rotation state updated:', {
       selectedDID: did.phoneNumber,
-      newIndex: rotationState.currentIndex,
-      usedInCycle: usedDidsSet.size,
-      totalActive: activeDids
+      cycleId: selectionIndex.cycle.id,
+      usedInCycle: selectionIndex.cycle.used,
+      totalActive: indexStats.active
     });
 
     // Calculate total request time
     timings.total = Date.now() - requestStartTime;
-    const queryTime = (timings.tenantQuery || 0) + (timings.countQueries || 0) + (timings.findQuery || 0);
-    const saveTime = (timings.tenantSave || 0) + (timings.didSave || 0) + (timings.callRecordSave || 0);
+    const queryTime = timings.select || 0;
+    const saveTime = (timings.cycleAdvance || 0) + (timings.backpressure || 0);
     const otherTime = timings.total - queryTime - saveTime;
 
     logger.info('\n⏱️ ===== PERFORMANCE SUMMARY =====');
     logger.info(`   Total request time: ${timings.total}ms`);
     logger.debug(`\n   Read Operations (${queryTime}ms):`);
-    logger.debug(`   - Tenant query: ${timings.tenantQuery}ms`);
-    logger.debug(`   - Count queries: ${timings.countQueries}ms`);
-    logger.debug(`   - Find query: ${timings.findQuery}ms`);
+    logger.debug(`   - Index select: ${timings.select}ms`);
     logger.debug(`\n   Write Operations (${saveTime}ms):`);
-    logger.debug(`   - Tenant save: ${timings.tenantSave || 0}ms`);
-    logger.debug(`   - DID save: ${timings.didSave || 0}ms`);
-    logger.debug(`   - CallRecord save: ${timings.callRecordSave || 0}ms`);
+    logger.debug(`   - Cycle advance: ${timings.cycleAdvance || 0}ms`);
+    logger.debug(`   - Write-behind backpressure: ${timings.backpressure || 0}ms`);
     logger.debug(`\n   Other operations: ${otherTime}ms`);
     logger.info('=================================\n');
 
@@ -1073,8 +921,8 @@ app.post('/api/v1/call-results', validateApiKey, async (req, res) => {
     // Update DID usage statistics
     const didPhone = phoneNumber || callRecord.phoneNumber;
     if (didPhone) {
-      const cleanDid = didPhone.replace(/\D/g, '');
-      if (cleanDid.length >= 10) {
+      const phoneKey = toPhoneKey(didPhone);
+      if (phoneKey?.length === 10) {
         const metricsField = result === 'answered' ? 'metrics.totalAnswered'
           : result === 'busy' ? 'metrics.totalBusy'
           : result === 'failed' ? 'metrics.totalFailed'
@@ -1084,7 +932,7 @@ app.post('/api/v1/call-results', validateApiKey, async (req, res) => {
         if (metricsField) inc[metricsField] = 1;
 
         await DID.findOneAndUpdate(
-          { phoneNumber: new RegExp(cleanDid + '$') },
+          { tenantId: req.tenant._id, phoneKey },
           {
             $inc: inc,
             $set: {
@@ -1308,7 +1156,7 @@ if (process.env.GOOGLE_CLIENT_ID && process.env.GOOGLE_CLIENT_SECRET) {
         rotationState: {
           currentIndex: 0,
           lastReset: new Date(),
-          usedDidsInCycle: []
+          cycleId: 1
         }
       });
       const savedTenant = await newTenant.save();
@@ -1584,7 +1432,7 @@ app.post('/api/v1/auth/register', async (req, res) => {
       rotationState: {
         currentIndex: 0,
         lastReset: new Date(),
-        usedDidsInCycle: []
+        cycleId: 1
       }
     });
     const savedTenant = await newTenant.save();
@@ -3168,11 +3016,9 @@ app.get('/api/v1/dids/export', async (req, res) => {
       // Calculate today's usage
       const today = new Date();
       today.setHours(0, 0, 0, 0);
-      const todayUsage = did.usage?.dailyUsage?.find(d => {
-        const usageDate = new Date(d.date);
-        usageDate.setHours(0, 0, 0, 0);
-        return usageDate.getTime() === today.getTime();
-      });
+      const todayUsage = did.usage?.today?.day && new Date(did.usage.today.day).getTime() === today.getTime()
+        ? did.usage.today
+        : null;
 
       const row = [
         `"${did.phoneNumber || ''}"`,
@@ -4888,6 +4734,16 @@ app.get('/api/v1/admin/queue/status', async (req, res) => {
   }
 });
 
+// DID selection index, write-behind buffer and shared rotation state status
+app.get('/api/v1/admin/selection/status', (req, res) => {
+  res.json({
+    index: didSelectionIndex.getStats(),
+    writes: selectionWrites.getStats(),
+    rotation: rotationStore.getStats(),
+    areaCodeProximity: areaCodeProximity.getStats()
+  });
+});
+
 // API documentation
 app.get('/api/v1', (req, res) => {
   res.json({
@@ -5676,8 +5532,8 @@ Available Routes:
 });
 
 // Graceful shutdown
-process.on('SIGINT', async () => {
-  console.log('\n⏹️ SIGINT received: closing HTTP server');
+const shutdown = (signal) => {
+  console.log(`\n⏹️ ${signal} received: closing HTTP server`);
   server.close(async () => {
     console.log('✅ HTTP server closed');
     try {
@@ -5686,6 +5542,9 @@ process.on('SIGINT', async () => {
     } catch (err) {
       console.warn('⚠️ TimescaleDB pool close error:', err.message);
     }
+    await didSelectionIndex.stop();
+    await selectionWrites.close();
+    await rotationStore.close();
     try {
       await mongoose.connection.close(false);
       console.log('✅ MongoDB connection closed');
@@ -5694,6 +5553,8 @@ process.on('SIGINT', async () => {
     }
     process.exit(0);
   });
-});
+};
+process.on('SIGINT', () => shutdown('SIGINT'));
+process.on('SIGTERM', () => shutdown('SIGTERM'));
 
 export default app;
\ No newline at end of file
@@ -0,0 +1,196 @@
+import fs from 'fs';
+import path from 'path';
+import { fileURLToPath } from 'url';
+
+/**
+ * In-memory area code proximity table
+ *
+ * Loads the file written by scripts/build_area_code_proximity.py: one point
+ * per NPA (state, country, a representative city) and its K nearest NPAs with
+ * distances in miles. Distance and nearby-NPA questions become array lookups
+ * instead of a haversine aggregation over AreaCodeLocation per call.
+ *
+ * The file is optional. Until it exists every method returns null and the
+ * callers keep using their MongoDB queries.
+ *
+ * AREA_CODE_PROXIMITY_PATH overrides the default data/area-code-proximity.json.
+ */
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+const DEFAULT_PATH = path.join(__dirname, '..', 'data', 'area-code-proximity.json');
+
+const ARTIFACT_VERSION = 1;
+const EARTH_RADIUS_MILES = 3959;
+
+function haversineMiles(lat1, lng1, lat2, lng2) {
+  const toRad = Math.PI / 180;
+  const dLat = (lat2 - lat1) * toRad;
+  const dLng = (lng2 - lng1) * toRad;
+  const a = Math.sin(dLat / 2) ** 2 +
+    Math.cos(lat1 * toRad) * Math.cos(lat2 * toRad) * Math.sin(dLng / 2) ** 2;
+  return 2 * EARTH_RADIUS_MILES * Math.asin(Math.sqrt(Math.min(1, a)));
+}
+
+class AreaCodeProximity {
+  constructor() {
+    this.table = null;
+    this.loadedFrom = null;
+    this.loadError = null;
+    this.attempted = false;
+    this.stats = { lookups: 0, misses: 0 };
+  }
+
+  // Read at call time: this module is imported before dotenv has loaded
+  get filePath() {
+    return process.env.AREA_CODE_PROXIMITY_PATH || DEFAULT_PATH;
+  }
+
+  /**
+   * Load (or reload) the table; returns false and keeps the previous table
+   * when the file is missing or unreadable
+   */
+  load() {
+    this.attempted = true;
+    const file = this.filePath;
+    try {
+      const artifact = JSON.parse(fs.readFileSync(file, 'utf8'));
+      if (artifact.version !== ARTIFACT_VERSION) {
+        throw new Error(`unsupported version ${artifact.version}`);
+      }
+      const positions = new Map(artifact.areaCodes.map((code, i) => [code, i]));
+      this.table = { ...artifact, positions };
+      this.loadedFrom = file;
+      this.loadError = null;
+      console.log(`✅ Area code proximity table: ${artifact.areaCodes.length} NPAs, ${artifact.k} neighbours each (${artifact.generatedAt})`);
+      return true;
+    } catch (error) {
+      this.loadError = error.code === 'ENOENT' ? 'file not found' : error.message;
+      if (error.code !== 'ENOENT') {
+        console.warn(`⚠️ Area code proximity table not loaded from ${file}:`, error.message);
+      }
+      return false;
+    }
+  }
+
+  ready() {
+    if (!this.attempted) this.load();
+    return this.table !== null;
+  }
+
+  position(areaCode) {
+    if (!this.ready()) return undefined;
+    this.stats.lookups++;
+    const i = this.table.positions.get(String(areaCode));
+    if (i === undefined) this.stats.misses++;
+    return i;
+  }
+
+  /**
+   * { areaCode, city, state, country, latitude, longitude, cities } of an NPA, or null
+   */
+  location(areaCode) {
+    const i = this.position(areaCode);
+    if (i === undefined) return null;
+    const t = this.table;
+    return {
+      areaCode: t.areaCodes[i],
+      city: t.city[i],
+      state: t.state[i],
+      country: t.country[i],
+      latitude: t.lat[i],
+      longitude: t.lng[i],
+      cities: t.cities[i]
+    };
+  }
+
+  /**
+   * Miles between two NPAs (0 for the same NPA), or null if either is unknown
+   */
+  distance(areaCode1, areaCode2) {
+    const a = this.position(areaCode1);
+    const b = this.position(areaCode2);
+    if (a === undefined || b === undefined) return null;
+    if (a === b) return 0;
+    const t = this.table;
+    const k = t.neighbours[a].indexOf(b);
+    if (k !== -1) return t.distances[a][k];
+    return Math.round(haversineMiles(t.lat[a], t.lng[a], t.lat[b], t.lng[b]) * 10) / 10;
+  }
+
+  /**
+   * The stored nearest NPAs of an NPA within `maxMiles`, nearest first, as
+   * [{ areaCode, distance }]; at most the table's K. Null if the NPA is unknown.
+   */
+  neighbours(areaCode, maxMiles = Infinity) {
+    const i = this.position(areaCode);
+    if (i === undefined) return null;
+    const t = this.table;
+    const result = [];
+    for (let k = 0; k < t.neighbours[i].length && t.distances[i][k] <= maxMiles; k++) {
+      result.push({ areaCode: t.areaCodes[t.neighbours[i][k]], distance: t.distances[i][k] });
+    }
+    return result;
+  }
+
+  /**
+   * NPAs within `maxMiles` of an NPA, nearest first, as
+   * [{ areaCode, city, state, distance }]. Returns null when the NPA is
+   * unknown, or when the radius reaches past the stored neighbours (the list
+   * could be incomplete) and the caller should ask MongoDB instead.
+   */
+  nearby(areaCode, maxMiles = 50, limit = 100) {
+    const i = this.position(areaCode);
+    if (i === undefined) return null;
+    const t = this.table;
+    const neighbours = t.neighbours[i];
+    const distances = t.distances[i];
+    const complete = neighbours.length === t.areaCodes.length - 1 ||
+      (distances.length > 0 && distances[distances.length - 1] > maxMiles);
+    if (!complete) return null;
+
+    const result = [];
+    for (let k = 0; k < neighbours.length && result.length < limit; k++) {
+      if (distances[k] > maxMiles) break;
+      const j = neighbours[k];
+      result.push({ areaCode: t.areaCodes[j], city: t.city[j], state: t.state[j], distance: distances[k] });
+    }
+    return result;
+  }
+
+  /**
+   * Nearest NPAs to a point, as [{ areaCode, city, state, distance }]; a scan
+   * over the NPA points (a few hundred), no database
+   */
+  nearestTo(latitude, longitude, { exclude = [], limit = 10 } = {}) {
+    if (!this.ready()) return null;
+    const t = this.table;
+    const skip = new Set(exclude.map(String));
+    const result = [];
+    for (let i = 0; i < t.areaCodes.length; i++) {
+      if (skip.has(t.areaCodes[i])) continue;
+      result.push({
+        areaCode: t.areaCodes[i],
+        city: t.city[i],
+        state: t.state[i],
+        cities: t.cities[i],
+        distance: haversineMiles(latitude, longitude, t.lat[i], t.lng[i])
+      });
+    }
+    return result.sort((a, b) => a.distance - b.distance).slice(0, limit);
+  }
+
+  getStats() {
+    return {
+      ...this.stats,
+      loaded: this.table !== null,
+      path: this.loadedFrom || this.filePath,
+      areaCodes: this.table?.areaCodes.length || 0,
+      k: this.table?.k || 0,
+      generatedAt: this.table?.generatedAt || null,
+      error: this.loadError
+    };
+  }
+}
+
+// Export singleton instance
+export default new AreaCodeProximity();
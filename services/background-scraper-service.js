@@ -126,7 +126,7 @@ class BackgroundScraperService {
       }
 
       // Extract phone numbers and push to the queue (workers do the scraping)
-      const phoneNumbers = limitedDids.map(did => this.formatPhoneNumber(did.phoneNumber));
+      const phoneNumbers = limitedDids.map(did => did.phoneKey || this.formatPhoneNumber(did.phoneNumber));
       await enqueueReputationCheck(phoneNumbers, 'normal');
 
       this.stats.totalProcessed += phoneNumbers.length;
@@ -151,23 +151,17 @@ class BackgroundScraperService {
 
   /**
    * Get DIDs that need reputation checking.
-   * Priority: never-checked DIDs first, then oldest-checked. This keeps
-   * new DIDs from getting starved when the active-DID count exceeds
-   * maxDidsPerRun.
+   * Priority: never-checked DIDs first (null nextCheckDue sorts first), then
+   * the most overdue. This keeps new DIDs from getting starved when the
+   * active-DID count exceeds maxDidsPerRun.
+   *
+   * reputation.nextCheckDue is written on the DID by every reputation writer
+   * (7 days out for Negative DIDs, so blacklisted numbers are still re-checked
+   * for recovery), so this is a single index walk that returns exactly
+   * maxDidsPerRun projected documents.
    */
   async getDIDsNeedingCheck() {
     try {
-      const DIDReputation = mongoose.model('DIDReputation');
-
-      // Build a blacklist set in one projection query. Used to filter the
-      // DID candidates in-memory — can't push this into the DID query because
-      // phone formats differ (10-digit DIDReputation vs "1..." / "+1..." DID).
-      const blacklisted = await DIDReputation.find(
-        { isBlacklisted: true },
-        { phoneNumber: 1, _id: 0 }
-      ).lean();
-      const blacklistedSet = new Set(blacklisted.map(r => r.phoneNumber));
-
       // Only scrape DIDs owned by PAYING tenants (subscription.status === 'active').
       // Trial / suspended / cancelled tenants are excluded so we don't burn proxy
       // and scraping budget on accounts that haven't paid.
@@ -182,46 +176,19 @@ class BackgroundScraperService {
         return [];
       }
 
-      // Pull a much larger candidate pool so when we skip blacklisted zombies
-      // we still have enough non-blacklisted DIDs left to fill the batch.
-      const poolSize = Math.max(this.config.maxDidsPerRun * 10, 1000);
-      const dids = await DID.find({ isActive: true, status: 'active', tenantId: { $in: paidTenantIds } })
-        .sort({ 'reputation.lastChecked': 1 })
-        .limit(poolSize);
-
-      if (dids.length === 0) return [];
-
-      const normalizedPhones = dids
-        .map(did => this.formatPhoneNumber(did.phoneNumber))
-        .filter(p => !blacklistedSet.has(p));
-
-      const existingReputations = await DIDReputation.find({
-        phoneNumber: { $in: normalizedPhones }
-      });
-      const reputationMap = new Map();
-      existingReputations.forEach(rep => {
-        reputationMap.set(this.formatPhoneNumber(rep.phoneNumber), rep);
-      });
-
-      const didsNeedingCheck = [];
-      for (const did of dids) {
-        const phone = this.formatPhoneNumber(did.phoneNumber);
-        const reputation = reputationMap.get(phone);
-
-        // For BLACKLISTED DIDs: re-check only if nextCheckDue is in the past
-        // (defaults to 7 days). This lets recovered DIDs get unblacklisted
-        // while preventing constant rechecks of known-bad numbers.
-        // For NON-BLACKLISTED: original logic — refresh when due or missing.
-        const hasFreshDue = reputation && reputation.nextCheckDue
-                          && reputation.nextCheckDue > new Date();
-        if (hasFreshDue) continue;
-
-        // If blacklisted with no nextCheckDue at all (legacy data), schedule
-        // it for re-check now (we want to know if it has recovered).
-        didsNeedingCheck.push(did);
-        if (didsNeedingCheck.length >= this.config.maxDidsPerRun) break;
-      }
-      return didsNeedingCheck;
+      // $not/$gt matches both past due dates and missing ones in one index range
+      return await DID.find(
+        {
+          status: 'active',
+          isActive: true,
+          'reputation.nextCheckDue': { $not: { $gt: new Date() } },
+          tenantId: { $in: paidTenantIds }
+        },
+        { phoneNumber: 1, phoneKey: 1 }
+      )
+        .sort({ 'reputation.nextCheckDue': 1 })
+        .limit(this.config.maxDidsPerRun)
+        .lean();
 
     } catch (error) {
       console.error('Error getting DIDs needing check:', error);
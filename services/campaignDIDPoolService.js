@@ -271,60 +271,33 @@ class CampaignDIDPoolService {
       throw new Error('Tenant not found');
     }
 
-    let rotationState = tenant.rotationState || {
-      currentIndex: 0,
-      lastReset: new Date(),
-      usedDidsInCycle: []
-    };
-
-    const usedDidsSet = new Set(rotationState.usedDidsInCycle || []);
-
-    // Reset cycle if all DIDs have been used or it's been more than 24 hours
-    const activeDids = await DID.countDocuments({ 
-      tenantId, 
-      status: 'active',
-      isActive: true 
-    });
-    const goodReputationDids = await DID.countDocuments({
+    const rotationState = tenant.rotationState || {};
+    let cycleId = rotationState.cycleId || 1;
+    const baseQuery = {
       tenantId,
       status: 'active',
       isActive: true,
       'reputation.score': { $gte: 50 }
-    });
-
-    const shouldResetCycle = usedDidsSet.size >= goodReputationDids ||
-                            (new Date() - new Date(rotationState.lastReset)) > 24 * 60 * 60 * 1000;
+    };
 
-    if (shouldResetCycle) {
-      rotationState.usedDidsInCycle = [];
-      rotationState.lastReset = new Date();
+    // Start a new cycle after 24 hours
+    if ((new Date() - new Date(rotationState.lastReset || 0)) > 24 * 60 * 60 * 1000) {
+      cycleId = (await Tenant.advanceRotationCycle(tenantId, cycleId))?.cycleId || cycleId + 1;
     }
 
-    // Find available DID using least-used strategy
-    const did = await DID.findOne({
-      tenantId,
-      status: 'active',
-      isActive: true,
-      'reputation.score': { $gte: 50 },
-      _id: { $nin: usedDidsSet }
-    }).sort({ 'usage.totalCalls': 1, 'usage.lastUsed': 1 });
+    // Find available DID using least-used strategy: not yet picked this cycle
+    let did = await DID.findOne({ ...baseQuery, lastCycleId: { $ne: cycleId } })
+      .sort({ 'usage.totalCalls': 1, 'usage.lastUsed': 1 });
 
     if (!did) {
-      // All DIDs have been used, reset and try again
-      rotationState.usedDidsInCycle = [];
-      rotationState.lastReset = new Date();
-      await Tenant.findByIdAndUpdate(tenantId, {
-        $set: {
-          'rotationState': rotationState
-        }
-      });
-
-      return await DID.findOne({
-        tenantId,
-        status: 'active',
-        isActive: true,
-        'reputation.score': { $gte: 50 }
-      }).sort({ 'usage.totalCalls': 1, 'usage.lastUsed': 1 });
+      // All DIDs have been used, start a new cycle and try again
+      cycleId = (await Tenant.advanceRotationCycle(tenantId, cycleId))?.cycleId || cycleId + 1;
+      did = await DID.findOne(baseQuery).sort({ 'usage.totalCalls': 1, 'usage.lastUsed': 1 });
+    }
+
+    if (did) {
+      did.lastCycleId = cycleId;
+      await DID.updateOne({ _id: did._id }, { $set: { lastCycleId: cycleId } });
     }
 
     return {
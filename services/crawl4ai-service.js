@@ -7,9 +7,72 @@ import webshareProxyService from './webshare-proxy-service.js';
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 
+/**
+ * Decoder for fast_robokiller_scraper.py --format=frames output.
+ *
+ * Each frame is a 4-byte big-endian length followed by compact JSON. The
+ * first frame is a header naming the positional fields, result frames are
+ * arrays in that order, and the last frame is the {"summary": true} object.
+ * Rows are rebuilt into the same objects the NDJSON mode prints.
+ */
+export class ScrapeFrameDecoder {
+  constructor() {
+    this.buffer = Buffer.alloc(0);
+    this.fields = null;
+    this.dataFields = null;
+  }
+
+  /**
+   * Feed a stdout chunk; returns the messages completed by it
+   */
+  push(chunk) {
+    this.buffer = this.buffer.length ? Buffer.concat([this.buffer, chunk]) : chunk;
+    const messages = [];
+    let offset = 0;
+
+    while (this.buffer.length - offset >= 4) {
+      const length = this.buffer.readUInt32BE(offset);
+      if (this.buffer.length - offset - 4 < length) break;
+      const payload = JSON.parse(this.buffer.toString('utf8', offset + 4, offset + 4 + length));
+      offset += 4 + length;
+
+      if (Array.isArray(payload)) {
+        messages.push(this.decodeRow(payload));
+      } else if (payload.fields) {
+        this.fields = payload.fields;
+        this.dataFields = payload.data_fields;
+      } else {
+        messages.push(payload);
+      }
+    }
+
+    this.buffer = this.buffer.subarray(offset);
+    return messages;
+  }
+
+  decodeRow(row) {
+    if (!this.fields) throw new Error('Result frame before header frame');
+    const result = {};
+    this.fields.forEach((field, i) => {
+      const value = row[i];
+      if (value === null || value === undefined) return;
+      if (field === 'data') {
+        const data = {};
+        this.dataFields.forEach((dataField, j) => { data[dataField] = value[j]; });
+        result.data = data;
+      } else {
+        result[field] = value;
+      }
+    });
+    return result;
+  }
+}
+
 class Crawl4AIService {
   constructor() {
     this.pythonScript = path.join(__dirname, '..', 'scripts', 'fast_robokiller_scraper.py');
+    // 'ndjson' (default) or 'frames' (length-prefixed positional rows, cheaper for large sweeps)
+    this.ipcFormat = process.env.SCRAPER_IPC_FORMAT === 'frames' ? 'frames' : 'ndjson';
     this.isReady = false;
     this.init();
   }
@@ -408,7 +471,7 @@ if __name__ == "__main__":
   }
 
   async batchScrape(phoneNumbers, options = {}) {
-    const { batchSize = 20, delayMs = 500, maxRetries = 2 } = options;
+    const { batchSize = 20, delayMs = 500, maxRetries = 2, onResult = null } = options;
     const results = [];
 
     for (let i = 0; i < phoneNumbers.length; i += batchSize) {
@@ -426,7 +489,11 @@ if __name__ == "__main__":
         console.warn('⚠️ No proxy available for batch, running direct');
       }
 
-      let batchResults = await this.runBatchProcess(batch, batchProxy);
+      // Stream final results to onResult as they arrive; blocked ones are held back for the retry
+      const emitFirstPass = onResult
+        ? (r) => { if (!r.data?.is_blocked || maxRetries <= 0) onResult(r); }
+        : null;
+      let batchResults = await this.runBatchProcess(batch, batchProxy, emitFirstPass);
 
       // Check for blocked results and retry with new proxy
       const blocked = batchResults.filter(r => r.data?.is_blocked);
@@ -436,7 +503,7 @@ if __name__ == "__main__":
         let retryProxy = null;
         try { retryProxy = await webshareProxyService.getRandomProxy(); } catch {}
         const blockedNumbers = blocked.map(r => r.phoneNumber);
-        const retryResults = await this.runBatchProcess(blockedNumbers, retryProxy);
+        const retryResults = await this.runBatchProcess(blockedNumbers, retryProxy, onResult);
         // Merge: replace blocked results with retry results
         for (const retry of retryResults) {
           const idx = batchResults.findIndex(r => r.phoneNumber === retry.phoneNumber);
@@ -454,46 +521,105 @@ if __name__ == "__main__":
     return results;
   }
 
-  async runBatchProcess(phoneNumbers, proxy = null) {
+  /**
+   * Run fast_robokiller_scraper.py in streaming mode for one batch.
+   *
+   * The script emits one result per number as it completes and a final
+   * {"summary": true} message, either as NDJSON lines or as length-prefixed
+   * frames (this.ipcFormat). Output is parsed as it arrives, so a timeout
+   * only loses the numbers that had not finished yet. onResult (optional) is
+   * called once per number, including the error placeholders for numbers
+   * that never produced a result.
+   */
+  async runBatchProcess(phoneNumbers, proxy = null, onResult = null) {
     return new Promise((resolve) => {
-      const args = [this.pythonScript, `--numbers=${phoneNumbers.join(',')}`, `--concurrency=${phoneNumbers.length}`];
+      const args = [this.pythonScript, `--numbers=${phoneNumbers.join(',')}`, `--concurrency=${phoneNumbers.length}`, `--format=${this.ipcFormat}`];
       if (proxy) args.push(`--proxy=${proxy.proxyUrl}`);
 
-      let stdout = '';
-      let stderr = '';
+      const byDigits = new Map();
+      const decoder = this.ipcFormat === 'frames' ? new ScrapeFrameDecoder() : null;
+      let buffer = '';
       let resolved = false;
 
       const python = spawn('python3', args, { env: { ...process.env } });
 
-      python.stdout.on('data', d => { stdout += d.toString(); });
-      python.stderr.on('data', d => { stderr += d.toString(); });
+      const emit = (result) => {
+        if (!onResult) return;
+        try {
+          onResult(result);
+        } catch (e) {
+          console.error('Batch onResult handler error:', e.message);
+        }
+      };
 
-      const timeoutId = setTimeout(() => {
+      const handleMessage = (parsed) => {
+        if (parsed.summary || !parsed.phone) return;
+        const result = { phoneNumber: parsed.phone, success: parsed.success, data: parsed };
+        byDigits.set(String(parsed.phone).replace(/\D/g, ''), result);
+        emit(result);
+      };
+
+      const handleLine = (line) => {
+        if (!line.startsWith('{')) return;
+        let parsed;
+        try {
+          parsed = JSON.parse(line);
+        } catch {
+          return; // Debug output that happens to start with "{"
+        }
+        handleMessage(parsed);
+      };
+
+      const finish = (missingError) => {
         if (resolved) return;
         resolved = true;
+        clearTimeout(timeoutId);
+        if (buffer) handleLine(buffer.trim());
+
+        // Keep input order; numbers with no line get an error placeholder
+        resolve(phoneNumbers.map(p => {
+          const found = byDigits.get(String(p).replace(/\D/g, ''));
+          if (found) return found;
+          const placeholder = { phoneNumber: p, success: false, data: { success: false, error: missingError } };
+          emit(placeholder);
+          return placeholder;
+        }));
+      };
+
+      python.stdout.on('data', d => {
+        if (decoder) {
+          try {
+            decoder.push(d).forEach(handleMessage);
+          } catch (e) {
+            console.error('Batch frame decode error:', e.message);
+            python.kill('SIGTERM');
+          }
+          return;
+        }
+        buffer += d.toString();
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        for (const line of lines) handleLine(line.trim());
+      });
+      python.stderr.on('data', () => {});
+
+      const timeoutId = setTimeout(() => {
+        if (resolved) return;
         python.kill('SIGTERM');
-        console.warn(`⚠️ Batch timeout for ${phoneNumbers.length} DIDs`);
-        resolve(phoneNumbers.map(p => ({ phoneNumber: p, success: false, data: { success: false, error: 'timeout' } })));
+        console.warn(`⚠️ Batch timeout: ${byDigits.size}/${phoneNumbers.length} DIDs completed before kill`);
+        finish('timeout');
       }, 60000);
 
+      python.on('error', (error) => {
+        console.error('Batch spawn error:', error.message);
+        finish(error.message);
+      });
+
       python.on('close', () => {
-        if (resolved) return;
-        resolved = true;
-        clearTimeout(timeoutId);
-        try {
-          const lines = stdout.split('\n');
-          const jsonLine = lines.find(l => l.startsWith('{') && l.includes('"batch"'));
-          if (!jsonLine) throw new Error('No batch JSON in output');
-          const parsed = JSON.parse(jsonLine);
-          resolve(parsed.results.map(r => ({
-            phoneNumber: r.phone,
-            success: r.success,
-            data: r
-          })));
-        } catch (e) {
-          console.error('Batch parse error:', e.message, stdout.substring(0, 200));
-          resolve(phoneNumbers.map(p => ({ phoneNumber: p, success: false, data: { success: false, error: e.message } })));
+        if (byDigits.size < phoneNumbers.length) {
+          console.error(`Batch ended with ${byDigits.size}/${phoneNumbers.length} results`);
         }
+        finish('No result in batch output');
       });
     });
   }
@@ -0,0 +1,668 @@
+import mongoose from 'mongoose';
+import DID from '../models/DID.js';
+import Tenant from '../models/Tenant.js';
+import areaCodeProximity from './area-code-proximity.js';
+
+/**
+ * Resident DID selection index for /api/v1/dids/next
+ *
+ * Every tenant's active DIDs are held in memory in binary heaps ordered the
+ * way the old selection query sorted (usage.lastUsed asc, reputation.score
+ * desc, createdAt asc): one heap over all active DIDs, one over good-reputation
+ * DIDs, and one per NPANXX, NPA and state for local-presence matches. A pick is a
+ * heap peek that skips entries failing the probe-budget / cycle / capacity
+ * flags; marking the DID used is one O(log n) sift per heap it sits in.
+ *
+ * The index is warmed at startup and kept current from a change stream on
+ * `dids`. Change streams need a replica set; while the stream is unavailable
+ * the index is reloaded every DID_INDEX_RELOAD_MS (default 60s) and the
+ * stream is retried with backoff. A reload keeps local picks the database
+ * has not seen yet (the selection writes are buffered).
+ */
+
+const GOOD_REPUTATION = 50;
+const DEFAULT_REPUTATION = 50;
+const CYCLE_MAX_AGE_MS = 24 * 60 * 60 * 1000;
+
+// Heap nodes examined before a filtered pick gives up and relaxes its filters
+const SEARCH_LIMIT = 64;
+
+function nearbyNpaMaxMiles() {
+  return parseInt(process.env.NEARBY_NPA_MAX_MILES || '500', 10);
+}
+
+// Over-budget probationary DIDs are re-read at most this often
+const PROBE_CACHE_MS = 5000;
+
+// Longest wait between attempts to reopen a failed change stream
+const WATCH_RETRY_MAX_MS = 15 * 60 * 1000;
+
+function reloadInterval() {
+  return parseInt(process.env.DID_INDEX_RELOAD_MS || '60000', 10);
+}
+
+// Only the fields selection needs; change events are trimmed to the same set
+const PROJECTION = {
+  tenantId: 1,
+  phoneNumber: 1,
+  phoneKey: 1,
+  npanxx: 1,
+  location: 1,
+  status: 1,
+  capacity: 1,
+  'reputation.score': 1,
+  'usage.lastUsed': 1,
+  'usage.today': 1,
+  createdAt: 1,
+  lastCycleId: 1,
+  description: 1,
+  carrier: 1
+};
+
+function startOfDay(time) {
+  const day = new Date(time);
+  day.setHours(0, 0, 0, 0);
+  return day.getTime();
+}
+
+function defaultCapacity() {
+  return parseInt(process.env.DEFAULT_DID_CAPACITY || '100', 10);
+}
+
+// Least recently used first, then best reputation, then oldest
+function before(a, b) {
+  if (a.lastUsed !== b.lastUsed) return a.lastUsed < b.lastUsed;
+  if (a.score !== b.score) return a.score > b.score;
+  return a.createdAt < b.createdAt;
+}
+
+/**
+ * Binary min-heap of index entries that tracks each entry's position, so an
+ * entry can be re-sifted or removed in O(log n) when it changes.
+ */
+class IndexedHeap {
+  constructor() {
+    this.items = [];
+    this.positions = new Map();
+  }
+
+  get size() {
+    return this.items.length;
+  }
+
+  push(entry) {
+    this.items.push(entry);
+    this.positions.set(entry.id, this.items.length - 1);
+    this.siftUp(this.items.length - 1);
+  }
+
+  remove(entry) {
+    const i = this.positions.get(entry.id);
+    if (i === undefined) return;
+    const last = this.items.pop();
+    this.positions.delete(entry.id);
+    if (i < this.items.length) {
+      this.items[i] = last;
+      this.positions.set(last.id, i);
+      this.siftDown(i);
+      this.siftUp(this.positions.get(last.id));
+    }
+  }
+
+  update(entry) {
+    const i = this.positions.get(entry.id);
+    if (i === undefined) return;
+    this.siftUp(i);
+    this.siftDown(this.positions.get(entry.id));
+  }
+
+  /**
+   * Best entry (in heap order) that passes the predicate, examining at most
+   * `limit` nodes
+   */
+  find(predicate, limit = SEARCH_LIMIT) {
+    return this.findMany(predicate, 1, limit)[0] || null;
+  }
+
+  /**
+   * Up to `count` best entries that pass the predicate, in heap order. Walks
+   * the heap best-first without modifying it.
+   */
+  findMany(predicate, count, limit = SEARCH_LIMIT) {
+    const { items } = this;
+    const found = [];
+    if (items.length === 0) return found;
+
+    const frontier = [0];
+    for (let examined = 0; frontier.length > 0 && examined < limit; examined++) {
+      let bestAt = 0;
+      for (let j = 1; j < frontier.length; j++) {
+        if (before(items[frontier[j]], items[frontier[bestAt]])) bestAt = j;
+      }
+      const i = frontier[bestAt];
+      frontier[bestAt] = frontier[frontier.length - 1];
+      frontier.pop();
+
+      if (predicate(items[i])) {
+        found.push(items[i]);
+        if (found.length === count) break;
+      }
+
+      const left = 2 * i + 1;
+      if (left < items.length) frontier.push(left);
+      if (left + 1 < items.length) frontier.push(left + 1);
+    }
+    return found;
+  }
+
+  siftUp(i) {
+    const { items } = this;
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (!before(items[i], items[parent])) break;
+      this.swap(i, parent);
+      i = parent;
+    }
+  }
+
+  siftDown(i) {
+    const { items } = this;
+    for (;;) {
+      const left = 2 * i + 1;
+      const right = left + 1;
+      let smallest = i;
+      if (left < items.length && before(items[left], items[smallest])) smallest = left;
+      if (right < items.length && before(items[right], items[smallest])) smallest = right;
+      if (smallest === i) break;
+      this.swap(i, smallest);
+      i = smallest;
+    }
+  }
+
+  swap(i, j) {
+    const { items, positions } = this;
+    [items[i], items[j]] = [items[j], items[i]];
+    positions.set(items[i].id, i);
+    positions.set(items[j].id, j);
+  }
+}
+
+/**
+ * One tenant's selectable DIDs plus its rotation cycle
+ */
+export class TenantSelectionIndex {
+  constructor(tenantId, rotationState = {}) {
+    this.tenantId = String(tenantId);
+    this.entries = new Map();
+    this.all = new IndexedHeap();
+    this.good = new IndexedHeap();
+    this.byState = new Map();
+    this.byNpa = new Map();
+    this.byNpanxx = new Map();
+
+    // A DID is used this cycle when its lastCycleId equals cycle.id
+    this.cycle = { id: 1, lastReset: Date.now(), used: 0 };
+    this.adoptCycle(rotationState);
+  }
+
+  /**
+   * Switch to the tenant's current cycle (after an advance here or elsewhere)
+   */
+  adoptCycle(rotationState = {}) {
+    const id = rotationState.cycleId || 1;
+    if (id < this.cycle.id) return;
+    const lastReset = rotationState.lastReset ? new Date(rotationState.lastReset).getTime() : Date.now();
+    if (id === this.cycle.id) {
+      this.cycle.lastReset = Math.max(this.cycle.lastReset, lastReset);
+      return;
+    }
+
+    let used = 0;
+    for (const entry of this.entries.values()) {
+      if (entry.lastCycleId === id && entry.score >= GOOD_REPUTATION) used++;
+    }
+    this.cycle = { id, lastReset, used };
+  }
+
+  /**
+   * Add, refresh or drop a DID from a (possibly partial) document
+   */
+  upsert(doc) {
+    const id = String(doc._id);
+    const previous = this.entries.get(id);
+    if (previous) this.remove(id);
+    if (doc.status !== 'active') return;
+
+    const now = Date.now();
+    const dayStart = startOfDay(now);
+    const lastUsed = doc.usage?.lastUsed ? new Date(doc.usage.lastUsed).getTime() : 0;
+    const today = doc.usage?.today;
+    const todayCount = today?.day && new Date(today.day).getTime() === dayStart ? today.count || 0 : 0;
+
+    const entry = {
+      id,
+      _id: doc._id,
+      phoneNumber: doc.phoneNumber,
+      phoneKey: doc.phoneKey,
+      npanxx: doc.npanxx,
+      npa: doc.npanxx?.substring(0, 3) || doc.phoneKey?.substring(0, 3),
+      state: doc.location?.state,
+      location: doc.location,
+      description: doc.description,
+      carrier: doc.carrier,
+      score: doc.reputation?.score ?? DEFAULT_REPUTATION,
+      capacity: doc.capacity || defaultCapacity(),
+      createdAt: doc.createdAt ? new Date(doc.createdAt).getTime() : 0,
+      lastUsed,
+      lastCycleId: doc.lastCycleId || 0,
+      todayDay: dayStart,
+      todayCount
+    };
+
+    // Our own picks reach the index before their change events; never step back
+    if (previous) this.keepNewer(entry, previous);
+    this.insert(entry);
+  }
+
+  keepNewer(entry, previous) {
+    entry.lastUsed = Math.max(entry.lastUsed, previous.lastUsed);
+    entry.lastCycleId = Math.max(entry.lastCycleId, previous.lastCycleId);
+    if (previous.todayDay === entry.todayDay) entry.todayCount = Math.max(entry.todayCount, previous.todayCount);
+  }
+
+  insert(entry) {
+    // Picked in a newer cycle: another process has advanced it
+    if (entry.lastCycleId > this.cycle.id) this.adoptCycle({ cycleId: entry.lastCycleId });
+
+    this.entries.set(entry.id, entry);
+    if (this.countsTowardCycle(entry)) this.cycle.used++;
+    for (const heap of this.heapsFor(entry, true)) heap.push(entry);
+  }
+
+  /**
+   * Keep what `previous` (the index this one replaces) knew and the database
+   * may not yet: buffered picks, and a cycle advanced here
+   */
+  carryOver(previous) {
+    if (!previous) return;
+    this.adoptCycle({ cycleId: previous.cycle.id, lastReset: previous.cycle.lastReset });
+    for (const old of previous.entries.values()) {
+      const entry = this.entries.get(old.id);
+      if (!entry) continue;
+      this.remove(entry.id);
+      this.keepNewer(entry, old);
+      this.insert(entry);
+    }
+  }
+
+  remove(id) {
+    const entry = this.entries.get(String(id));
+    if (!entry) return;
+    for (const heap of this.heapsFor(entry, false)) heap.remove(entry);
+    this.entries.delete(entry.id);
+    if (this.countsTowardCycle(entry)) this.cycle.used--;
+  }
+
+  // The cycle ends once every good DID has been used in it
+  countsTowardCycle(entry) {
+    return entry.lastCycleId === this.cycle.id && entry.score >= GOOD_REPUTATION;
+  }
+
+  heapsFor(entry, create) {
+    const heaps = [this.all];
+    if (entry.score >= GOOD_REPUTATION) {
+      heaps.push(this.good);
+      if (entry.state) heaps.push(this.bucket(this.byState, entry.state, create));
+      if (entry.npa) heaps.push(this.bucket(this.byNpa, entry.npa, create));
+      if (entry.npanxx) heaps.push(this.bucket(this.byNpanxx, entry.npanxx, create));
+    }
+    return heaps.filter(Boolean);
+  }
+
+  bucket(map, key, create) {
+    let heap = map.get(key);
+    if (!heap && create) {
+      heap = new IndexedHeap();
+      map.set(key, heap);
+    }
+    return heap;
+  }
+
+  todayUsage(entry, dayStart = startOfDay(Date.now())) {
+    return entry.todayDay === dayStart ? entry.todayCount : 0;
+  }
+
+  /**
+   * True once every good DID has been used this cycle or the cycle is a day old
+   */
+  cycleExhausted(now = Date.now()) {
+    return this.cycle.used >= this.good.size || now - this.cycle.lastReset > CYCLE_MAX_AGE_MS;
+  }
+
+  /**
+   * Start the next cycle: one conditional write on the tenant, so concurrent
+   * callers (in this or another process) advance it once between them
+   */
+  async advanceCycle() {
+    const rotationState = await Tenant.advanceRotationCycle(this.tenantId, this.cycle.id);
+    if (rotationState) this.adoptCycle(rotationState);
+  }
+
+  /**
+   * Pick the next DID. Strategies in order: same exchange (NPANXX), same area
+   * code (NPA), same state, nearest area codes with DIDs (within
+   * NEARBY_NPA_MAX_MILES, from the area code proximity table), good
+   * reputation, any active. Within each, a DID unused this cycle and under
+   * capacity is preferred; DIDs in excludeKeys (by phoneKey) are never picked.
+   */
+  select(query = {}) {
+    const picks = this.candidates(query, 1);
+    return picks && { entry: picks.entries[0], strategy: picks.strategy, fresh: picks.fresh };
+  }
+
+  /**
+   * Up to `count` candidates from the first strategy that has any, best first.
+   * `fresh` is false when only already-used or over-capacity DIDs are left.
+   */
+  candidates({ state = null, npa = null, npanxx = null, excludeKeys = null } = {}, count = 1) {
+    const dayStart = startOfDay(Date.now());
+    const available = e => !(excludeKeys && excludeKeys.has(e.phoneKey));
+    const fresh = e => available(e) && e.lastCycleId !== this.cycle.id && this.todayUsage(e, dayStart) < e.capacity;
+    npa = npa || npanxx?.substring(0, 3) || null;
+
+    const strategies = [];
+    if (npanxx) strategies.push(['geo_npanxx', () => [this.byNpanxx.get(npanxx)]]);
+    if (npa) strategies.push(['geo_npa', () => [this.byNpa.get(npa)]]);
+    if (state) strategies.push(['geo_state', () => [this.byState.get(state)]]);
+    if (npa) strategies.push(['geo_nearby_npa', () => this.nearbyNpaHeaps(npa)]);
+    strategies.push(['good_reputation', () => [this.good]], ['any_active', () => [this.all]]);
+
+    for (const [strategy, heapsOf] of strategies) {
+      const heaps = heapsOf().filter(heap => heap && heap.size > 0);
+      if (!heaps.length) continue;
+      const entries = [];
+      for (const heap of heaps) {
+        entries.push(...heap.findMany(fresh, count - entries.length));
+        if (entries.length >= count) break;
+      }
+      if (entries.length) return { entries, strategy, fresh: true };
+      for (const heap of heaps) {
+        const reused = heap.find(available);
+        if (reused) return { entries: [reused], strategy, fresh: false };
+      }
+    }
+    return null;
+  }
+
+  /**
+   * Heaps of the tenant's area codes near `npa`, nearest first
+   */
+  nearbyNpaHeaps(npa) {
+    const nearby = areaCodeProximity.neighbours(npa, nearbyNpaMaxMiles()) || [];
+    return nearby.map(({ areaCode }) => this.byNpa.get(areaCode)).filter(Boolean);
+  }
+
+  /**
+   * Record a pick locally so the next request sees it before the write lands
+   */
+  markUsed(entry, now = Date.now()) {
+    const dayStart = startOfDay(now);
+    if (entry.todayDay !== dayStart) {
+      entry.todayDay = dayStart;
+      entry.todayCount = 0;
+    }
+    entry.todayCount++;
+    entry.lastUsed = now;
+    if (entry.lastCycleId !== this.cycle.id) {
+      entry.lastCycleId = this.cycle.id;
+      if (this.countsTowardCycle(entry)) this.cycle.used++;
+    }
+    for (const heap of this.heapsFor(entry, false)) heap.update(entry);
+  }
+
+  /**
+   * Move a DID back in the order after another process has used it
+   */
+  touch(entry, time) {
+    if (time <= entry.lastUsed) return;
+    entry.lastUsed = time;
+    for (const heap of this.heapsFor(entry, false)) heap.update(entry);
+  }
+
+  /**
+   * Take the shared rotation state (services/rotation-state-store.js) for the
+   * cycle and for one DID after claiming it there
+   */
+  applyShared(entry, { cycleId, used, lastReset, lastCycleId, today }) {
+    this.adoptCycle({ cycleId, lastReset });
+    this.cycle.used = used;
+    entry.lastCycleId = Math.max(entry.lastCycleId, lastCycleId);
+    const dayStart = startOfDay(Date.now());
+    entry.todayCount = Math.max(this.todayUsage(entry, dayStart), today);
+    entry.todayDay = dayStart;
+  }
+
+  stats() {
+    return {
+      active: this.entries.size,
+      goodReputation: this.good.size,
+      cycleId: this.cycle.id,
+      usedInCycle: this.cycle.used,
+      states: this.byState.size,
+      areaCodes: this.byNpa.size,
+      exchanges: this.byNpanxx.size
+    };
+  }
+}
+
+class DIDSelectionIndex {
+  constructor() {
+    this.tenants = new Map();
+    this.loading = new Map();
+    this.changeStream = null;
+    this.reloadTimer = null;
+    this.watchTimer = null;
+    this.watchRetryMs = null;
+    this.probeCache = { keys: new Set(), loadedAt: 0, pending: null };
+    this.stats = { warmMs: null, reloads: 0, changesApplied: 0, lastReloadAt: null };
+  }
+
+  /**
+   * Warm every tenant and start following changes; call once MongoDB is connected
+   */
+  async start() {
+    await this.warm();
+    this.watch();
+  }
+
+  /**
+   * (Re)load all active DIDs and each tenant's current cycle in one pass
+   */
+  async warm() {
+    const started = Date.now();
+    const tenants = await Tenant.find({}, { rotationState: 1 }).lean();
+    const rotationStates = new Map(tenants.map(t => [String(t._id), t.rotationState || {}]));
+
+    const fresh = new Map();
+    const cursor = DID.find({ status: 'active' }, PROJECTION).lean().cursor();
+    for await (const doc of cursor) {
+      const key = String(doc.tenantId);
+      let index = fresh.get(key);
+      if (!index) {
+        index = new TenantSelectionIndex(key, rotationStates.get(key));
+        fresh.set(key, index);
+      }
+      index.upsert(doc);
+    }
+
+    // Tenants that have lost all their active DIDs still need an (empty) index.
+    // Synchronous from here to the swap, so no pick lands in between.
+    for (const [key, previous] of this.tenants) {
+      if (!fresh.has(key)) fresh.set(key, new TenantSelectionIndex(key, rotationStates.get(key)));
+      fresh.get(key).carryOver(previous);
+    }
+
+    this.tenants = fresh;
+    this.stats.warmMs = Date.now() - started;
+    this.stats.reloads++;
+    this.stats.lastReloadAt = new Date();
+    let dids = 0;
+    for (const index of fresh.values()) dids += index.entries.size;
+    console.log(`🗂️ DID selection index loaded: ${dids} DIDs across ${fresh.size} tenants in ${this.stats.warmMs}ms`);
+  }
+
+  /**
+   * Index for one tenant, loading it on first use (e.g. a tenant created after startup)
+   */
+  async forTenant(tenantId) {
+    const key = String(tenantId);
+    const loaded = this.tenants.get(key);
+    if (loaded) return loaded;
+    if (this.loading.has(key)) return this.loading.get(key);
+
+    const load = (async () => {
+      const tenant = await Tenant.findById(tenantId, { rotationState: 1 }).lean();
+      const index = new TenantSelectionIndex(key, tenant?.rotationState);
+      const docs = await DID.find({ tenantId, status: 'active' }, PROJECTION).lean();
+      for (const doc of docs) index.upsert(doc);
+      this.tenants.set(key, index);
+      return index;
+    })();
+
+    this.loading.set(key, load);
+    try {
+      return await load;
+    } finally {
+      this.loading.delete(key);
+    }
+  }
+
+  watch() {
+    const project = { operationType: 1, documentKey: 1 };
+    for (const field of Object.keys(PROJECTION)) project[`fullDocument.${field}`] = 1;
+    project['fullDocument._id'] = 1;
+
+    let stream;
+    try {
+      stream = DID.watch([{ $project: project }], { fullDocument: 'updateLookup' });
+    } catch (error) {
+      this.watchFailed(error);
+      return;
+    }
+
+    this.changeStream = stream;
+    stream.on('change', change => {
+      this.watchRetryMs = null;
+      this.applyChange(change);
+    });
+    stream.on('error', error => {
+      if (this.changeStream !== stream) return;
+      this.changeStream = null;
+      stream.close().catch(() => {});
+      this.watchFailed(error);
+    });
+    this.stopPolling();
+  }
+
+  /**
+   * Reload periodically while the change stream is down, and try it again
+   * with backoff (a replica set election or network blip is not permanent)
+   */
+  watchFailed(error) {
+    this.watchRetryMs = Math.min((this.watchRetryMs || reloadInterval() / 2) * 2, WATCH_RETRY_MAX_MS);
+    console.warn(`⚠️ DID change stream unavailable (${error.message}); reloading the selection index periodically, retrying the stream in ${Math.round(this.watchRetryMs / 1000)}s`);
+    this.startPolling();
+    clearTimeout(this.watchTimer);
+    this.watchTimer = setTimeout(() => this.rewatch(), this.watchRetryMs);
+    this.watchTimer.unref();
+  }
+
+  async rewatch() {
+    this.watchTimer = null;
+    this.watch();
+    if (!this.changeStream) return;
+    // Catch up on changes made since the last reload; the stream covers the rest
+    await this.warm().catch(error => console.error('❌ DID selection index reload failed:', error.message));
+  }
+
+  applyChange(change) {
+    if (change.operationType === 'delete') {
+      for (const index of this.tenants.values()) index.remove(change.documentKey._id);
+      this.stats.changesApplied++;
+      return;
+    }
+
+    const doc = change.fullDocument;
+    if (!doc) return; // deleted before the lookup ran; the delete event follows
+
+    // Tenants not loaded yet pick the change up when they are
+    const index = this.tenants.get(String(doc.tenantId));
+    if (!index) return;
+    index.upsert(doc);
+    this.stats.changesApplied++;
+  }
+
+  startPolling() {
+    if (this.reloadTimer) return;
+    this.reloadTimer = setInterval(() => {
+      this.warm().catch(error => console.error('❌ DID selection index reload failed:', error.message));
+    }, reloadInterval());
+    this.reloadTimer.unref();
+  }
+
+  stopPolling() {
+    if (this.reloadTimer) {
+      clearInterval(this.reloadTimer);
+      this.reloadTimer = null;
+    }
+  }
+
+  /**
+   * phoneKeys of probationary DIDs that have used up their probe budget
+   */
+  async probeBudgetExclusions() {
+    const cache = this.probeCache;
+    if (Date.now() - cache.loadedAt < PROBE_CACHE_MS) return cache.keys;
+    if (!cache.pending) {
+      cache.pending = mongoose.model('DIDReputation').find(
+        {
+          probationaryUntil: { $gt: new Date() },
+          $expr: { $gte: ['$probeBudgetUsed', '$probeBudgetTotal'] }
+        },
+        { phoneNumber: 1, _id: 0 }
+      ).lean()
+        .then(rows => {
+          cache.keys = new Set(rows.map(r => r.phoneNumber));
+          cache.loadedAt = Date.now();
+          return cache.keys;
+        })
+        .finally(() => { cache.pending = null; });
+    }
+    return cache.pending;
+  }
+
+  async stop() {
+    clearTimeout(this.watchTimer);
+    this.watchTimer = null;
+    if (this.changeStream) {
+      const stream = this.changeStream;
+      this.changeStream = null;
+      await stream.close();
+    }
+    this.stopPolling();
+  }
+
+  getStats() {
+    let dids = 0;
+    for (const index of this.tenants.values()) dids += index.entries.size;
+    return {
+      ...this.stats,
+      tenants: this.tenants.size,
+      dids,
+      mode: this.changeStream ? 'change-stream' : (this.reloadTimer ? 'polling' : 'idle')
+    };
+  }
+}
+
+// Export singleton instance
+export default new DIDSelectionIndex();
@@ -0,0 +1,166 @@
+import mongoose from 'mongoose';
+
+/**
+ * Per-pool spatial index for CampaignDIDPool geographic rotation
+ *
+ * DIDs take their coordinates from their area code (DID pre-save), so even a
+ * pool of thousands of DIDs sits on a few hundred distinct points. The index
+ * groups a pool's DIDs by point once; a query measures the distance to each
+ * point (not each DID) and remembers the resulting nearest-first order per
+ * customer location, so repeated dials from the same area are a walk down a
+ * cached list.
+ *
+ * Indexes are dropped when a pool's DID list changes (CampaignDIDPool save
+ * and delete hooks), rebuilt when a candidate DID is missing from them (a
+ * change made by another process), and expire after POOL_GEO_INDEX_TTL_MS.
+ * Customer zip/state -> coordinates lookups are cached the same way.
+ */
+
+const EARTH_RADIUS_MILES = 3959;
+const DEFAULT_TTL_MS = 5 * 60 * 1000;
+
+// Cached nearest-first orders per pool, and cached customer locations
+const MAX_ORIGINS_PER_POOL = 200;
+const MAX_CUSTOMER_LOCATIONS = 5000;
+
+function haversineMiles(lat1, lng1, lat2, lng2) {
+  const toRad = Math.PI / 180;
+  const dLat = (lat2 - lat1) * toRad;
+  const dLng = (lng2 - lng1) * toRad;
+  const a = Math.sin(dLat / 2) ** 2 +
+    Math.cos(lat1 * toRad) * Math.cos(lat2 * toRad) * Math.sin(dLng / 2) ** 2;
+  return 2 * EARTH_RADIUS_MILES * Math.asin(Math.sqrt(Math.min(1, a)));
+}
+
+export class PoolGeoIndex {
+  constructor(dids) {
+    const points = new Map();
+    this.members = new Set();
+    for (const did of dids) {
+      const id = String(did._id);
+      this.members.add(id);
+      const latitude = did.location?.latitude;
+      const longitude = did.location?.longitude;
+      if (!latitude || !longitude) continue; // same as getDistanceFrom: no coordinates, never near
+      const key = `${latitude},${longitude}`;
+      let point = points.get(key);
+      if (!point) {
+        point = { latitude, longitude, ids: [] };
+        points.set(key, point);
+      }
+      point.ids.push(id);
+    }
+    this.points = [...points.values()];
+    this.builtAt = Date.now();
+    this.origins = new Map();
+  }
+
+  covers(dids) {
+    return dids.every(did => this.members.has(String(did._id)));
+  }
+
+  /**
+   * Points ordered nearest first from an origin, with distances; cached
+   */
+  ordered(latitude, longitude) {
+    const key = `${latitude},${longitude}`;
+    let order = this.origins.get(key);
+    if (!order) {
+      order = this.points
+        .map(point => ({ point, distance: haversineMiles(latitude, longitude, point.latitude, point.longitude) }))
+        .sort((a, b) => a.distance - b.distance);
+      if (this.origins.size >= MAX_ORIGINS_PER_POOL) this.origins.delete(this.origins.keys().next().value);
+      this.origins.set(key, order);
+    }
+    return order;
+  }
+
+  /**
+   * Up to `limit` of `dids` within `maxDistance` miles, nearest first, as
+   * [{ did, distance }]. DIDs at the same distance keep their order in `dids`.
+   */
+  nearest(latitude, longitude, dids, { maxDistance = Infinity, limit = 1 } = {}) {
+    const rank = new Map(dids.map((did, i) => [String(did._id), i]));
+    const result = [];
+    for (const { point, distance } of this.ordered(latitude, longitude)) {
+      if (distance > maxDistance || result.length >= limit) break;
+      const eligible = point.ids.filter(id => rank.has(id)).map(id => rank.get(id)).sort((a, b) => a - b);
+      for (const i of eligible) {
+        if (result.length >= limit) break;
+        result.push({ did: dids[i], distance });
+      }
+    }
+    return result;
+  }
+}
+
+class PoolGeoIndexCache {
+  constructor() {
+    this.pools = new Map();
+    this.customerLocations = new Map();
+    this.stats = { builds: 0, hits: 0, invalidations: 0, locationHits: 0, locationLookups: 0 };
+  }
+
+  // Read at call time: this module is imported before dotenv has loaded
+  get ttlMs() {
+    return parseInt(process.env.POOL_GEO_INDEX_TTL_MS || String(DEFAULT_TTL_MS), 10);
+  }
+
+  /**
+   * The index of a pool, built from `members` when missing, stale, or not
+   * covering every DID in `candidates`
+   */
+  forPool(poolId, members, candidates = members) {
+    const key = String(poolId);
+    const index = this.pools.get(key);
+    if (index && Date.now() - index.builtAt < this.ttlMs && index.covers(candidates)) {
+      this.stats.hits++;
+      return index;
+    }
+    const built = new PoolGeoIndex(members);
+    this.pools.set(key, built);
+    this.stats.builds++;
+    return built;
+  }
+
+  invalidate(poolId) {
+    if (this.pools.delete(String(poolId))) this.stats.invalidations++;
+  }
+
+  /**
+   * { latitude, longitude } for a customer zip or state, or null; cached
+   */
+  async customerLocation({ customerZip, customerState } = {}) {
+    const AreaCodeLocation = mongoose.model('AreaCodeLocation');
+    const lookups = [];
+    if (customerZip) lookups.push([`zip:${customerZip}`, { zipCode: customerZip }]);
+    if (customerState) lookups.push([`state:${customerState}`, { state: customerState }]);
+
+    for (const [key, filter] of lookups) {
+      const cached = this.customerLocations.get(key);
+      if (cached && Date.now() - cached.at < this.ttlMs) {
+        this.stats.locationHits++;
+        if (cached.location) return cached.location;
+        continue;
+      }
+
+      this.stats.locationLookups++;
+      const row = await AreaCodeLocation.findOne(filter).select('location.coordinates').lean();
+      const coordinates = row?.location?.coordinates;
+      const location = coordinates ? { latitude: coordinates[1], longitude: coordinates[0] } : null;
+      if (this.customerLocations.size >= MAX_CUSTOMER_LOCATIONS) {
+        this.customerLocations.delete(this.customerLocations.keys().next().value);
+      }
+      this.customerLocations.set(key, { location, at: Date.now() });
+      if (location) return location;
+    }
+    return null;
+  }
+
+  getStats() {
+    return { ...this.stats, pools: this.pools.size, customerLocations: this.customerLocations.size };
+  }
+}
+
+// Export singleton instance
+export default new PoolGeoIndexCache();
@@ -1,5 +1,4 @@
 import Bull from 'bull';
-import mongoose from 'mongoose';
 import reputationService from './reputation-service.js';
 
 const REDIS = { host: '127.0.0.1', port: 6379 };
@@ -8,7 +7,17 @@ const CONCURRENCY = 3;    // parallel workers
 
 export const reputationQueue = new Bull('did-reputation', { redis: REDIS });
 
-const AUTO_DISABLE_THRESHOLD = 40;
+// REPUTATION_WORKER=python hands jobs to scripts/reputation_queue_worker.py
+// through plain Redis lists instead of Bull: <prefix>:high / <prefix>:normal
+// hold JSON jobs, the worker keeps completed/failed counters. Read at call
+// time, since this module is imported before dotenv has loaded.
+function pythonWorkerEnabled() {
+  return process.env.REPUTATION_WORKER === 'python';
+}
+
+function listKey(name) {
+  return `${process.env.REPUTATION_QUEUE_PREFIX || 'reputation:jobs'}:${name}`;
+}
 
 // ── Workers ─────────────────────────────────────────────────────────────────
 reputationQueue.process(CONCURRENCY, async (job) => {
@@ -22,32 +31,8 @@ reputationQueue.process(CONCURRENCY, async (job) => {
   job.progress(100);
   const ok = results.filter(r => r.success).length;
 
-  // Auto-disable DIDs whose reputation dropped below threshold
-  try {
-    const DIDReputation = mongoose.model('DIDReputation');
-    const DID = mongoose.model('DID');
-
-    const lowScoreReps = await DIDReputation.find({
-      phoneNumber: { $in: phoneNumbers },
-      score: { $lt: AUTO_DISABLE_THRESHOLD }
-    }).lean();
-
-    if (lowScoreReps.length > 0) {
-      const lowPhones = lowScoreReps.map(r => r.phoneNumber);
-      // Match all common DID phone formats (+1XXXXXXXXXX, 1XXXXXXXXXX, XXXXXXXXXX)
-      const phoneVariants = lowPhones.flatMap(p => [`+1${p}`, `1${p}`, p]);
-      const updated = await DID.updateMany(
-        { phoneNumber: { $in: phoneVariants }, status: 'active' },
-        { $set: { status: 'inactive', updatedAt: new Date() } }
-      );
-      if (updated.modifiedCount > 0) {
-        console.log(`🚫 Auto-disabled ${updated.modifiedCount} DID(s) with score < ${AUTO_DISABLE_THRESHOLD}`);
-      }
-    }
-  } catch (autoDisableErr) {
-    console.error('⚠️ Auto-disable check failed:', autoDisableErr.message);
-  }
-
+  // Auto-disable and recovery are applied by scripts/reputation_sweeper.py
+  // from DIDReputation changes, off this job's critical path.
   return { total: phoneNumbers.length, success: ok, failed: phoneNumbers.length - ok };
 });
 
@@ -66,6 +51,8 @@ reputationQueue.on('failed', (job, err) => {
  */
 export async function enqueueReputationCheck(phoneNumbers, priority = 'normal') {
   if (!phoneNumbers.length) return;
+  if (pythonWorkerEnabled()) return enqueueForPythonWorker(phoneNumbers, priority);
+
   const jobPriority = priority === 'high' ? 1 : 10;
   const jobs = [];
   for (let i = 0; i < phoneNumbers.length; i += BATCH_SIZE) {
@@ -81,8 +68,59 @@ export async function enqueueReputationCheck(phoneNumbers, priority = 'normal')
   console.log(`📬 Enqueued ${phoneNumbers.length} DIDs (${jobs.length} jobs, priority=${priority})`);
 }
 
+async function enqueueForPythonWorker(phoneNumbers, priority) {
+  // Bull's ioredis connection; no second client needed
+  const redis = reputationQueue.client;
+  const key = listKey(priority === 'high' ? 'high' : 'normal');
+  const minute = Math.floor(Date.now() / 60000);
+  let queued = 0;
+
+  const pipeline = redis.pipeline();
+  for (let i = 0; i < phoneNumbers.length; i += BATCH_SIZE) {
+    const batch = phoneNumbers.slice(i, i + BATCH_SIZE);
+    // Same deduplication window as the Bull jobId
+    const jobId = `${batch[0]}-${batch.length}-${minute}`;
+    const fresh = await redis.set(listKey(`seen:${jobId}`), '1', 'EX', 120, 'NX');
+    if (!fresh) continue;
+    pipeline.lpush(key, JSON.stringify({
+      id: jobId, phoneNumbers: batch, priority, attempts: 2, attemptsMade: 0, enqueuedAt: Date.now()
+    }));
+    queued++;
+  }
+  await pipeline.exec();
+  console.log(`📬 Enqueued ${phoneNumbers.length} DIDs (${queued} jobs for the Python worker, priority=${priority})`);
+}
+
+// SCAN, not KEYS: this Redis is shared with Bull and the rotation store
+async function scanKeys(redis, match) {
+  const keys = [];
+  for await (const batch of redis.scanStream({ match, count: 100 })) keys.push(...batch);
+  return [...new Set(keys)];
+}
+
+async function getPythonWorkerStatus() {
+  const redis = reputationQueue.client;
+  const processingKeys = await scanKeys(redis, listKey('processing:*'));
+  const [high, normal, completed, failed, ...processing] = await Promise.all([
+    redis.llen(listKey('high')),
+    redis.llen(listKey('normal')),
+    redis.get(listKey('completed')),
+    redis.get(listKey('failed')),
+    ...processingKeys.map(k => redis.llen(k)),
+  ]);
+  return {
+    waiting: high + normal,
+    active: processing.reduce((sum, n) => sum + n, 0),
+    completed: parseInt(completed || '0', 10),
+    failed: parseInt(failed || '0', 10),
+    delayed: 0,
+  };
+}
+
 // ── Queue status helper ──────────────────────────────────────────────────────
 export async function getQueueStatus() {
+  if (pythonWorkerEnabled()) return getPythonWorkerStatus();
+
   const [waiting, active, completed, failed, delayed] = await Promise.all([
     reputationQueue.getWaitingCount(),
     reputationQueue.getActiveCount(),
@@ -71,6 +71,8 @@ DIDReputationSchema.index({ 'robokillerData.reputationStatus': 1 });
 DIDReputationSchema.index({ lastChecked: 1 });
 DIDReputationSchema.index({ nextCheckDue: 1 });
 DIDReputationSchema.index({ isBlacklisted: 1 });
+// Watermark scans by scripts/reputation_sweeper.py
+DIDReputationSchema.index({ updatedAt: 1 });
 // Probe-budget indexes — used by the selector cap and the graduation cron
 DIDReputationSchema.index({ probationaryUntil: 1 });
 DIDReputationSchema.index({ isBlacklisted: 1, nextCheckDue: 1, probationaryUntil: 1 });
@@ -323,6 +325,12 @@ class ReputationService {
             checkCount: 1
           });
         }
+
+        // Keep the DID's own due date in step for background candidate selection
+        await DID.updateMany(
+          { phoneKey: normalized },
+          { $set: { 'reputation.nextCheckDue': nextCheckDue } }
+        );
       }
 
       return reputation;
@@ -362,100 +370,18 @@ class ReputationService {
       console.log(`🕷️ Using Crawl4AI batch processing for ${phoneNumbers.length} DIDs`);
 
       try {
-        // Use Crawl4AI's optimized batch scraping
-        const scrapeResults = await crawl4aiService.batchScrape(phoneNumbers, {
+        // Use Crawl4AI's optimized batch scraping. Results stream in as the
+        // scraper finishes each number, so database writes start immediately
+        // instead of waiting for the whole batch.
+        const writes = [];
+        await crawl4aiService.batchScrape(phoneNumbers, {
           batchSize,
           delayMs,
-          maxRetries: 2
+          maxRetries: 2,
+          onResult: (scrapeResult) => writes.push(this.saveBatchScrapeResult(scrapeResult))
         });
 
-        // Process scraped data and update database
-        const results = [];
-        for (const scrapeResult of scrapeResults) {
-          try {
-            if (scrapeResult.success && scrapeResult.data.success) {
-              // Update reputation data in database
-              const robokillerData = scrapeResult.data.data;
-              const reputationScore = this.calculateReputationScore(robokillerData);
-
-              // Determine next check interval
-              let nextCheckDue = null;
-              const status = robokillerData.reputationStatus.toLowerCase();
-              let isBlacklisted = false;
-              let blacklistedAt = null;
-
-              if (status === 'negative') {
-                // Re-check in 7 days; DIDs do recover.
-                nextCheckDue = new Date(Date.now() + this.checkInterval.negative);
-                isBlacklisted = true;
-                blacklistedAt = new Date();
-                console.log(`🚫 Blacklisting negative DID: ${scrapeResult.phoneNumber} (re-check in 7d)`);
-              } else {
-                const checkInterval = this.checkInterval[status] || this.checkInterval.neutral;
-                nextCheckDue = new Date(Date.now() + checkInterval);
-              }
-
-              // Normalize the phone used as the reputation key (10-digit)
-              const normalizedPhone = this.normalizePhone(scrapeResult.phoneNumber);
-
-              // Update or create reputation record
-              const reputation = await DIDReputation.findOneAndUpdate(
-                { phoneNumber: normalizedPhone },
-                {
-                  phoneNumber: normalizedPhone,
-                  robokillerData,
-                  reputationScore,
-                  lastChecked: new Date(),
-                  nextCheckDue,
-                  isBlacklisted,
-                  blacklistedAt,
-                  updatedAt: new Date(),
-                  $inc: { checkCount: 1 }
-                },
-                { upsert: true, new: true }
-              );
-
-              // Also update the DID model's reputation field. DID.phoneNumber may be
-              // stored as "1NPANXXXXXX", "+1NPANXXXXXX", or "NPANXXXXXX" — match the
-              // tail of the normalized 10-digit number to cover all three.
-              const didUpdate = {
-                'reputation.score': reputationScore,
-                'reputation.status': robokillerData.reputationStatus || 'Unknown',
-                'reputation.lastChecked': new Date(),
-                'reputation.robokillerData': robokillerData
-              };
-              if (isBlacklisted) didUpdate['status'] = 'inactive';
-              await DID.updateMany(
-                { phoneNumber: new RegExp(normalizedPhone + '$') },
-                { $set: didUpdate }
-              );
-
-              results.push({
-                phoneNumber: scrapeResult.phoneNumber,
-                success: true,
-                data: reputation,
-                method: 'crawl4ai'
-              });
-
-            } else {
-              // Handle scraping failure
-              results.push({
-                phoneNumber: scrapeResult.phoneNumber,
-                success: false,
-                error: scrapeResult.error || 'Scraping failed',
-                method: 'crawl4ai'
-              });
-            }
-          } catch (dbError) {
-            console.error(`Database error for ${scrapeResult.phoneNumber}:`, dbError);
-            results.push({
-              phoneNumber: scrapeResult.phoneNumber,
-              success: false,
-              error: `Database error: ${dbError.message}`,
-              method: 'crawl4ai'
-            });
-          }
-        }
+        const results = await Promise.all(writes);
 
         return results;
 
@@ -468,6 +394,95 @@ class ReputationService {
     }
   }
 
+  /**
+   * Persist one streamed batch scrape result to DIDReputation and DID
+   */
+  async saveBatchScrapeResult(scrapeResult) {
+    try {
+      if (scrapeResult.success && scrapeResult.data.success) {
+        // Update reputation data in database
+        const robokillerData = scrapeResult.data.data;
+        const reputationScore = this.calculateReputationScore(robokillerData);
+
+        // Determine next check interval
+        let nextCheckDue = null;
+        const status = robokillerData.reputationStatus.toLowerCase();
+        let isBlacklisted = false;
+        let blacklistedAt = null;
+
+        if (status === 'negative') {
+          // Re-check in 7 days; DIDs do recover.
+          nextCheckDue = new Date(Date.now() + this.checkInterval.negative);
+          isBlacklisted = true;
+          blacklistedAt = new Date();
+          console.log(`🚫 Blacklisting negative DID: ${scrapeResult.phoneNumber} (re-check in 7d)`);
+        } else {
+          const checkInterval = this.checkInterval[status] || this.checkInterval.neutral;
+          nextCheckDue = new Date(Date.now() + checkInterval);
+        }
+
+        // Normalize the phone used as the reputation key (10-digit)
+        const normalizedPhone = this.normalizePhone(scrapeResult.phoneNumber);
+
+        // Update or create reputation record
+        const reputation = await DIDReputation.findOneAndUpdate(
+          { phoneNumber: normalizedPhone },
+          {
+            phoneNumber: normalizedPhone,
+            robokillerData,
+            reputationScore,
+            lastChecked: new Date(),
+            nextCheckDue,
+            isBlacklisted,
+            blacklistedAt,
+            updatedAt: new Date(),
+            $inc: { checkCount: 1 }
+          },
+          { upsert: true, new: true }
+        );
+
+        // Also update the DID model's reputation field. DID.phoneNumber may be
+        // stored as "1NPANXXXXXX", "+1NPANXXXXXX", or "NPANXXXXXX"; phoneKey holds
+        // the normalized 10-digit form of all three, so this is an indexed exact match.
+        const didUpdate = {
+          'reputation.score': reputationScore,
+          'reputation.status': robokillerData.reputationStatus || 'Unknown',
+          'reputation.lastChecked': new Date(),
+          'reputation.nextCheckDue': nextCheckDue,
+          'reputation.robokillerData': robokillerData
+        };
+        await DID.updateMany(
+          { phoneKey: normalizedPhone },
+          { $set: didUpdate }
+        );
+
+        return {
+          phoneNumber: scrapeResult.phoneNumber,
+          success: true,
+          data: reputation,
+          method: 'crawl4ai'
+        };
+
+      } else {
+        // Handle scraping failure
+        return {
+          phoneNumber: scrapeResult.phoneNumber,
+          success: false,
+          error: scrapeResult.error || 'Scraping failed',
+          method: 'crawl4ai'
+        };
+      }
+    } catch (dbError) {
+      console.error(`Database error for ${scrapeResult.phoneNumber}:`, dbError);
+      return {
+        phoneNumber: scrapeResult.phoneNumber,
+        success: false,
+        error: `Database error: ${dbError.message}`,
+        method: 'crawl4ai'
+      };
+    }
+  }
+
   /**
    * Legacy bulk update method (fallback)
    */
@@ -600,6 +615,10 @@ class ReputationService {
     reputation.updatedAt = new Date();
 
     await reputation.save();
+    await DID.updateMany(
+      { phoneKey: this.normalizePhone(phoneNumber) },
+      { $set: { 'reputation.nextCheckDue': reputation.nextCheckDue } }
+    );
     console.log(`✅ Unblacklisted DID: ${phoneNumber}`);
 
     return reputation;
@@ -0,0 +1,227 @@
+import Redis from 'ioredis';
+import Tenant from '../models/Tenant.js';
+
+/**
+ * Shared DID rotation state in Redis, for running /api/v1/dids/next in
+ * several Node processes (PM2 cluster mode, several hosts)
+ *
+ * Each process still picks candidates from its own selection index
+ * (services/did-selection-index.js); this store makes the claim itself
+ * atomic across processes. Per tenant, with the tenant id as hash tag so the
+ * keys stay in one Redis Cluster slot:
+ *
+ *   rotation:{tenantId}:state        hash  cycleId, lastReset (ms), used
+ *   rotation:{tenantId}:cycle        hash  didId -> cycle it was last claimed in
+ *   rotation:{tenantId}:today:<day>  hash  didId -> calls today (expires after 2 days)
+ *
+ * The hashes start empty when ROTATION_STATE=redis is switched on (or after a
+ * Redis flush), so every claim also sends what the local index knows, loaded
+ * from MongoDB: the tenant's cycle and used count, and each candidate's
+ * lastCycleId and calls today. The script seeds missing fields from them
+ * (HSETNX) and never lowers what Redis already has.
+ *
+ * One Lua script advances the cycle when it is exhausted or a day old, then
+ * claims the first of up to CLAIM_CANDIDATES local candidates that no process
+ * has used this cycle and that is under capacity, and counts the call. The
+ * reply carries the shared state of every candidate, so the local index learns
+ * about other processes' picks in the same round trip.
+ *
+ * Enabled with ROTATION_STATE=redis. ROTATION_REDIS_URL defaults to the
+ * Redis that Bull uses (127.0.0.1:6379).
+ */
+
+const CYCLE_MAX_AGE_MS = 24 * 60 * 60 * 1000;
+const TODAY_TTL_SECONDS = 2 * 24 * 60 * 60;
+const GOOD_REPUTATION = 50;
+
+// Candidates sent per claim, and claims tried before accepting a DID that
+// another process has already used this cycle
+const CLAIM_CANDIDATES = 8;
+const MAX_CLAIM_ATTEMPTS = 3;
+
+// KEYS: state, cycle, today
+// ARGV: now, maxAgeMs, seedCycleId, seedUsed, goodCount, requireFresh, todayTtl,
+//       then didId, isGood, capacity, seedLastCycleId, seedToday for each
+//       candidate in preference order
+// Returns: claimed (1-based candidate, 0 = none), cycleId, used, lastReset,
+//          advanced, then lastCycleId, today for each candidate
+const CLAIM_SCRIPT = `
+local now = tonumber(ARGV[1])
+local cycle = tonumber(redis.call('HGET', KEYS[1], 'cycleId'))
+if not cycle then
+  cycle = tonumber(ARGV[3])
+  redis.call('HSET', KEYS[1], 'cycleId', cycle, 'lastReset', now, 'used', tonumber(ARGV[4]))
+end
+
+for i = 8, #ARGV, 5 do
+  if tonumber(ARGV[i + 3]) > 0 then redis.call('HSETNX', KEYS[2], ARGV[i], ARGV[i + 3]) end
+  if tonumber(ARGV[i + 4]) > 0 then redis.call('HSETNX', KEYS[3], ARGV[i], ARGV[i + 4]) end
+end
+redis.call('EXPIRE', KEYS[3], tonumber(ARGV[7]))
+
+local used = tonumber(redis.call('HGET', KEYS[1], 'used') or '0')
+local lastReset = tonumber(redis.call('HGET', KEYS[1], 'lastReset') or now)
+
+local advanced = 0
+if used >= tonumber(ARGV[5]) or now - lastReset > tonumber(ARGV[2]) then
+  cycle = cycle + 1
+  used = 0
+  lastReset = now
+  advanced = 1
+  redis.call('HSET', KEYS[1], 'cycleId', cycle, 'lastReset', now, 'used', 0)
+end
+
+local claimed = 0
+local seen = {}
+for i = 8, #ARGV, 5 do
+  local did = ARGV[i]
+  local last = tonumber(redis.call('HGET', KEYS[2], did) or '0')
+  local today = tonumber(redis.call('HGET', KEYS[3], did) or '0')
+  if claimed == 0 and (ARGV[6] ~= '1' or (last ~= cycle and today < tonumber(ARGV[i + 2]))) then
+    claimed = (i - 8) / 5 + 1
+    if last ~= cycle then
+      redis.call('HSET', KEYS[2], did, cycle)
+      if ARGV[i + 1] == '1' then
+        used = redis.call('HINCRBY', KEYS[1], 'used', 1)
+      end
+      last = cycle
+    end
+    today = redis.call('HINCRBY', KEYS[3], did, 1)
+  end
+  seen[#seen + 1] = last
+  seen[#seen + 1] = today
+end
+return {claimed, cycle, used, lastReset, advanced, unpack(seen)}
+`;
+
+function dayKey(now) {
+  const day = new Date(now);
+  return `${day.getFullYear()}${String(day.getMonth() + 1).padStart(2, '0')}${String(day.getDate()).padStart(2, '0')}`;
+}
+
+class RotationStateStore {
+  constructor() {
+    this.redis = null;
+    this.stats = { claims: 0, conflicts: 0, cycleAdvances: 0, errors: 0 };
+  }
+
+  // Read at call time: this module is imported before dotenv has loaded
+  enabled() {
+    return process.env.ROTATION_STATE === 'redis';
+  }
+
+  client() {
+    if (!this.redis) {
+      const url = process.env.ROTATION_REDIS_URL || 'redis://127.0.0.1:6379';
+      // Fail fast: a dial must not wait on a Redis reconnect; the caller falls back
+      this.redis = new Redis(url, { maxRetriesPerRequest: 1, enableOfflineQueue: false });
+      this.redis.on('error', error => console.warn('⚠️ Rotation state Redis error:', error.message));
+      this.redis.defineCommand('claimDid', { numberOfKeys: 3, lua: CLAIM_SCRIPT });
+    }
+    return this.redis;
+  }
+
+  keys(tenantId, now) {
+    const prefix = `rotation:{${tenantId}}`;
+    return [`${prefix}:state`, `${prefix}:cycle`, `${prefix}:today:${dayKey(now)}`];
+  }
+
+  /**
+   * Atomically claim the first usable DID of `entries` for a tenant; returns the
+   * shared state after the attempt, including what it knows of every candidate
+   */
+  async claim(index, entries, { requireFresh, now = Date.now() }) {
+    const candidates = entries.flatMap(entry => [
+      entry.id,
+      entry.score >= GOOD_REPUTATION ? 1 : 0,
+      entry.capacity,
+      entry.lastCycleId,
+      index.todayUsage(entry)
+    ]);
+    const reply = (await this.client().claimDid(
+      ...this.keys(index.tenantId, now),
+      now,
+      CYCLE_MAX_AGE_MS,
+      index.cycle.id,
+      index.cycle.used,
+      Math.max(index.good.size, 1),
+      requireFresh ? 1 : 0,
+      TODAY_TTL_SECONDS,
+      ...candidates
+    )).map(Number);
+
+    const [claimed, cycleId, used, lastReset, advanced] = reply;
+    return {
+      claimed: claimed - 1,
+      cycleId,
+      used,
+      lastReset,
+      advanced: advanced === 1,
+      candidates: entries.map((entry, i) => ({ lastCycleId: reply[5 + 2 * i], today: reply[6 + 2 * i] }))
+    };
+  }
+
+  /**
+   * Pick and claim the next DID through the shared state. Same result shape as
+   * TenantSelectionIndex.select(); the DID is already marked used in the index.
+   */
+  async claimNext(index, query) {
+    for (let attempt = 0; attempt < MAX_CLAIM_ATTEMPTS; attempt++) {
+      const picks = index.candidates(query, CLAIM_CANDIDATES);
+      if (!picks) return null;
+
+      const now = Date.now();
+      const requireFresh = picks.fresh && attempt < MAX_CLAIM_ATTEMPTS - 1;
+      let shared;
+      try {
+        shared = await this.claim(index, picks.entries, { requireFresh, now });
+      } catch (error) {
+        this.stats.errors++;
+        throw error;
+      }
+
+      if (shared.advanced) {
+        this.stats.cycleAdvances++;
+        // Keep MongoDB's copy of the cycle for restarts and the ROTATION_STATE=local path
+        Tenant.updateOne(
+          { _id: index.tenantId, 'rotationState.cycleId': { $not: { $gte: shared.cycleId } } },
+          { $set: { 'rotationState.cycleId': shared.cycleId, 'rotationState.lastReset': new Date(shared.lastReset) } }
+        ).catch(error => console.warn('⚠️ Rotation cycle mirror to MongoDB failed:', error.message));
+      }
+
+      // Candidates ahead of the claimed one were taken by other processes:
+      // record that so this index stops offering them
+      picks.entries.forEach((entry, i) => {
+        if (i === shared.claimed) return;
+        if (shared.claimed === -1 || i < shared.claimed) {
+          this.stats.conflicts++;
+          if (shared.candidates[i].lastCycleId === shared.cycleId) index.touch(entry, now);
+        }
+        index.applyShared(entry, { ...shared, ...shared.candidates[i] });
+      });
+
+      if (shared.claimed >= 0) {
+        const entry = picks.entries[shared.claimed];
+        index.markUsed(entry, now);
+        index.applyShared(entry, { ...shared, ...shared.candidates[shared.claimed] });
+        this.stats.claims++;
+        return { entry, strategy: picks.strategy, fresh: picks.fresh, cycleAdvanced: shared.advanced };
+      }
+    }
+    return null;
+  }
+
+  async close() {
+    if (this.redis) {
+      await this.redis.quit().catch(() => {});
+      this.redis = null;
+    }
+  }
+
+  getStats() {
+    return { ...this.stats, enabled: this.enabled(), connected: this.redis?.status === 'ready' };
+  }
+}
+
+// Export singleton instance
+export default new RotationStateStore();
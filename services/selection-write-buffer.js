@@ -0,0 +1,383 @@
+import mongoose from 'mongoose';
+import DID from '../models/DID.js';
+import CallRecord from '../models/CallRecord.js';
+
+/**
+ * Write-behind buffer for the writes /api/v1/dids/next makes per dial
+ *
+ * The handler answers as soon as a DID is picked; the writes are queued here
+ * and flushed together every SELECTION_FLUSH_MS or as soon as
+ * SELECTION_FLUSH_BATCH are queued, whichever comes first:
+ *
+ *   - CallRecords       one CallRecord.insertMany (unordered)
+ *   - DID usage         picks of the same DID are merged into one
+ *                       DID.todayUsageUpdate pipeline; one unordered bulkWrite
+ *   - probe budgets     one unordered bulkWrite on didreputations
+ *
+ * Loss window: a crash loses at most the writes queued since the last flush
+ * (SELECTION_FLUSH_MS, or one batch). SIGINT/SIGTERM flush everything first.
+ * Failed writes are re-queued and retried with exponential backoff (from
+ * SELECTION_RETRY_BASE_MS up to SELECTION_RETRY_MAX_MS), so a replica set
+ * failover delays them instead of losing them; rows that can never succeed
+ * (validation errors, duplicate keys) are dropped. DID usage and probe budget
+ * updates are $inc: when a whole batch fails in a way that may have reached
+ * the server (timeout, dropped connection) they are dropped and counted in
+ * writesUnknown rather than retried, since a retry could count them twice.
+ * CallRecords are safe to retry (a repeated insert is a duplicate key).
+ * Backpressure: past SELECTION_MAX_PENDING queued writes, admit() makes
+ * callers wait for the flush in progress, so a slow database slows dialing
+ * down instead of growing the buffer without bound.
+ */
+
+// Flushes tried on shutdown before the rest is reported lost
+const CLOSE_FLUSH_ATTEMPTS = 3;
+
+// Duplicate key, document validation failure: retrying cannot help
+const PERMANENT_ERROR_CODES = new Set([11000, 121]);
+
+// Whole-batch errors returned before anything was applied: NotWritablePrimary,
+// NotPrimaryNoSecondaryOk
+const NOT_APPLIED_ERROR_CODES = new Set([10107, 13435]);
+
+// True when a failed batch certainly did not reach the server
+function notApplied(error) {
+  return NOT_APPLIED_ERROR_CODES.has(error.code) ||
+    error.name === 'MongoServerSelectionError' ||
+    /buffering timed out/.test(error.message);
+}
+
+function envInt(name, fallback) {
+  return parseInt(process.env[name] || String(fallback), 10);
+}
+
+export class SelectionWriteBuffer {
+  constructor(options = {}) {
+    this.options = options;
+    this.calls = [];
+    this.didUses = new Map();
+    this.probeUses = [];
+    this.oldestQueuedAt = null;
+    this.timer = null;
+    this.flushing = null;
+    this.closed = false;
+    this.consecutiveFailures = 0;
+    this.retryAfter = 0;
+
+    this.metrics = {
+      callsQueued: 0,
+      didUsesQueued: 0,
+      probeUsesQueued: 0,
+      writesFlushed: 0,
+      writesFailed: 0,
+      writesDropped: 0,
+      writesRetried: 0,
+      writesUnknown: 0,
+      flushes: 0,
+      flushErrors: 0,
+      lastFlushMs: null,
+      maxFlushMs: 0,
+      lastFlushAt: null,
+      backpressureWaits: 0,
+      backpressureWaitMs: 0
+    };
+  }
+
+  // Read lazily: server-full.js imports services before dotenv has run
+  get flushMs() {
+    return this.options.flushMs ?? envInt('SELECTION_FLUSH_MS', 20);
+  }
+
+  get batchSize() {
+    return this.options.batchSize ?? envInt('SELECTION_FLUSH_BATCH', 500);
+  }
+
+  get maxPending() {
+    return this.options.maxPending ?? envInt('SELECTION_MAX_PENDING', 10000);
+  }
+
+  get retryBaseMs() {
+    return this.options.retryBaseMs ?? envInt('SELECTION_RETRY_BASE_MS', 100);
+  }
+
+  get retryMaxMs() {
+    return this.options.retryMaxMs ?? envInt('SELECTION_RETRY_MAX_MS', 5000);
+  }
+
+  get pending() {
+    return this.calls.length + this.didUses.size + this.probeUses.length;
+  }
+
+  /**
+   * Wait here before queueing when the buffer is over its high-water mark
+   */
+  async admit() {
+    if (this.pending < this.maxPending) return;
+    const started = Date.now();
+    this.metrics.backpressureWaits++;
+    while (this.pending >= this.maxPending && !this.closed) {
+      await this.flush();
+    }
+    this.metrics.backpressureWaitMs += Date.now() - started;
+  }
+
+  /**
+   * Queue a CallRecord insert; returns its _id so callers can refer to it now
+   */
+  recordCall(doc) {
+    const record = { _id: new mongoose.Types.ObjectId(), ...doc };
+    this.calls.push({ record, attempts: 0 });
+    this.metrics.callsQueued++;
+    this.queued();
+    return record._id;
+  }
+
+  /**
+   * Queue one pick of a DID; `set` holds the fields the pick writes (lastUsed, ...)
+   */
+  recordDidUse(didId, now, set) {
+    const key = String(didId);
+    const use = this.didUses.get(key);
+    if (use) {
+      use.calls++;
+      use.now = now;
+      Object.assign(use.set, set);
+    } else {
+      this.didUses.set(key, { didId, calls: 1, now, set: { ...set }, attempts: 0 });
+    }
+    this.metrics.didUsesQueued++;
+    this.queued();
+  }
+
+  /**
+   * Queue a probe-budget increment for a probationary DID (no-op for others)
+   */
+  recordProbeUse(phoneKey, now = new Date()) {
+    this.probeUses.push({ phoneKey, now, attempts: 0 });
+    this.metrics.probeUsesQueued++;
+    this.queued();
+  }
+
+  queued() {
+    if (this.oldestQueuedAt === null) this.oldestQueuedAt = Date.now();
+    if (this.pending >= this.batchSize) {
+      this.flush().catch(() => {});
+    } else if (!this.timer && !this.closed) {
+      this.timer = setTimeout(() => {
+        this.timer = null;
+        this.flush().catch(() => {});
+      }, Math.max(this.flushMs, this.retryAfter - Date.now()));
+    }
+  }
+
+  /**
+   * Write everything queued so far. Concurrent calls share the flush in progress.
+   */
+  async flush() {
+    if (this.flushing) return this.flushing;
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+    if (this.pending === 0) return;
+
+    this.flushing = this.run().finally(() => {
+      this.flushing = null;
+      // Writes queued while this flush ran get their own
+      if (this.pending > 0 && !this.timer && !this.closed) this.queued();
+    });
+    return this.flushing;
+  }
+
+  async run() {
+    // Backing off after failed writes; shutdown does not wait
+    const backoff = this.retryAfter - Date.now();
+    if (backoff > 0 && !this.closed) {
+      await new Promise(resolve => setTimeout(resolve, backoff));
+    }
+
+    const calls = this.calls;
+    const didUses = [...this.didUses.values()];
+    const probeUses = this.probeUses;
+    this.calls = [];
+    this.didUses = new Map();
+    this.probeUses = [];
+    this.oldestQueuedAt = null;
+
+    await this.write(calls, didUses, probeUses);
+  }
+
+  async write(calls, didUses, probeUses) {
+    const started = Date.now();
+    const results = await Promise.allSettled([
+      // throwOnValidationError: otherwise invalid records are skipped silently
+      calls.length && CallRecord.insertMany(calls.map(c => c.record), { ordered: false, throwOnValidationError: true }),
+      didUses.length && DID.collection.bulkWrite(didUses.map(use => ({
+        updateOne: {
+          filter: { _id: use.didId },
+          update: DID.todayUsageUpdate(use.now, use.set, use.calls)
+        }
+      })), { ordered: false }),
+      probeUses.length && mongoose.model('DIDReputation').collection.bulkWrite(probeUses.map(use => ({
+        updateOne: {
+          filter: {
+            phoneNumber: use.phoneKey,
+            probationaryUntil: { $gt: use.now },
+            $expr: { $lt: ['$probeBudgetUsed', '$probeBudgetTotal'] }
+          },
+          update: { $inc: { probeBudgetUsed: 1 } }
+        }
+      })), { ordered: false })
+    ]);
+
+    // [label, items, requeue, idempotent]
+    const batches = [
+      ['CallRecord', calls, items => this.calls.push(...items), true],
+      ['DID usage', didUses, items => items.forEach(use => this.requeueDidUse(use)), false],
+      ['probe budget', probeUses, items => this.probeUses.push(...items), false]
+    ];
+    let retrying = false;
+    results.forEach((result, i) => {
+      const [label, items, requeue, idempotent] = batches[i];
+      if (!items.length) return;
+      if (result.status === 'fulfilled') {
+        this.metrics.writesFlushed += items.length;
+        return;
+      }
+      if (this.failed(label, items, result.reason, requeue, idempotent)) retrying = true;
+    });
+
+    if (retrying) {
+      this.consecutiveFailures++;
+      const delay = Math.min(this.retryBaseMs * 2 ** (this.consecutiveFailures - 1), this.retryMaxMs);
+      this.retryAfter = Date.now() + delay;
+    } else {
+      this.consecutiveFailures = 0;
+      this.retryAfter = 0;
+    }
+
+    const elapsed = Date.now() - started;
+    this.metrics.flushes++;
+    this.metrics.lastFlushMs = elapsed;
+    this.metrics.maxFlushMs = Math.max(this.metrics.maxFlushMs, elapsed);
+    this.metrics.lastFlushAt = new Date();
+  }
+
+  /**
+   * Per-row errors of a failed batch as Map(index -> error), or null when the
+   * whole batch failed (network error, no primary, ...)
+   */
+  rowErrors(error) {
+    // insertMany with throwOnValidationError: results[i] is the error for invalid rows
+    if (error.name === 'MongooseBulkWriteError' && Array.isArray(error.results)) {
+      const rows = new Map();
+      error.results.forEach((result, i) => {
+        if (result instanceof Error) rows.set(i, { code: 121, message: result.message });
+      });
+      return rows;
+    }
+    const writeErrors = error.writeErrors || error.result?.getWriteErrors?.() || [];
+    const rows = new Map();
+    for (const e of [].concat(writeErrors)) {
+      const index = e.index ?? e.err?.index;
+      if (index !== undefined) rows.set(index, { code: e.code ?? e.err?.code, message: e.errmsg ?? e.err?.errmsg });
+    }
+    return rows.size ? rows : null;
+  }
+
+  /**
+   * Sort the rows of a failed batch: the server already took the rows without
+   * an error, rows that can never succeed are dropped, the rest are re-queued.
+   * A whole-batch failure of non-idempotent writes is only re-queued when it
+   * certainly did not reach the server. Returns true when something was re-queued.
+   */
+  failed(label, items, error, requeue, idempotent) {
+    this.metrics.flushErrors++;
+
+    const rows = this.rowErrors(error);
+    if (!rows && !idempotent && !notApplied(error)) {
+      this.metrics.writesFailed += items.length;
+      this.metrics.writesDropped += items.length;
+      this.metrics.writesUnknown += items.length;
+      console.error(`❌ Selection write-behind: ${label} flush failed (${error.message}); ` +
+        `${items.length} dropped, the server may have applied them`);
+      return false;
+    }
+
+    const failedRows = rows ? [...rows].map(([i, rowError]) => [items[i], rowError]).filter(([item]) => item)
+      : items.map(item => [item, error]);
+    this.metrics.writesFlushed += items.length - failedRows.length;
+
+    const retryable = [];
+    let dropped = 0;
+    for (const [item, rowError] of failedRows) {
+      if (rowError.code === 11000 && item.attempts > 0) {
+        // An earlier attempt reached the server after all
+        this.metrics.writesFlushed++;
+      } else if (PERMANENT_ERROR_CODES.has(rowError.code) || rowError.name === 'ValidationError') {
+        dropped++;
+      } else {
+        item.attempts++;
+        retryable.push(item);
+      }
+    }
+    this.metrics.writesFailed += failedRows.length;
+    this.metrics.writesDropped += dropped;
+    this.metrics.writesRetried += retryable.length;
+
+    console.error(`❌ Selection write-behind: ${label} flush failed (${error.message}); ` +
+      `${retryable.length} re-queued, ${dropped} dropped`);
+    if (retryable.length) {
+      requeue(retryable);
+      if (this.oldestQueuedAt === null) this.oldestQueuedAt = Date.now();
+    }
+    return retryable.length > 0;
+  }
+
+  requeueDidUse(use) {
+    const key = String(use.didId);
+    const queued = this.didUses.get(key);
+    if (!queued) {
+      this.didUses.set(key, use);
+      return;
+    }
+    // Newer picks of the same DID were queued meanwhile: add the failed calls to them
+    queued.calls += use.calls;
+    queued.set = { ...use.set, ...queued.set };
+  }
+
+  /**
+   * Flush until empty and stop the timer; call on shutdown
+   */
+  async close() {
+    this.closed = true;
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+    for (let attempt = 0; attempt < CLOSE_FLUSH_ATTEMPTS && (this.pending > 0 || this.flushing); attempt++) {
+      if (this.flushing) await this.flushing;
+      await this.flush();
+    }
+    if (this.pending > 0) {
+      console.error(`❌ Selection write-behind: ${this.pending} writes lost at shutdown`);
+      this.metrics.writesDropped += this.pending;
+    }
+  }
+
+  getStats() {
+    return {
+      ...this.metrics,
+      pending: this.pending,
+      oldestPendingMs: this.oldestQueuedAt === null ? 0 : Date.now() - this.oldestQueuedAt,
+      flushing: Boolean(this.flushing),
+      flushMs: this.flushMs,
+      batchSize: this.batchSize,
+      maxPending: this.maxPending,
+      consecutiveFailures: this.consecutiveFailures,
+      retryInMs: Math.max(0, this.retryAfter - Date.now())
+    };
+  }
+}
+
+// Export singleton instance
+export default new SelectionWriteBuffer();